@@ -0,0 +1,219 @@
+"""
+    Beta Expansions of Salem Numbers, calculating periods thereof
+    Copyright (C) 2021 Michael P. Lane
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+"""
+from abc import ABC, abstractmethod
+
+from mpmath.libmp import fzero, fone, from_int, from_man_exp, mpf_add, mpf_mul, mpf_sub, mpf_abs, mpf_frac, mpf_lt, \
+    mpf_le, to_int
+
+try:
+    import gmpy2
+
+except ImportError:
+    gmpy2 = None
+
+try:
+    import flint
+
+except ImportError:
+    flint = None
+
+# same as `beta_numbers.evaluators.AMBIGUOUS_FLOOR`
+AMBIGUOUS = -1
+
+class Backend(ABC):
+    """The multiprecision arithmetic of `MPMathEvaluator`, below the level of `mpmath.mpf` objects. `floor_xi`
+    evaluates xi = beta0 * B(beta0) by Horner's method, where the precision of every operation is passed explicitly
+    instead of being read from a context, and returns floor(xi) or `AMBIGUOUS`. If it returns `AMBIGUOUS`, then
+    `last_xi` is set to xi as a raw `mpmath.libmp` tuple.
+
+    The floor is decided by the same criterion as the "mpmath" evaluator: it is ambiguous if xi is negative or if the
+    fractional part of xi, rounded to `y_prec` bits, is within 2 ** (4 - y_prec) of 0 or 1 (cf `mpmath.almosteq`).
+    Backends with `round_to_nearest` set round every operation to nearest, like `mpmath`, so they return the same xi
+    and the same floors as the "mpmath" evaluator bit for bit.
+    """
+
+    round_to_nearest = True
+    # `False` if the backend changes a global precision, in which case it cannot be used by several threads
+    thread_safe = True
+
+    def __init__(self, beta0, max_prec):
+        """
+        :param beta0: (type `mpf`) The Perron number, calculated to at least `max_prec` bits.
+        :param max_prec: (type `int`, positive) The maximum binary precision that will be requested.
+        """
+
+        self.max_prec = max_prec
+        self.last_xi = None
+
+    @abstractmethod
+    def floor_xi(self, coefs, x_prec, y_prec):
+        """Return floor(beta0 * B(beta0)), or `AMBIGUOUS`.
+
+        :param coefs: (type `numpy.ndarray`) Coefficients of B, the 0-index term is the coefficient of the 0-degree
+        term.
+        :param x_prec: (type `int`, positive) Binary precision used to evaluate B.
+        :param y_prec: (type `int`, positive) Binary precision that the result must be accurate to.
+        """
+        raise NotImplementedError
+
+class LibmpBackend(Backend):
+    """Raw `mpmath.libmp` tuples and functions, which `mpmath.mpf` wraps."""
+
+    def __init__(self, beta0, max_prec):
+
+        super().__init__(beta0, max_prec)
+        self._beta0 = beta0._mpf_
+
+    def floor_xi(self, coefs, x_prec, y_prec):
+
+        beta0 = self._beta0
+        xi = fzero
+
+        for j in range(len(coefs) - 1, -1, -1):
+            xi = mpf_add(mpf_mul(xi, beta0, x_prec, "n"), from_int(int(coefs[j])), x_prec, "n")
+
+        xi = mpf_mul(xi, beta0, x_prec, "n")
+        frac = mpf_frac(xi, y_prec, "n")
+        eps = from_man_exp(1, 4 - y_prec)
+
+        if (
+            mpf_lt(xi, fzero) or mpf_le(mpf_abs(frac), eps) or
+            mpf_le(mpf_abs(mpf_sub(frac, fone, y_prec, "n")), eps)
+        ):
+
+            self.last_xi = xi
+            return AMBIGUOUS
+
+        return to_int(xi)
+
+class Gmpy2Backend(Backend):
+    """`gmpy2.mpfr`, that is MPFR, with one `gmpy2.context` per precision."""
+
+    def __init__(self, beta0, max_prec):
+
+        if gmpy2 is None:
+            raise ImportError("The \"gmpy2\" backend requires `gmpy2`.")
+
+        super().__init__(beta0, max_prec)
+        sign, man, exp, bc = beta0._mpf_
+        man = int(-man if sign else man)
+        # exact
+        self._beta0 = gmpy2.context(precision = max(bc, 2)).mul_2exp(man, exp)
+        self._contexts = {}
+
+    def _context(self, prec):
+
+        try:
+            return self._contexts[prec]
+
+        except KeyError:
+
+            ctx = self._contexts[prec] = gmpy2.context(precision = prec, round = gmpy2.RoundToNearest)
+            return ctx
+
+    def floor_xi(self, coefs, x_prec, y_prec):
+
+        beta0 = self._beta0
+        x_ctx = self._context(x_prec)
+        y_ctx = self._context(y_prec)
+        xi = gmpy2.mpfr(0)
+
+        for j in range(len(coefs) - 1, -1, -1):
+            xi = x_ctx.add(x_ctx.mul(xi, beta0), int(coefs[j]))
+
+        xi = x_ctx.mul(xi, beta0)
+        frac = y_ctx.frac(xi)
+        eps = gmpy2.mul_2exp(1, 4 - y_prec)
+
+        if xi < 0 or abs(frac) <= eps or abs(y_ctx.sub(frac, 1)) <= eps:
+
+            man, exp = xi.as_mantissa_exp()
+            self.last_xi = from_man_exp(int(man), int(exp))
+            return AMBIGUOUS
+
+        # `int` rounds an `mpfr` to nearest
+        return int(x_ctx.floor(xi))
+
+class FlintBackend(Backend):
+    """`flint.arb` balls of python-flint. beta0 is widened to a ball of radius 2 ** (4 - max_prec) * beta0, and a floor
+    is decided exactly when the ball of xi is non-negative and its floor is a unique integer, so the floors are
+    rigorous, like those of the "interval" evaluator, but precision may be increased at different steps than with
+    `mpmath`.
+
+    python-flint only has a global precision, `flint.ctx.prec`, which `floor_xi` changes and restores, so this backend
+    cannot be used by several threads.
+    """
+
+    round_to_nearest = False
+    thread_safe = False
+
+    def __init__(self, beta0, max_prec):
+
+        if flint is None:
+            raise ImportError("The \"flint\" backend requires `python-flint`.")
+
+        super().__init__(beta0, max_prec)
+        sign, man, exp, bc = beta0._mpf_
+        man = int(-man if sign else man)
+        self._beta0 = flint.arb(flint.arf((man, exp)), flint.arf((1, exp + bc + 4 - max_prec)))
+
+    def floor_xi(self, coefs, x_prec, y_prec):
+
+        beta0 = self._beta0
+        old_prec = flint.ctx.prec
+
+        try:
+
+            flint.ctx.prec = x_prec
+            xi = flint.arb(0)
+
+            for j in range(len(coefs) - 1, -1, -1):
+                xi = xi * beta0 + int(coefs[j])
+
+            xi = xi * beta0
+            floor_ = xi.floor().unique_fmpz() if xi >= 0 else None
+
+        finally:
+            flint.ctx.prec = old_prec
+
+        if floor_ is None:
+
+            man, exp = xi.mid().man_exp()
+            self.last_xi = from_man_exp(int(man), int(exp))
+            return AMBIGUOUS
+
+        return int(floor_)
+
+BACKENDS = {
+    "libmp": LibmpBackend,
+    "gmpy2": Gmpy2Backend,
+    "flint": FlintBackend
+}
+
+def get_backend(name, beta0, max_prec):
+    """Return a `Backend` for the Perron number `beta0`.
+
+    :param name: (type `str`) One of the keys of `BACKENDS`.
+    :param beta0: (type `mpf`) The Perron number, calculated to at least `max_prec` bits.
+    :param max_prec: (type `int`, positive) Maximum binary precision.
+    """
+
+    try:
+        cls = BACKENDS[name]
+
+    except KeyError:
+        raise ValueError(f"`backend` must be one of {', '.join(BACKENDS.keys())}, not `{name}`.") from None
+
+    return cls(beta0, max_prec)
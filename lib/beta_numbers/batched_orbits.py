@@ -0,0 +1,311 @@
+"""
+    Beta Expansions of Salem Numbers, calculating periods thereof
+    Copyright (C) 2021 Michael P. Lane
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+"""
+import mpmath
+import numpy as np
+
+from .evaluators import AMBIGUOUS_FLOOR, EVALUATORS
+
+# events returned by `OrbitBatch.step`
+RUNNING = 0
+PERIODIC = 1
+SIMPLE_PARRY = 2
+OVERFLOW = 3
+PREC_ERR = 4
+MAX_LEN = 5
+
+BASE2_MAGN_MAX_MAX_ABS_COEF = 61
+INITIAL_Y_PREC = 16
+PREC_INCREASE_FACTOR = 2
+# unit roundoff of float64
+U64 = 2. ** -53
+
+class OrbitBatch:
+    """Advances the orbits of many Perron numbers of the same degree in lockstep.
+
+    The iterates B_{n-1} of all orbits in the batch are the rows of one `(N, deg)` `int64` array. Each call to `step`
+    computes c_n and B_n for every row at once: the floors are computed by Horner's method in float64 with the same
+    rigorous error bound as `TieredEvaluator`, and only the rows whose floor is ambiguous are passed one at a time to
+    a multiprecision evaluator, with the same precision escalation as `_single_orbit`. B_n is computed from B_{n-1}
+    by the vectorized equivalent of `_calc_Bn`. Periodicity is detected by comparing every row with B_1, with
+    B_0 = 1 and with a Brent checkpoint (cf `BrentDetector`).
+
+    Rows are dropped from the batch as soon as their orbit is periodic, overflows, has an unrecoverable precision
+    error or reaches `max_len`. Rows are identified by their slot, the row index they had when the batch was
+    created. `is_monotone` and `min_blowup` are indexed by slot, so they remain available after a row is dropped.
+    """
+
+    def __init__(self, min_polys, beta0s, max_prec, max_len, fallback = "fixed", fallback_kwargs = None):
+        """
+        :param min_polys: (type `numpy.ndarray`) `(N, deg + 1)` `int64` array, the minimal polynomials of the
+        Perron numbers. The 0-index term is the coefficient of the 0-degree term.
+        :param beta0s: (type `list` of `mpmath.mpf`) The Perron numbers.
+        :param max_prec: (type `int`, positive) The maximum binary precision of the multiprecision evaluator.
+        :param max_len: (type `int`, positive) Maximum poly orbit length to calculate.
+        :param fallback: (type `str`, default "fixed") Key of `EVALUATORS`, the evaluator used for ambiguous floors.
+        Evaluators that carry state from one step to the next cannot be used.
+        :param fallback_kwargs: (type `dict`, default `None`) Keyword arguments passed to the fallback constructor.
+        """
+
+        if fallback not in EVALUATORS:
+            raise ValueError(f"`fallback` must be one of {', '.join(EVALUATORS.keys())}, not `{fallback}`.")
+
+        if EVALUATORS[fallback].carries_state:
+            raise ValueError(f"`{fallback}` cannot be a fallback.")
+
+        min_polys = np.asarray(min_polys, dtype = np.int64)
+        num_orbits = min_polys.shape[0]
+        self.deg = min_polys.shape[1] - 1
+        self.max_prec = max_prec
+        self.max_len = max_len
+        self.fallback = fallback
+        self.fallback_kwargs = {} if fallback_kwargs is None else fallback_kwargs
+        self.min_polys = min_polys
+        self._beta0s = list(beta0s)
+        self._fallbacks = {}
+        self.slots = np.arange(num_orbits)
+        self.n = np.ones(num_orbits, dtype = np.int64)
+        self.Bn_1 = np.zeros((num_orbits, self.deg), dtype = np.int64)
+        self.Bn_1[:, 0] = 1
+        self.B1 = np.zeros((num_orbits, self.deg), dtype = np.int64)
+        self.B1[:, 0] = [-int(beta0) for beta0 in beta0s]
+        self.B1[:, 1] = 1
+        self.checkpoints = np.zeros((num_orbits, self.deg), dtype = np.int64)
+        self.checkpoint_n = np.zeros(num_orbits, dtype = np.int64)
+        self.is_monotone = np.ones(num_orbits, dtype = bool)
+        self.min_blowup = np.zeros(num_orbits, dtype = np.float32)
+        self.beta0 = np.array([float(beta0) for beta0 in beta0s])
+        beta0_ceil = np.array([int(mpmath.ceil(beta0)) for beta0 in beta0s], dtype = np.int64)
+        self.beta0_ceil = beta0_ceil
+        powers = beta0_ceil.astype(np.float64)[:, None] ** np.arange(1, self.deg + 1)
+        # `_geom * max_abs_coef` is at least the sum of |c_j| * beta0 ** (j + 1)
+        self._geom = powers.sum(axis = 1) * (1. + 2. ** -40)
+        self.base2_magn_norm_max_eval = np.array(
+            [calc_base2_magn_norm_max_eval(beta0, self.deg, max_prec) for beta0 in beta0s], dtype = np.int64
+        )
+
+    def __len__(self):
+        return len(self.slots)
+
+    def restart(self, slot, n, Bn_1, checkpoint_n, checkpoint, is_monotone, min_blowup):
+        """Resume the orbit in `slot` after B_1, ..., B_{n-1} have been calculated.
+
+        :param slot: (type `int`) The slot of the orbit.
+        :param n: (type `int`, positive) The index of the next iterate.
+        :param Bn_1: (type `numpy.ndarray`) B_{n-1}.
+        :param checkpoint_n: (type `int`) The largest power of two at most n - 1.
+        :param checkpoint: (type `numpy.ndarray`) B_{checkpoint_n}.
+        :param is_monotone: (type `bool`)
+        :param min_blowup: (type `float`)
+        """
+
+        row = np.nonzero(self.slots == slot)[0][0]
+        self.n[row] = n
+        self.Bn_1[row] = Bn_1
+        self.checkpoint_n[row] = checkpoint_n
+        self.checkpoints[row] = checkpoint
+        self.is_monotone[slot] = is_monotone
+        self.min_blowup[slot] = min_blowup
+
+    def step(self):
+        """Calculate the next coefficient and iterate of every orbit in the batch, then drop the finished orbits.
+
+        :return: (type `tuple` of `numpy.ndarray`) `slots`, `n`, `cn`, `Bn`, `events` and `k`, one entry per orbit
+        that was in the batch before the call. `events` is one of `RUNNING`, `PERIODIC`, `SIMPLE_PARRY`, `OVERFLOW`,
+        `PREC_ERR` or `MAX_LEN`; if it is `PERIODIC`, then B_k == B_n and the period is minimal, where k == 0 means
+        B_0 = 1. If it is `OVERFLOW` or `PREC_ERR`, then `cn` and `Bn` are not valid.
+        """
+
+        slots, n, Bn_1 = self.slots, self.n, self.Bn_1
+        events = np.full(len(slots), RUNNING, dtype = np.int64)
+        k = np.full(len(slots), -1, dtype = np.int64)
+        max_abs_coef = np.max(np.abs(Bn_1), axis = 1)
+        events[base2_magn(max_abs_coef) + self.base2_magn_norm_max_eval > BASE2_MAGN_MAX_MAX_ABS_COEF] = OVERFLOW
+        cn = self._floor_xi(Bn_1, max_abs_coef, events)
+        Bn = calc_Bn(Bn_1, cn, self.min_polys)
+        valid = events == RUNNING
+        self._update_monotone(n, Bn_1, Bn, valid)
+        # many orbits repeat at B_1, after the checkpoint has moved on
+        is_B1 = valid & (n >= 2) & np.all(Bn == self.B1, axis = 1)
+        is_B0 = valid & (Bn[:, 0] == 1) & np.all(Bn[:, 1 : ] == 0, axis = 1)
+        is_checkpoint = (
+            valid & ~is_B1 & ~is_B0 & (self.checkpoint_n > 0) & np.all(Bn == self.checkpoints, axis = 1)
+        )
+        k[is_B1] = 1
+        k[is_B0] = 0
+        k[is_checkpoint] = self.checkpoint_n[is_checkpoint]
+        events[is_B1 | is_B0 | is_checkpoint] = PERIODIC
+        events[(events == RUNNING) & (n >= self.max_len)] = MAX_LEN
+        # Brent checkpoints at powers of two
+        new_checkpoint = (events == RUNNING) & (n & (n - 1) == 0)
+        self.checkpoints[new_checkpoint] = Bn[new_checkpoint]
+        self.checkpoint_n[new_checkpoint] = n[new_checkpoint]
+        ret = slots.copy(), n.copy(), cn, Bn.copy(), events, k
+        keep = events == RUNNING
+        self.Bn_1 = Bn
+        self.n = n + 1
+        self._compress(keep)
+        return ret
+
+    def _compress(self, keep):
+
+        if not np.all(keep):
+
+            for name in [
+                "slots", "n", "Bn_1", "B1", "checkpoints", "checkpoint_n", "min_polys", "beta0", "beta0_ceil", "_geom",
+                "base2_magn_norm_max_eval"
+            ]:
+                setattr(self, name, getattr(self, name)[keep])
+
+    def _floor_xi(self, Bn_1, max_abs_coef, events):
+        """floor(beta0 * B_{n-1}(beta0)) of every row. Rows that turn out to be simple Parry or to have an
+        unrecoverable precision error are marked in `events`."""
+
+        beta0 = self.beta0
+        xi = Bn_1[:, self.deg - 1].astype(np.float64)
+
+        for j in range(self.deg - 2, -1, -1):
+            xi = xi * beta0 + Bn_1[:, j]
+
+        xi *= beta0
+        err = (3 * self.deg + 3) * 1.01 * U64 * max_abs_coef * self._geom + np.abs(xi) * 2. ** -51
+        cn = np.floor(xi - err)
+        ambiguous = (err >= 0.25) | (cn < 0) | (cn != np.floor(xi + err))
+        cn = cn.astype(np.int64)
+        ambiguous &= events == RUNNING
+
+        if np.any(ambiguous):
+            # A simple Parry orbit ends with xi an integer, which no precision can decide. B_n == 0 for the nearest
+            # integer is an exact certificate.
+            rows = np.nonzero(ambiguous)[0]
+            rounded = np.rint(xi[rows]).astype(np.int64)
+            is_zero = np.all(calc_Bn(Bn_1[rows], rounded, self.min_polys[rows]) == 0, axis = 1)
+            cn[rows[is_zero]] = rounded[is_zero]
+            events[rows[is_zero]] = SIMPLE_PARRY
+
+            for row in rows[~is_zero]:
+
+                cn[row] = self._fallback_floor_xi(row, Bn_1[row], max_abs_coef[row])
+
+                if cn[row] == AMBIGUOUS_FLOOR:
+                    events[row] = PREC_ERR
+
+        cn[events == OVERFLOW] = 0
+        return cn
+
+    def _fallback_floor_xi(self, row, Bn_1, max_abs_coef):
+        """Same precision escalation as `_single_orbit`."""
+
+        slot = self.slots[row]
+
+        if slot not in self._fallbacks:
+            self._fallbacks[slot] = EVALUATORS[self.fallback](
+                self._beta0s[slot], self.min_polys[row], self.max_prec, **self.fallback_kwargs
+            )
+
+        evaluator = self._fallbacks[slot]
+        x_y_prec_offset = (
+            1 +
+            2 * int(self.deg).bit_length() +
+            int(max_abs_coef).bit_length() +
+            self.deg * int(self.beta0_ceil[row] + 1).bit_length()
+        )
+        x_prec_lower_bound = max(1, calc_x_prec_lower_bound(self.deg))
+        y_prec = INITIAL_Y_PREC
+
+        while True:
+
+            x_prec = max(y_prec + x_y_prec_offset, x_prec_lower_bound)
+
+            if x_prec > self.max_prec:
+                x_prec = self.max_prec
+                y_prec = x_prec - x_y_prec_offset
+
+            cn = evaluator.floor_xi(Bn_1, x_prec, y_prec)
+
+            if cn != AMBIGUOUS_FLOOR or x_prec >= self.max_prec:
+                return cn
+
+            y_prec *= PREC_INCREASE_FACTOR
+
+    def _update_monotone(self, n, Bn_1, Bn, valid):
+        """Vectorized `_calc_min_blowup`."""
+
+        c1, c2 = Bn_1, Bn
+        fail = np.any(
+            ((c1 == 0) & (c2 == 0)) |
+            ((c1 != 0) & (((c1 > 0) & (c2 >= 0)) | (c1 < 0) | (c2 <= 0))),
+            axis = 1
+        )
+        fail &= valid & (n >= self.deg)
+        c1_abs = np.abs(c1).astype(np.float32)
+        quo = np.where(c1 != 0, np.abs(c2) / np.where(c1 != 0, c1_abs, 1), np.inf).min(axis = 1)
+        slots = self.slots
+        update = valid & (n >= self.deg) & self.is_monotone[slots] & ~fail
+        self.min_blowup[slots[update]] = np.minimum(self.min_blowup[slots[update]], quo[update])
+        self.is_monotone[slots[fail]] = False
+        self.min_blowup[~self.is_monotone] = -1.
+
+def calc_Bn(Bn_1, cn, min_polys):
+    """Vectorized `_calc_Bn`: B_n(x) = x * B_{n-1}(x) - c_n modulo the minimal polynomial, row by row.
+
+    :param Bn_1: (type `numpy.ndarray`) `(N, deg)`.
+    :param cn: (type `numpy.ndarray`) `(N,)`.
+    :param min_polys: (type `numpy.ndarray`) `(N, deg + 1)`, monic.
+    :return: (type `numpy.ndarray`) `(N, deg)`.
+    """
+
+    Bn = np.empty_like(Bn_1)
+    Bn[:, 0] = -cn
+    Bn[:, 1 : ] = Bn_1[:, : -1]
+    Bn -= Bn_1[:, -1 : ] * min_polys[:, : -1]
+    return Bn
+
+def base2_magn(x):
+    """Vectorized `_base2_magn`, the bit length of each entry of the non-negative `int64` array `x`."""
+
+    x = np.asarray(x, dtype = np.int64)
+    magn = np.frexp(x.astype(np.float64))[1].astype(np.int64)
+    # the conversion to float64 may round up to the next power of two
+    magn -= (x > 0) & ((x >> np.maximum(magn - 1, 0)) == 0)
+    return magn
+
+def calc_base2_magn_norm_max_eval(beta0, deg, max_prec):
+    """A scaling factor that is used to detect potential overflow errors. It is derived by massaging the truncated
+    geometric series of degree `deg - 1` and taking logs."""
+
+    base2_magn_norm_max_eval = (deg + 1) * int(mpmath.ceil(beta0)).bit_length()
+
+    if beta0 >= 2:
+        # this one gets smaller
+        base2_magn_norm_max_eval -= (int(beta0) - 1).bit_length() - 1
+
+    else:
+        # this one gets bigger
+        # a context of its own rather than `workprec`, which would change the precision of the other threads too
+        ctx = mpmath.MPContext()
+        ctx.prec = max_prec
+        base2_magn_norm_max_eval -= int(ctx.log(ctx.mpf(beta0) - 1, 2))
+
+    return base2_magn_norm_max_eval
+
+def calc_x_prec_lower_bound(deg):
+    """Derived from massaging the Lagrange remainder of the first order approximation of the error and taking
+    logs."""
+
+    if deg == 2:
+        return 1
+
+    else:
+        return int(np.ceil(2 + 2 * int(deg - 1).bit_length() - int(deg).bit_length()))
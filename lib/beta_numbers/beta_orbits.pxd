@@ -1,5 +1,9 @@
 cimport numpy as cnp
 from intpolynomials.intpolynomials cimport IntPolynomial, BOOL_t, ERR_t
+from beta_numbers.evaluators cimport XiEvaluator
+from beta_numbers.cycle_detectors cimport CycleDetector
+from beta_numbers.precision_policies cimport PrecisionPolicy
+from beta_numbers.metrics cimport OrbitMetrics
 
 ctypedef cnp.int_t      DEG_t
 ctypedef cnp.longlong_t COEF_t
@@ -7,7 +11,7 @@ ctypedef cnp.int_t      DPS_t
 ctypedef cnp.int_t      C_t
 ctypedef cnp.longlong_t N_t
 ctypedef object         MPF_t
-ctypedef int            INDEX_t
+ctypedef cnp.longlong_t INDEX_t
 
 cdef ERR_t _single_orbit(
     object beta,
@@ -22,23 +26,39 @@ cdef ERR_t _single_orbit(
     DPS_t max_dps,
     object timers,
     DPS_t constant_y_dps,
-    DPS_t constant_x_dps
+    DPS_t constant_x_dps,
+    XiEvaluator evaluator,
+    CycleDetector cycle_detector,
+    INDEX_t checkpoint_period,
+    object resume_reg,
+    PrecisionPolicy precision_policy,
+    object precision_reg,
+    object metrics_reg,
+    object progress,
+    object leases,
+    object block_writer
 )
 
 cdef C_t _round(MPF_t x) except -1
 
 cdef MPF_t _torus_norm(MPF_t x)
 
-cdef BOOL_t _incr_prec(MPF_t x) except -1
-
 cdef ERR_t _calc_Bn(IntPolynomial Bn_1, C_t cn, IntPolynomial min_poly, IntPolynomial Bn) except -1
 
+ctypedef void (*CALC_BN_KERNEL_t)(
+    const COEF_t *Bn_1, C_t cn, const COEF_t *min_poly, COEF_t *Bn, DEG_t deg
+) noexcept nogil
+
+cdef void _calc_Bn_kernel(
+    const COEF_t *Bn_1, C_t cn, const COEF_t *min_poly, COEF_t *Bn, DEG_t deg
+) noexcept nogil
+
+cdef CALC_BN_KERNEL_t _get_calc_Bn_kernel(DEG_t deg) noexcept
+
 cdef float _calc_min_blowup(
-    BOOL_t is_monotone, INDEX_t n, DEG_t deg, float min_blowup, IntPolynomial Bn_1, IntPolynomial Bn
-) except -2
+    BOOL_t is_monotone, INDEX_t n, DEG_t deg, float min_blowup, const COEF_t[:] Bn_1, const COEF_t[:] Bn
+) noexcept nogil
 
 cdef DPS_t _prec_offset(IntPolynomial Bn, IntPolynomial Bn_1)
 
-cdef C_t _calc_cn(MPF_t xi) except -1
-
 cdef str _mpf_to_str(MPF_t x)
\ No newline at end of file
@@ -12,7 +12,10 @@
     MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
     GNU General Public License for more details.
 """
-from contextlib import contextmanager
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager, nullcontext
 
 cimport cython
 from intpolynomials.intpolynomials cimport IntPolynomial, IntPolynomialArray, BOOL_t, ERR_t, calc_deg
@@ -25,8 +28,28 @@ from cornifer._utilities import check_type, check_return_int, check_return_Path
 from cornifer.debug import log
 from intpolynomials.registers import IntPolynomialRegister
 
+from beta_numbers.evaluators cimport XiEvaluator, AMBIGUOUS
+from beta_numbers.cycle_detectors cimport CycleDetector, _coefs_eq
+from beta_numbers.precision_policies cimport PrecisionPolicy
+from beta_numbers.metrics cimport OrbitMetrics, _now_ns
+from .backends import BACKENDS
+from .batched_orbits import (
+    OrbitBatch, RUNNING, PERIODIC, SIMPLE_PARRY, OVERFLOW, PREC_ERR, MAX_LEN, calc_base2_magn_norm_max_eval
+)
+from .cycle_detectors import CYCLE_DETECTORS, get_cycle_detector
+from .evaluators import EVALUATORS, get_evaluator
+from .orbit_replay import OrbitReplay, get_checkpoint_apri, get_orbit_replay
 from .perron_numbers import Perron_Number
-from .registers import MPFRegister
+from .registers import MPFRegister, PackedCoefRegister
+from .metrics import METRICS_N
+from .profiling import SamplingTimers, log_timers
+from .block_writer import BlockWriter
+from .leases import LeaseTable
+from .progress import RATE_PERIOD, ProgressFile
+from .status_table import StatusTable, export_status_table
+from .work_queue import WorkQueue
+from .precision_policies import PRECISION_POLICIES, PROFILE_N, calc_constant_dps, get_precision_policy
+from .resume import RESUME_N, make_resume_record, read_resume_record
 from .utilities import setdps
 
 COEF_DTYPE = np.int64
@@ -34,6 +57,8 @@ COEF_DTYPE = np.int64
 cdef BOOL_t FALSE = 0
 cdef BOOL_t TRUE = 1
 cdef float LOG_2_10 = 3.32193
+# nanoseconds between two updates of the progress file by `_single_orbit`, besides those at the `Block` dumps
+cdef N_t PROGRESS_PERIOD_NS = <N_t> (RATE_PERIOD * 1e9)
 NUM_BYTES_PER_TERABYTE = 2 ** 40
 
 def calc_orbits(
@@ -49,7 +74,29 @@ def calc_orbits(
     max_dps,
     num_procs,
     proc_index,
-    timers
+    timers,
+    evaluator = "mpmath",
+    evaluator_kwargs = None,
+    cycle_detector = "brent",
+    cycle_detector_kwargs = None,
+    batch_size = 1,
+    checkpoint_period = 1,
+    resume_reg = None,
+    precision_policy = "doubling",
+    precision_policy_kwargs = None,
+    precision_reg = None,
+    num_threads = 1,
+    backend = "mpmath",
+    metrics_reg = None,
+    progress_dir = None,
+    work_queue_dir = None,
+    round_len = None,
+    round_len_factor = 2,
+    status_table_dir = None,
+    lease_dir = None,
+    lease_secs = 600.,
+    write_behind = False,
+    perron_conjs_reg = None
 ):
     """This function is the main entry point for calculating Parry/beta numbers.
 
@@ -90,6 +137,111 @@ def calc_orbits(
     :param max_blk_len: (type `int`, positive) Maximum `Block` lengths of `poly_orbit_reg` and `coef_orbit_reg`.
     :param max_orbit_len: (type `int`, positive) Maximum poly orbit length to calculate.
     :param max_dps: (type `int`, non-negative) The maximum number of decimal places used to calculate the orbit.
+    :param timers: (type `dagtimers.Timers` or `beta_numbers.profiling.SamplingTimers`) Times every orbit (stage
+    "orbit"), unless `num_threads` is greater than 1 and `timers` is a `dagtimers.Timers`. A `SamplingTimers` is logged
+    and saved to its profile file after every `Block` of `status_reg`.
+    :param evaluator: (type `str`, default "mpmath") How beta * B_{n-1}(beta) is evaluated, one of the keys of
+    `beta_numbers.evaluators.EVALUATORS`. "mpmath" evaluates with Horner's method in its own `mpmath` context;
+    "fixed" evaluates with an integer dot product against a cached table of scaled powers of beta; "incremental"
+    carries beta * B_{n-1}(beta) forward from one step to the next and periodically re-anchors it with the "fixed" dot
+    product (`evaluator_kwargs = {"anchor_period" : K}` sets the maximum number of steps between anchors);
+    "interval" evaluates with `mpmath.iv` starting from a certified enclosure of beta, so that precision is only
+    increased when the floor is genuinely ambiguous; "tiered" tries float64 and double-double arithmetic with rigorous
+    error bounds before falling back to another evaluator (`evaluator_kwargs = {"fallback" : "fixed"}`, default
+    "mpmath"); "trace" evaluates beta * B_{n-1}(beta) as the exact integer trace of x * B_{n-1}(x) minus the small
+    contribution of the other conjugates (read from `perron_conjs_reg` if it is given, and calculated once per orbit
+    otherwise), so that the precision needed does not grow with beta ** deg.
+    :param evaluator_kwargs: (type `dict`, default `None`) Keyword arguments passed to the evaluator constructor.
+    :param cycle_detector: (type `str`, default "brent") How periodicity is detected, one of the keys of
+    `beta_numbers.cycle_detectors.CYCLE_DETECTORS`. "brent" keeps a single checkpoint poly in RAM; "distinguished"
+    additionally stores the iterates whose hash has `dp_bits` leading zero bits in a hash table, so that very long
+    orbits are detected soon after they become periodic and the preperiod is found without replaying the whole orbit
+    (`cycle_detector_kwargs = {"dp_bits" : k, "table_dir" : path}`; the tables are kept in RAM if "table_dir" is
+    omitted, and then are rebuilt from scratch after a restart; the table of an orbit is deleted once the orbit is
+    periodic or overflowed).
+    :param cycle_detector_kwargs: (type `dict`, default `None`) Keyword arguments passed to the cycle detector
+    constructor.
+    :param batch_size: (type `int`, positive, default 1) If greater than 1, the orbits of each apri are calculated
+    `batch_size` at a time in lockstep by a `beta_numbers.batched_orbits.OrbitBatch`, which computes the floors of all
+    orbits with vectorized float64 arithmetic and only uses `evaluator` (which must not carry state from one step to
+    the next) for the floors that float64 cannot decide. Batched orbits always use Brent cycle detection. The status,
+    periodic and monotone data are written in bulk every time the `Block`s are dumped.
+    :param checkpoint_period: (type `int`, positive, default 1) If greater than 1, then only every
+    `checkpoint_period`-th poly B_K, B_2K, ... of the poly orbit is saved to `poly_orbit_reg`, under the apri
+    `beta_numbers.orbit_replay.get_checkpoint_apri(orbit_apri, K)`, and the remaining iterates are rebuilt from
+    `coef_orbit_reg` by `beta_numbers.orbit_replay.get_orbit_replay` when needed. Requires `batch_size` to be 1. Orbits
+    must always be resumed with the same `checkpoint_period`.
+    :param resume_reg: (type `NumpyRegister`, default `None`) If given (cf `beta_numbers.resume.calc_resume_setup`),
+    then every time the `Block`s of an orbit are dumped, a small record with B_n, the cycle detector state, the
+    precision offset, the monotone data and some statistics is saved to `resume_reg`, so that the orbit is resumed
+    without reading `poly_orbit_reg` or `monotone_reg`. Records are only written if `batch_size` is 1, and a record
+    is ignored if it does not match the poly orbit length in `status_reg`.
+    :param precision_policy: (type `str`, default "doubling") How the precision of each step is chosen, one of the keys
+    of `beta_numbers.precision_policies.PRECISION_POLICIES`, or "profile". "doubling" starts every step from 16 bits
+    and doubles until the floor is decided; "adaptive" starts from the precision that the last hard step needed
+    (`precision_policy_kwargs = {"decay_period" : K}` sets how many easy steps it takes to halve it again); "profile"
+    calculates every orbit with the constant precision given by its profile in `precision_reg` (cf
+    `beta_numbers.precision_policies.calc_constant_dps`), saved by an earlier run, and with "doubling" if it has none.
+    :param precision_policy_kwargs: (type `dict`, default `None`) Keyword arguments passed to the precision policy
+    constructor.
+    :param precision_reg: (type `NumpyRegister`, default `None`) If given (cf
+    `beta_numbers.precision_policies.calc_precision_setup`), the precision profile of every orbit is saved to it,
+    unless `precision_policy` is "profile", in which case it is only read. Profiles are only written if `batch_size` is
+    1.
+    :param num_threads: (type `int`, positive, default 1) If greater than 1, the incomplete orbits of each `Block` of
+    `status_reg` are calculated by a pool of `num_threads` threads, which share the `Block`s of `perron_polys_reg` and
+    `perron_nums_reg` read by this process. The integer part of every step (B_n, the blowup and the comparisons
+    with B_0 and B_1) runs without the GIL and every evaluator has its own `mpmath` context, but the calls to the
+    evaluators and to the `Register`s hold the GIL, and the calls to the `Register`s are serialized by a lock.
+    Requires `batch_size` to be 1.
+    :param backend: (type `str`, default "mpmath") The multiprecision arithmetic of the "mpmath" evaluator, "mpmath" or
+    one of the keys of `beta_numbers.backends.BACKENDS`. "mpmath" uses `mpf` objects; "libmp" uses the raw
+    `mpmath.libmp` functions with explicit precisions; "gmpy2" uses MPFR, if `gmpy2` is installed. All three round to
+    nearest and calculate the same orbits bit for bit. "flint" uses the `arb` balls of python-flint, if it is
+    installed, and cannot be used with more than one thread. If `backend` is not "mpmath", then `evaluator` must be
+    "mpmath".
+    :param metrics_reg: (type `NumpyRegister`, default `None`) If given (cf `beta_numbers.metrics.calc_metrics_setup`),
+    then every time the `Block`s of an orbit are dumped, and when the orbit stops, the counters of
+    `beta_numbers.metrics.OrbitMetrics` (iterations, evaluations of xi, precision increases, the largest coefficient,
+    and the time spent evaluating xi, calculating B_n, detecting cycles and writing) are saved to `metrics_reg`.
+    Counters are only written if `batch_size` is 1.
+    :param progress_dir: (type `str` or `pathlib.Path`, default `None`) If given, this process publishes its progress
+    (the orbits completed out of the incomplete orbits assigned to it, the coefficients calculated and their rate, the
+    current orbit and its RSS) in a `beta_numbers.progress.ProgressFile` in `progress_dir`, which is read by
+    `scripts/monitor_progress.py`, at least every `beta_numbers.progress.RATE_PERIOD` seconds while an orbit is
+    calculated. Coefficients are only counted if `batch_size` is 1.
+    :param work_queue_dir: (type `str` or `pathlib.Path`, default `None`) If given, instead of calculating the `Block`s
+    of `status_reg` with `blk_index % num_procs == proc_index`, this process claims batches of orbits on demand from
+    the `beta_numbers.work_queue.WorkQueue` in `work_queue_dir`, which must have been setup by
+    `beta_numbers.work_queue.calc_work_queue_setup` before the processes started. If it was setup with a `cost_index`,
+    the orbits are claimed by increasing predicted cost.
+    :param round_len: (type `int`, positive, default `None`) If given, the orbits are calculated in rounds: in the
+    first round every incomplete orbit is calculated up to poly orbit length `round_len`, then up to
+    `round_len * round_len_factor`, and so on up to `max_orbit_len`, each round resuming from `status_reg` where the
+    last one stopped. Short orbits then finish before long ones use up the allocation. With `work_queue_dir`, the
+    rounds are applied to every batch that is claimed.
+    :param round_len_factor: (type `int` or `float`, greater than 1, default 2) The growth of the poly orbit length
+    between two rounds.
+    :param status_table_dir: (type `str` or `pathlib.Path`, default `None`) If given, the orbits read and write their
+    status, periodic and monotone data in the `beta_numbers.status_table.StatusTable` in `status_table_dir`, which
+    must have been setup by `beta_numbers.status_table.calc_status_table_setup` before the processes started, instead
+    of `status_reg`, `periodic_reg` and `monotone_reg`. The table is written to the registers after every `Block` of
+    `status_reg`. Requires `batch_size` to be 1.
+    :param lease_dir: (type `str` or `pathlib.Path`, default `None`) If given, this process claims a lease on every
+    orbit in the `beta_numbers.leases.LeaseTable` in `lease_dir` before it fixes and calculates it, and skips the
+    orbits leased by other processes (for instance the stragglers of an earlier SLURM job array), so that no orbit is
+    calculated twice at the same time. The lease is renewed at every dump of a `Block`; if it was lost, the orbit is
+    left to the process that claimed it. Requires `batch_size` to be 1.
+    :param lease_secs: (type `float`, positive, default 600.) Leases that are not renewed for `lease_secs` seconds
+    expire, so that the orbits of processes that died are claimed again. Must be much greater than the time between
+    two dumps of a `Block` of an orbit.
+    :param write_behind: (type `bool`, default `False`) If `True`, the `Block` dumps of every orbit are written by a
+    `beta_numbers.block_writer.BlockWriter` thread while the orbit is calculated further, instead of stopping the
+    calculation. The status of the orbit is still written after its data. Requires `batch_size` to be 1.
+    :param perron_conjs_reg: (type `MPFRegister`, default `None`) The proper conjugates written by
+    `beta_numbers.perron_numbers.calc_perron_nums`, with the same apris as `perron_nums_reg`. If given, the "trace"
+    evaluator reads the conjugates of every orbit from it instead of calculating them. Requires `evaluator` to be
+    "trace" and `batch_size` to be 1.
     """
 
     # It is worth noting the following facts about the indices of the poly orbit and the coef orbit of beta:
@@ -114,11 +266,51 @@ def calc_orbits(
     check_type(coef_orbit_reg, "coef_orbit_reg", NumpyRegister)
     check_type(status_reg, "status_reg", NumpyRegister)
     check_type(periodic_reg, "periodic_reg", NumpyRegister)
+
+    if resume_reg is not None:
+        check_type(resume_reg, "resume_reg", NumpyRegister)
+
+    if precision_reg is not None:
+        check_type(precision_reg, "precision_reg", NumpyRegister)
+
+    if metrics_reg is not None:
+        check_type(metrics_reg, "metrics_reg", NumpyRegister)
+
+    if perron_conjs_reg is not None:
+        check_type(perron_conjs_reg, "perron_conjs_reg", MPFRegister)
+
     max_blk_len = check_return_int(max_blk_len, "max_blk_len")
     max_orbit_len = check_return_int(max_orbit_len, "max_orbit_len")
     max_dps = check_return_int(max_dps, "max_dps")
     num_procs = check_return_int(num_procs, "num_procs")
     proc_index = check_return_int(proc_index, "proc_index")
+    batch_size = check_return_int(batch_size, "batch_size")
+    checkpoint_period = check_return_int(checkpoint_period, "checkpoint_period")
+
+    if round_len is not None:
+        round_len = check_return_int(round_len, "round_len")
+
+    num_threads = check_return_int(num_threads, "num_threads")
+    check_type(evaluator, "evaluator", str)
+
+    if evaluator_kwargs is None:
+        evaluator_kwargs = {}
+
+    check_type(evaluator_kwargs, "evaluator_kwargs", dict)
+    check_type(cycle_detector, "cycle_detector", str)
+
+    if cycle_detector_kwargs is None:
+        cycle_detector_kwargs = {}
+
+    check_type(cycle_detector_kwargs, "cycle_detector_kwargs", dict)
+    check_type(precision_policy, "precision_policy", str)
+
+    if precision_policy_kwargs is None:
+        precision_policy_kwargs = {}
+
+    check_type(precision_policy_kwargs, "precision_policy_kwargs", dict)
+    check_type(backend, "backend", str)
+    check_type(write_behind, "write_behind", bool)
 
     if max_blk_len <= 0:
         raise ValueError("`max_blk_len` must be positive.")
@@ -135,87 +327,431 @@ def calc_orbits(
     if proc_index < 0:
         raise ValueError("`proc_index` must be non-negative.")
 
+    if evaluator not in EVALUATORS:
+        raise ValueError(f"`evaluator` must be one of {', '.join(EVALUATORS.keys())}, not `{evaluator}`.")
+
+    if cycle_detector not in CYCLE_DETECTORS:
+        raise ValueError(
+            f"`cycle_detector` must be one of {', '.join(CYCLE_DETECTORS.keys())}, not `{cycle_detector}`."
+        )
+
+    if precision_policy not in PRECISION_POLICIES and precision_policy != "profile":
+        raise ValueError(
+            f"`precision_policy` must be \"profile\" or one of {', '.join(PRECISION_POLICIES.keys())}, not "
+            f"`{precision_policy}`."
+        )
+
+    if precision_policy == "profile" and precision_reg is None:
+        raise ValueError("`precision_reg` must be given if `precision_policy` is \"profile\".")
+
+    if batch_size <= 0:
+        raise ValueError("`batch_size` must be positive.")
+
+    if checkpoint_period <= 0:
+        raise ValueError("`checkpoint_period` must be positive.")
+
+    if num_threads <= 0:
+        raise ValueError("`num_threads` must be positive.")
+
+    if round_len is not None and round_len <= 0:
+        raise ValueError("`round_len` must be positive.")
+
+    if round_len_factor <= 1:
+        raise ValueError("`round_len_factor` must be greater than 1.")
+
+    if num_threads > 1 and batch_size > 1:
+        raise ValueError("`batch_size` must be 1 if `num_threads` is greater than 1.")
+
+    if status_table_dir is not None and batch_size > 1:
+        raise ValueError("`batch_size` must be 1 if `status_table_dir` is given.")
+
+    if lease_dir is not None and batch_size > 1:
+        raise ValueError("`batch_size` must be 1 if `lease_dir` is given.")
+
+    if write_behind and batch_size > 1:
+        raise ValueError("`batch_size` must be 1 if `write_behind` is `True`.")
+
+    if lease_secs <= 0:
+        raise ValueError("`lease_secs` must be positive.")
+
+    if perron_conjs_reg is not None:
+
+        if evaluator != "trace":
+            raise ValueError("`evaluator` must be \"trace\" if `perron_conjs_reg` is given.")
+
+        if batch_size > 1:
+            raise ValueError("`batch_size` must be 1 if `perron_conjs_reg` is given.")
+
+    if backend != "mpmath":
+
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"`backend` must be \"mpmath\" or one of {', '.join(BACKENDS.keys())}, not `{backend}`."
+            )
+
+        if evaluator != "mpmath":
+            raise ValueError(f"`evaluator` must be \"mpmath\" if `backend` is `{backend}`.")
+
+        if num_threads > 1 and not BACKENDS[backend].thread_safe:
+            raise ValueError(f"`num_threads` must be 1 if `backend` is `{backend}`.")
+
+        evaluator_kwargs = dict(evaluator_kwargs, backend = backend)
+
+    if batch_size > 1:
+
+        if checkpoint_period != 1:
+            raise ValueError("`checkpoint_period` must be 1 if `batch_size` is greater than 1.")
+
+        if EVALUATORS[evaluator].carries_state:
+            raise ValueError(f"`evaluator` cannot be `{evaluator}` if `batch_size` is greater than 1.")
+
+        if cycle_detector != "brent":
+            raise ValueError("`cycle_detector` must be \"brent\" if `batch_size` is greater than 1.")
+
+        if precision_policy != "doubling":
+            raise ValueError("`precision_policy` must be \"doubling\" if `batch_size` is greater than 1.")
+
     if proc_index == 0:
         _update_status_reg_apos(perron_polys_reg, status_reg, timers)
 
+    if work_queue_dir is not None:
+        work_queue = WorkQueue(work_queue_dir)
+
+    else:
+        work_queue = None
+
+    if progress_dir is not None:
+        progress = ProgressFile(progress_dir, "orbits", proc_index, num_procs)
+
+    else:
+        progress = None
+
+    if status_table_dir is not None:
+        # the registers used by the orbits
+        status_table = StatusTable(status_table_dir)
+        orbit_status_reg, orbit_periodic_reg, orbit_monotone_reg = (
+            status_table.status, status_table.periodic, status_table.monotone
+        )
+
+    else:
+
+        status_table = None
+        orbit_status_reg, orbit_periodic_reg, orbit_monotone_reg = status_reg, periodic_reg, monotone_reg
+
+    if lease_dir is not None:
+        leases = LeaseTable(lease_dir, lease_secs)
+
+    else:
+        leases = None
+
+    # `dagtimers.Timers` cannot time the orbits of several threads
+    timers_thread_safe = num_threads == 1 or getattr(timers, "thread_safe", False)
+
+    round_orbit_lens = _calc_round_orbit_lens(max_orbit_len, round_len, round_len_factor)
+
+    def prepare_orbit(orbit_apri, perron_poly_blk, perron_num_blk, perron_conj_blk, orbit_len):
+        """Fix the problems of `orbit_apri` and construct its `Perron_Number`, evaluator, cycle detector, precision
+        policy and constant precisions, in the calling thread, which then calculates it. The orbit will be calculated
+        up to poly orbit length `orbit_len`. Returns `None` if another process holds the lease of the orbit."""
+
+        # the registers are used without `_LockedRegister`
+        with regs_lock:
+
+            if leases is not None and not leases.claim(orbit_apri):
+
+                log(f'{orbit_apri} is leased by another process, skipping.')
+                return None
+
+            fixed = _fix_problems(
+                orbit_apri, perron_polys_reg, poly_orbit_reg, coef_orbit_reg, orbit_status_reg, orbit_periodic_reg,
+                checkpoint_period
+            )
+
+            if precision_policy == "profile":
+                profile = precision_reg.get(orbit_apri.resp, orbit_apri.index, mmap_mode = "r")
+
+        if fixed:
+            log(f'Problem with {orbit_apri}; restarting from beginning.')
+
+        p = perron_poly_blk[orbit_apri.index]
+        beta0 = perron_num_blk[orbit_apri.index].real
+        beta = Perron_Number(p, beta0 = beta0)
+
+        if perron_conj_blk is not None:
+            xi_evaluator = get_evaluator(
+                evaluator, beta, int(max_dps * LOG_2_10), conjs = list(perron_conj_blk[orbit_apri.index]),
+                **evaluator_kwargs
+            )
+
+        else:
+            xi_evaluator = get_evaluator(evaluator, beta, int(max_dps * LOG_2_10), **evaluator_kwargs)
+
+        if precision_policy == "profile":
+
+            constant_y_dps, constant_x_dps = calc_constant_dps(profile)
+            orbit_precision_policy = get_precision_policy("doubling")
+
+        else:
+
+            constant_y_dps = constant_x_dps = -1
+            orbit_precision_policy = get_precision_policy(precision_policy, **precision_policy_kwargs)
+
+        return (
+            orbit_apri, beta, xi_evaluator,
+            get_cycle_detector(cycle_detector, beta.deg, orbit_apri, **cycle_detector_kwargs),
+            orbit_precision_policy, constant_y_dps, constant_x_dps, orbit_len
+        )
+
+    def run_orbit(
+        orbit, poly_orbit_reg, coef_orbit_reg, periodic_reg, monotone_reg, status_reg, resume_reg, precision_reg,
+        metrics_reg
+    ):
+        """Calculate the orbit `orbit` returned by `prepare_orbit`."""
+
+        if orbit is None:
+            return
+
+        (
+            orbit_apri, beta, xi_evaluator, orbit_cycle_detector, orbit_precision_policy, constant_y_dps,
+            constant_x_dps, orbit_len
+        ) = orbit
+
+        if progress is not None:
+            progress.set_apri(orbit_apri)
+
+        block_writer = BlockWriter() if write_behind else None
+
+        try:
+
+            with timers.time("orbit") if timers_thread_safe else nullcontext():
+                _single_orbit(
+                    beta,
+                    orbit_apri,
+                    poly_orbit_reg,
+                    coef_orbit_reg,
+                    periodic_reg,
+                    monotone_reg,
+                    status_reg,
+                    max_blk_len,
+                    orbit_len,
+                    max_dps,
+                    timers,
+                    constant_y_dps,
+                    constant_x_dps,
+                    xi_evaluator,
+                    orbit_cycle_detector,
+                    checkpoint_period,
+                    resume_reg,
+                    orbit_precision_policy,
+                    precision_reg if precision_policy != "profile" else None,
+                    metrics_reg,
+                    progress,
+                    leases,
+                    block_writer
+                )
+
+        except BaseException:
+            # an orbit whose lease was lost is fixed by the process that claimed it
+            if leases is None or leases.holds(orbit_apri):
+
+                fixed = _fix_problems(
+                    orbit_apri, perron_polys_reg, poly_orbit_reg, coef_orbit_reg, status_reg, periodic_reg,
+                    checkpoint_period
+                )
+
+                if fixed:
+                    log(f'Problems with {orbit_apri} fixed during exception.')
+
+            raise
+
+        finally:
+
+            if block_writer is not None:
+                block_writer.close()
+
+            if leases is not None:
+                leases.release(orbit_apri)
+
+        stopped = _is_stopped(status_reg, orbit_apri)
+
+        if stopped:
+            # the orbit will not be resumed
+            orbit_cycle_detector.close()
+
+        if progress is not None and (orbit_len == max_orbit_len or stopped):
+            # otherwise the orbit is continued by the next round
+            progress.add(units = 1)
+
+    orbit_regs = (
+        poly_orbit_reg, coef_orbit_reg, orbit_periodic_reg, orbit_monotone_reg, orbit_status_reg, resume_reg,
+        precision_reg, metrics_reg
+    )
+
+    if num_threads > 1:
+        # the threads share the registers, and cornifer does not synchronize their use
+        regs_lock = threading.RLock()
+        orbit_regs = tuple(_LockedRegister(reg, regs_lock) if reg is not None else None for reg in orbit_regs)
+
+    else:
+        regs_lock = nullcontext()
+
+    def calc_indices(poly_apri, startn, length, incomplete_indices, orbit_len):
+        """Calculate the orbits `incomplete_indices` of `poly_apri`, which belong to the `Block` of `status_reg` at
+        `startn` of length `length`, up to poly orbit length `orbit_len`."""
+
+        num_apri = ApriInfo(deg = poly_apri.deg, sum_abs_coef = poly_apri.sum_abs_coef, dps = max_dps)
+
+        try:
+
+            with setdps(max_dps):
+
+                with stack(
+                    perron_polys_reg.blk(poly_apri, startn, length, decompress = True),
+                    perron_nums_reg.blk(num_apri, startn, length, decompress = True),
+                    perron_conjs_reg.blk(num_apri, startn, length, decompress = True)
+                    if perron_conjs_reg is not None else nullcontext()
+                ) as (perron_poly_blk, perron_num_blk, perron_conj_blk):
+
+                    if batch_size > 1:
+
+                        for index in incomplete_indices:
+
+                            orbit_apri = ApriInfo(resp = poly_apri, index = index)
+                            fixed = _fix_problems(
+                                orbit_apri, perron_polys_reg, poly_orbit_reg, coef_orbit_reg, status_reg, periodic_reg
+                            )
+
+                            if fixed:
+                                log(f'Problem with {orbit_apri}; restarting from beginning.')
+
+                        for i in range(0, len(incomplete_indices), batch_size):
+
+                            batch_indices = incomplete_indices[i : i + batch_size]
+
+                            try:
+                                _batch_orbits(
+                                    poly_apri,
+                                    batch_indices,
+                                    perron_poly_blk,
+                                    perron_num_blk,
+                                    poly_orbit_reg,
+                                    coef_orbit_reg,
+                                    periodic_reg,
+                                    monotone_reg,
+                                    status_reg,
+                                    max_blk_len,
+                                    orbit_len,
+                                    max_dps,
+                                    timers,
+                                    evaluator,
+                                    evaluator_kwargs
+                                )
+
+                            except BaseException:
+
+                                for index in batch_indices:
+
+                                    orbit_apri = ApriInfo(resp = poly_apri, index = index)
+                                    fixed = _fix_problems(
+                                        orbit_apri, perron_polys_reg, poly_orbit_reg, coef_orbit_reg, status_reg,
+                                        periodic_reg
+                                    )
+
+                                    if fixed:
+                                        log(f'Problems with {orbit_apri} fixed during exception.')
+
+                                raise
+
+                    else:
+
+                        orbit_args = [
+                            (
+                                ApriInfo(resp = poly_apri, index = index), perron_poly_blk, perron_num_blk,
+                                perron_conj_blk, orbit_len
+                            )
+                            for index in incomplete_indices
+                        ]
+
+                        if num_threads == 1:
+
+                            for args in orbit_args:
+                                run_orbit(prepare_orbit(*args), *orbit_regs)
+
+                        else:
+                            _run_orbit_threads(prepare_orbit, run_orbit, orbit_args, orbit_regs, num_threads)
+
+        finally:
+
+            if status_table is not None:
+                export_status_table(status_table, status_reg, periodic_reg, monotone_reg, poly_apri, incomplete_indices)
+
+        if isinstance(timers, SamplingTimers):
+            log_timers(timers)
+
+        if progress is not None and batch_size > 1 and orbit_len == max_orbit_len:
+            progress.add(units = len(incomplete_indices))
+
     # try clause followed by except clause that calls _fix_problems
     with stack(
+        closing(progress) if progress is not None else nullcontext(),
+        closing(status_table) if status_table is not None else nullcontext(),
         perron_polys_reg.open(True), perron_nums_reg.open(True), poly_orbit_reg.open(), coef_orbit_reg.open(),
-        periodic_reg.open(), monotone_reg.open(), status_reg.open()
+        periodic_reg.open(), monotone_reg.open(), status_reg.open(),
+        perron_conjs_reg.open(True) if perron_conjs_reg is not None else nullcontext(),
+        resume_reg.open() if resume_reg is not None else nullcontext(),
+        precision_reg.open(precision_policy == "profile") if precision_reg is not None else nullcontext(),
+        metrics_reg.open() if metrics_reg is not None else nullcontext()
     ):
 
-        for poly_apri in perron_polys_reg:
-
-            num_apri = ApriInfo(deg = poly_apri.deg, sum_abs_coef = poly_apri.sum_abs_coef, dps = max_dps)
-            min_len = status_reg.apos(poly_apri).min_len
-            complete_to_max_orbit_len = min_len >= max_orbit_len if min_len != -1 else True
+        if work_queue is None:
 
-            if not complete_to_max_orbit_len:
+            if progress is not None:
+                progress.add(units_total = _count_incomplete_orbits(status_reg, max_orbit_len, num_procs, proc_index))
 
-                for blk_index, (startn, length) in enumerate(status_reg.intervals(poly_apri)):
+            for orbit_len in round_orbit_lens:
 
-                    if blk_index % num_procs == proc_index:
+                if len(round_orbit_lens) > 1:
+                    log(f'Round up to poly orbit length {orbit_len}.')
 
-                        with status_reg.blk(poly_apri, startn, length) as status_blk:
+                for poly_apri in perron_polys_reg:
 
-                            orbit_lengths = status_blk.segment[:,0]
-                            nonneg_orbit_lengths = orbit_lengths[orbit_lengths >= 0]
-                            complete_blk = len(nonneg_orbit_lengths) == 0 or np.all(nonneg_orbit_lengths >= max_orbit_len)
+                    min_len = status_reg.apos(poly_apri).min_len
+                    complete_to_orbit_len = min_len >= orbit_len if min_len != -1 else True
 
-                            if not complete_blk:
+                    if not complete_to_orbit_len:
 
-                                incomplete_indices = startn + np.nonzero(0 <= orbit_lengths < max_orbit_len)[0]
+                        for blk_index, (startn, length) in enumerate(status_reg.intervals(poly_apri)):
 
-                                with setdps(max_dps):
+                            if blk_index % num_procs == proc_index:
 
-                                    with stack(
-                                        perron_polys_reg.blk(poly_apri, startn, length, decompress = True),
-                                        perron_nums_reg.blk(num_apri, startn, length, decompress = True),
-                                    ) as (perron_poly_blk, perron_num_blk):
+                                with status_reg.blk(poly_apri, startn, length) as status_blk:
 
-                                        for index in incomplete_indices:
+                                    incomplete_indices = _get_incomplete_indices(
+                                        status_blk, np.arange(startn, startn + length), orbit_len
+                                    )
 
-                                            orbit_apri = ApriInfo(resp = poly_apri, index = index)
-                                            fixed = _fix_problems(
-                                                orbit_apri, perron_polys_reg, poly_orbit_reg, coef_orbit_reg,
-                                                status_reg, periodic_reg
-                                            )
+                                    if len(incomplete_indices) > 0:
+                                        calc_indices(poly_apri, startn, length, incomplete_indices, orbit_len)
 
-                                            if fixed:
-                                                log(f'Problem with {orbit_apri}; restarting from beginning.')
+        else:
 
-                                            p = perron_poly_blk[index]
-                                            beta0 = perron_num_blk[index].real
-                                            beta = Perron_Number(p, beta0 = beta0)
+            for deg, sum_abs_coef, startn, length, batch_indices in work_queue:
 
-                                            try:
-                                                _single_orbit(
-                                                    beta,
-                                                    orbit_apri,
-                                                    poly_orbit_reg,
-                                                    coef_orbit_reg,
-                                                    periodic_reg,
-                                                    monotone_reg,
-                                                    status_reg,
-                                                    max_blk_len,
-                                                    max_orbit_len,
-                                                    max_dps,
-                                                    timers,
-                                                    -1,
-                                                    -1
-                                                )
+                poly_apri = ApriInfo(deg = deg, sum_abs_coef = sum_abs_coef)
 
-                                            except BaseException:
+                for orbit_len in round_orbit_lens:
 
-                                                fixed = _fix_problems(
-                                                    orbit_apri, perron_polys_reg, poly_orbit_reg, coef_orbit_reg,
-                                                    status_reg, periodic_reg
-                                                )
+                    with status_reg.blk(poly_apri, startn, length) as status_blk:
+                        # orbits may have been completed since the queue was setup
+                        if progress is not None and orbit_len == round_orbit_lens[0]:
+                            progress.add(units_total = len(
+                                _get_incomplete_indices(status_blk, batch_indices, max_orbit_len)
+                            ))
 
-                                                if fixed:
-                                                    log(f'Problems with {orbit_apri} fixed during exception.')
+                        incomplete_indices = _get_incomplete_indices(status_blk, batch_indices, orbit_len)
 
-                                                raise
+                        if len(incomplete_indices) > 0:
+                            calc_indices(poly_apri, startn, length, incomplete_indices, orbit_len)
 
 def calc_orbits_setup(perron_polys_reg, perron_nums_reg, saves_dir, max_blk_len, timers, verbose = False):
     """Setup and return the `Register`s `poly_orbit_reg`, `coef_orbit_reg`, `periodic_reg`, and `status_reg`.
@@ -259,11 +795,12 @@ subreg 'perron_polys_reg', second 'index' a non-negative `int`. Each orbit gets
 respective minimal polynomial is given by `perron_polys_reg[resp, index]`.""",
         NUM_BYTES_PER_TERABYTE
     )
-    coef_orbit_reg = NumpyRegister(
+    coef_orbit_reg = PackedCoefRegister(
         saves_dir,
         "coef_orbit_reg",
-"""Coefficient orbits of Perron numbers under the beta transformation. The apri are the same as
-'poly_orbit_reg'. See `str(poly_orbit_reg)` for more information on the apri.""",
+"""Coefficient orbits of Perron numbers under the beta transformation, bit-packed on disk (cf
+`PackedCoefRegister`). The apri are the same as 'poly_orbit_reg'. See `str(poly_orbit_reg)` for more information on
+the apri.""",
         NUM_BYTES_PER_TERABYTE
     )
     periodic_reg = NumpyRegister(
@@ -287,6 +824,7 @@ Assuming that those data have been determined. (If not, then each is listed as -
   precision used, please see the 'dps' attribute of the corresponding apri of `perron_nums_reg`.
 2. Whether or not a coefficient of one of iterates of the polynomial exceeded an upper bound. This
   value is the poly orbit index of where the overflow occurred, or -1 if no such overflow occurred.
+  `calc_wide_orbits` continues such orbits in `wide_poly_orbit_reg` and keeps this value.
 If an orbit is periodic, then the 0-th entry (the poly orbit length) is listed as -1. (For the actual
 poly pre-period and period lengths, see `periodic_reg`.) Each apri of `status_reg` has an apos with one
 attribute, 'min_len' a non-negative `int`, the minimum calculated poly orbit length among all orbits
@@ -478,6 +1016,303 @@ def _update_status_reg_apos(perron_polys_reg, status_reg, timers):
                 if to_update:
                     status_reg.set_apos(perron_apri, apos, exists_ok = True)
 
+def _batch_orbits(
+    poly_apri, indices, perron_poly_blk, perron_num_blk, poly_orbit_reg, coef_orbit_reg, periodic_reg, monotone_reg,
+    status_reg, max_blk_len, max_orbit_len, max_dps, timers, evaluator, evaluator_kwargs
+):
+    """Calculate the orbits of the Perron numbers `indices` of `poly_apri` in lockstep (cf `_single_orbit` and
+    `OrbitBatch`). The new rows of `status_reg`, `periodic_reg` and `monotone_reg` are collected and written in bulk
+    every time the `Block`s are dumped, always after the orbit data they describe.
+    """
+
+    cdef INDEX_t t, slot, n, k, preperiod_len, period_len
+
+    max_prec = int(max_dps * LOG_2_10)
+    orbit_apris = []
+    min_polys = []
+    beta0s = []
+    startns = []
+    status_rows = {}
+    periodic_rows = {}
+    monotone_rows = {}
+
+    for index in indices:
+
+        last_poly_orbit_len, _, last_overflow_index = status_reg.get(poly_apri, index, mmap_mode = "r")
+
+        if last_overflow_index != -1 or periodic_reg.get(poly_apri, index, mmap_mode = "r")[0] != -1:
+            continue
+
+        beta = Perron_Number(perron_poly_blk[index], beta0 = perron_num_blk[index].real)
+
+        if calc_base2_magn_norm_max_eval(beta.beta0, beta.deg, max_prec) >= 61:
+            # same as `_single_orbit`
+            status_rows[index] = [last_poly_orbit_len, last_poly_orbit_len + 1, -1]
+            continue
+
+        orbit_apris.append(ApriInfo(resp = poly_apri, index = index))
+        min_polys.append(beta.min_poly.get_ndarray()[ : beta.deg + 1])
+        beta0s.append(beta.beta0)
+        startns.append(last_poly_orbit_len + 1)
+
+    if len(orbit_apris) == 0:
+
+        _set_rows(status_reg, poly_apri, status_rows)
+        return
+
+    deg = len(min_polys[0]) - 1
+    batch = OrbitBatch(
+        np.array(min_polys, dtype = np.int64), beta0s, max_prec, max_orbit_len, evaluator, evaluator_kwargs
+    )
+
+    for slot, (orbit_apri, startn) in enumerate(zip(orbit_apris, startns)):
+
+        if startn > 1:
+
+            checkpoint_n = 1 << (int(startn - 1).bit_length() - 1)
+            ret = monotone_reg.get(poly_apri, orbit_apri.index, mmap_mode = "r")
+            batch.restart(
+                slot,
+                startn,
+                poly_orbit_reg[orbit_apri, startn - 1].get_ndarray()[ : deg],
+                checkpoint_n,
+                poly_orbit_reg[orbit_apri, checkpoint_n].get_ndarray()[ : deg],
+                ret[0] == 1.,
+                ret[1]
+            )
+
+    coef_buf = np.empty((max_blk_len + 1, len(orbit_apris)), dtype = np.int64)
+    poly_buf = np.empty((max_blk_len, len(orbit_apris), deg), dtype = np.int64)
+    blk_startns = np.array(startns, dtype = np.int64)
+    t = 0
+
+    def dump(slot, num_coefs, num_polys):
+
+        orbit_apri = orbit_apris[slot]
+
+        for i in range(0, num_coefs, max_blk_len):
+            # a simple Parry orbit can end with one coefficient more than `max_blk_len`
+            coef_seg = coef_buf[i : min(num_coefs, i + max_blk_len), slot].tolist()
+
+            with Block(coef_seg, orbit_apri, blk_startns[slot] + i) as coef_blk:
+                coef_orbit_reg.append_disk_blk(coef_blk)
+
+        if num_polys > 0:
+
+            poly_seg = IntPolynomialArray(deg - 1).set(poly_buf[ : num_polys, slot])
+
+            with Block(poly_seg, orbit_apri, blk_startns[slot]) as poly_blk:
+                poly_orbit_reg.append_disk_blk(poly_blk)
+
+    def set_monotone_row(slot):
+
+        if batch.is_monotone[slot]:
+            monotone_rows[orbit_apris[slot].index] = [1., batch.min_blowup[slot]]
+
+        else:
+            monotone_rows[orbit_apris[slot].index] = [0., -1.]
+
+    def finish_periodic(slot, preperiod_len, period_len):
+
+        orbit_apri = orbit_apris[slot]
+        _trim_orbit(poly_orbit_reg, coef_orbit_reg, orbit_apri, preperiod_len, period_len)
+        status_rows[orbit_apri.index] = [-1, -1, -1]
+        periodic_rows[orbit_apri.index] = [preperiod_len, period_len]
+        set_monotone_row(slot)
+        log(f'Non-simple parry, periodic_reg[...] = {periodic_rows[orbit_apri.index]}')
+
+    while len(batch) > 0:
+
+        slots, ns, cn, Bn, events, ks = batch.step()
+        coef_buf[t, slots] = cn
+        poly_buf[t, slots] = Bn
+        t += 1
+
+        finished = events != RUNNING
+
+        for slot, n, event, k in zip(slots[finished], ns[finished], events[finished], ks[finished]):
+
+            index = orbit_apris[slot].index
+
+            if event == PERIODIC and k <= 1:
+                # B_n is B_0 or B_1, so it is not part of the principal poly orbit
+                dump(slot, t, t - 1)
+                finish_periodic(slot, 0, n - k)
+
+            elif event == PERIODIC:
+
+                dump(slot, t, t)
+                preperiod_len, period_len = _calc_minimal_period(
+                    0, k, n - k, get_orbit_replay(poly_orbit_reg, coef_orbit_reg, min_polys[slot], orbit_apris[slot])
+                )
+                finish_periodic(slot, preperiod_len, period_len)
+
+            elif event == SIMPLE_PARRY:
+
+                coef_buf[t, slot] = 0
+                dump(slot, t + 1, t)
+                finish_periodic(slot, n - 1, 1)
+
+            elif event == MAX_LEN:
+
+                dump(slot, t, t)
+                status_rows[index] = [max_orbit_len, -1, -1]
+                set_monotone_row(slot)
+                log(f'Max orbit length, n = {n}, quitting.')
+
+            elif event == OVERFLOW:
+
+                dump(slot, t - 1, t - 1)
+                status_rows[index] = [n - 1, -1, n]
+                log(f'large coefficient, quitting, n = {n}.')
+
+            else:
+
+                dump(slot, t - 1, t - 1)
+                status_rows[index] = [n - 1, n, -1]
+                log(f'unrecoverable precision, quitting, n = {n}.')
+
+        if t >= max_blk_len:
+
+            for slot in batch.slots:
+
+                dump(slot, t, t)
+                status_rows[orbit_apris[slot].index] = [blk_startns[slot] + t - 1, -1, -1]
+                set_monotone_row(slot)
+
+            blk_startns += t
+            t = 0
+
+        if t == 0 or len(batch) == 0:
+
+            _set_rows(monotone_reg, poly_apri, monotone_rows)
+            _set_rows(periodic_reg, poly_apri, periodic_rows)
+            _set_rows(status_reg, poly_apri, status_rows)
+
+def _set_rows(reg, apri, rows):
+    """Write `rows`, a `dict` from index to row, to `reg` one memory-mapped `Block` at a time, then clear it."""
+
+    if len(rows) == 0:
+        return
+
+    indices = np.fromiter(rows.keys(), dtype = np.int64, count = len(rows))
+    values = np.array(list(rows.values()))
+
+    for startn, length in reg.intervals(apri, diskonly = True):
+
+        mask = (startn <= indices) & (indices < startn + length)
+
+        if np.any(mask):
+
+            with reg.blk(apri, startn, length, diskonly = True, mmap_mode = "r+") as blk:
+                blk.segment[indices[mask] - startn] = values[mask]
+
+    rows.clear()
+
+class _LockedRegister:
+    """Wraps a `Register` so that every call to one of its methods holds `lock`, for the threads of `calc_orbits`.
+    `Block`s returned by `blk` also hold `lock` while they are entered and exited. The generators returned by the
+    methods (such as `intervals`) and by slices only read the register as they are consumed, so they are read into a
+    `list` while holding `lock`. `blks` is not wrapped, since its `Block`s are only open while they are yielded."""
+
+    def __init__(self, reg, lock):
+
+        self._reg = reg
+        self._lock = lock
+
+    def __getattr__(self, name):
+
+        attr = getattr(self._reg, name)
+
+        if not callable(attr):
+            return attr
+
+        def locked(*args, **kwargs):
+
+            with self._lock:
+
+                ret = attr(*args, **kwargs)
+
+                if inspect.isgenerator(ret) and name != "blks":
+                    ret = list(ret)
+
+            if name == "blk":
+                return _LockedContext(ret, self._lock)
+
+            else:
+                return ret
+
+        return locked
+
+    def __contains__(self, apri):
+
+        with self._lock:
+            return apri in self._reg
+
+    def __getitem__(self, item):
+
+        with self._lock:
+
+            ret = self._reg[item]
+            return list(ret) if inspect.isgenerator(ret) else ret
+
+    def __setitem__(self, item, value):
+
+        with self._lock:
+            self._reg[item] = value
+
+    def __iter__(self):
+
+        with self._lock:
+            return iter(list(self._reg))
+
+    def __str__(self):
+        return str(self._reg)
+
+class _LockedContext:
+
+    def __init__(self, context, lock):
+
+        self._context = context
+        self._lock = lock
+
+    def __enter__(self):
+
+        with self._lock:
+            return self._context.__enter__()
+
+    def __exit__(self, *exc_info):
+
+        with self._lock:
+            return self._context.__exit__(*exc_info)
+
+def _prepare_run_orbit(prepare_orbit, run_orbit, args, orbit_regs):
+    run_orbit(prepare_orbit(*args), *orbit_regs)
+
+def _run_orbit_threads(prepare_orbit, run_orbit, orbit_args, orbit_regs, num_threads):
+    """Call `run_orbit(prepare_orbit(*args), *orbit_regs)` for every `args` of `orbit_args` on a pool of `num_threads`
+    threads. An orbit is prepared, and so its lease claimed, by the thread that calculates it, so that the leases of
+    the orbits waiting for a thread are not left to expire. If a call raises, the calls that have not started are
+    cancelled, and the first exception is raised once the running calls have returned."""
+
+    with ThreadPoolExecutor(max_workers = num_threads) as executor:
+
+        futures = [
+            executor.submit(_prepare_run_orbit, prepare_orbit, run_orbit, args, orbit_regs) for args in orbit_args
+        ]
+
+        try:
+
+            for future in futures:
+                future.result()
+
+        except BaseException:
+
+            for future in futures:
+                future.cancel()
+
+            raise
+
 cdef ERR_t _single_orbit(
     object beta,
     object orbit_apri,
@@ -491,23 +1326,48 @@ cdef ERR_t _single_orbit(
     DPS_t max_dps,
     object timers,
     DPS_t constant_y_dps,
-    DPS_t constant_x_dps
+    DPS_t constant_x_dps,
+    XiEvaluator evaluator,
+    CycleDetector cycle_detector,
+    INDEX_t checkpoint_period,
+    object resume_reg,
+    PrecisionPolicy precision_policy,
+    object precision_reg,
+    object metrics_reg,
+    object progress,
+    object leases,
+    object block_writer
 ):
 
     cdef DEG_t j, deg
     cdef INDEX_t n, k, preperiod_len, period_len
-    cdef DPS_t current_x_prec, current_y_prec, original_dps, x_y_prec_offset, x_prec_lower_bound
-    cdef IntPolynomial min_poly, Bn, Bn_1, Bk, B0, B1
+    cdef DPS_t current_x_prec, current_y_prec, x_y_prec_offset, x_prec_lower_bound
+    cdef IntPolynomial min_poly, Bn, Bn_1
+    cdef const COEF_t[:] Bn_1_coefs, min_poly_coefs, B0_coefs, B1_coefs
+    cdef COEF_t[:] Bn_coefs
+    cdef BOOL_t is_B0, is_B1
+    cdef CALC_BN_KERNEL_t calc_Bn_kernel
     cdef IntPolynomialArray poly_seg
-    cdef MPF_t beta0, xi
+    cdef MPF_t beta0
     cdef C_t cn
-    cdef BOOL_t simple_parry, n_even, is_monotone
+    cdef BOOL_t simple_parry, is_monotone
     cdef float min_blowup
-    cdef COEF_t max_abs_coef, curr_max_abs_coef, max_max_abs_coef, base2_magn_norm_max_eval, beta0_ceil, base2_magn_beta0_ceil
+    cdef COEF_t max_abs_coef, curr_max_abs_coef, max_max_abs_coef, base2_magn_norm_max_eval, beta0_ceil
     cdef DPS_t PREC_INCREASE_FACTOR = 2
     cdef DPS_t max_prec = int(max_dps * LOG_2_10)
     cdef DPS_t constant_y_prec, constant_x_prec
-    cdef BOOL_t prec_is_constant
+    cdef BOOL_t prec_is_constant, resumed
+    # running statistics, kept in the resume record
+    cdef INDEX_t num_prec_increases = 0
+    cdef DPS_t max_x_prec_used = 0
+    cdef DPS_t step_prec_increases
+    # hot-path counters, saved to `metrics_reg`
+    cdef OrbitMetrics metrics = OrbitMetrics()
+    cdef N_t t0, step_evals
+    cdef DPS_t coef_bits
+    cdef INDEX_t progress_n
+    cdef N_t progress_ns
+    cdef BOOL_t lease_lost = FALSE
 
     if (constant_y_dps == -1) != (constant_x_dps == -1):
         raise ValueError
@@ -526,18 +1386,14 @@ cdef ERR_t _single_orbit(
     debug = False
     beta0 = beta.beta0
 
-    try:
-        beta0_ceil = int(mpmath.ceil(beta0))
-
-    except:
-
-        print(beta0)
-        raise
-    beta0_floor = int(beta0)
-    base2_magn_beta0_ceil = _base2_magn(beta0_ceil)
-    B0 = IntPolynomial(0).set([1])
-    B1 = IntPolynomial(1).set([-int(beta0), 1])
+    beta0_ceil = int(mpmath.ceil(beta0))
     deg = beta.deg
+    # B_0 and B_1, padded to `deg` coefficients so that they can be compared with the iterates by `_coefs_eq`
+    B0_coefs = np.array([1] + [0] * (deg - 1), dtype = COEF_DTYPE)
+    B1_coefs = np.array([-int(beta0), 1] + [0] * (deg - 2), dtype = COEF_DTYPE)
+    min_poly_coefs = min_poly.get_ndarray()[ : deg + 1].astype(COEF_DTYPE)
+    # every orbit of an apri of `perron_polys_reg` has the same degree, `poly_apri.deg`
+    calc_Bn_kernel = _get_calc_Bn_kernel(deg)
     base2_magn_max_max_abs_coef = 61
     poly_apri = orbit_apri.resp
     # get startup info
@@ -567,27 +1423,51 @@ cdef ERR_t _single_orbit(
     coef_seg = []
     poly_seg = IntPolynomialArray(min_poly.deg() - 1)
     poly_seg.empty(max_blk_len)
+    checkpoint_apri = get_checkpoint_apri(orbit_apri, checkpoint_period)
     coef_blk = Block(coef_seg, orbit_apri, startn)
-    poly_blk = Block(poly_seg, orbit_apri, startn)
-    original_dps = mpmath.mp.dps
+    # only B_n for n divisible by `checkpoint_period` are saved, B_{j * checkpoint_period} at index j
+    poly_blk = Block(poly_seg, checkpoint_apri, (startn - 1) // checkpoint_period + 1)
+    replay = OrbitReplay(
+        min_poly.get_ndarray()[ : deg + 1],
+        checkpoint_period,
+        lambda j: poly_orbit_reg[checkpoint_apri, j].get_ndarray(),
+        lambda startn_, stopn_: _get_coefs(coef_orbit_reg, orbit_apri, coef_blk, startn_, stopn_, max_blk_len),
+        lambda startj, stopj: (poly.get_ndarray() for poly in poly_orbit_reg[checkpoint_apri, startj : stopj])
+    )
     log(f'startn = {startn}')
-
-    with setdps(max_dps):
-        print('top', beta0)
+    # the coefficients up to c_{progress_n} have been published to `progress`
+    progress_n = startn - 1
+    progress_ns = _now_ns()
 
     with stack(coef_blk, poly_blk):
 
-        try:
-            # try clause followed by a finally clause that removes all RAM blocks from poly_orbit_reg
-            # (coef_orbit_reg has no RAM blocks)
-            # and resets mpmath.mp.dps to its original value
-            poly_orbit_reg.add_ram_blk(poly_blk)
+        poly_orbit_reg.add_ram_blk(poly_blk)
 
-            if startn > 1:
+        try:
+            # try clause followed by a finally clause that removes the RAM block of this orbit from poly_orbit_reg
+            # (coef_orbit_reg has no RAM blocks), leaving those of the orbits calculated by other threads
+            resumed = FALSE
+
+            if startn > 1 and resume_reg is not None:
+
+                record = resume_reg.get(poly_apri, orbit_apri.index, mmap_mode = "r")
+                resumed = TRUE if record[RESUME_N] == startn - 1 else FALSE
+
+            if resumed == TRUE:
+                # setup restart info from the resume record, without reading the orbit
+                (
+                    x_y_prec_offset, record_is_monotone, min_blowup, num_prec_increases, max_x_prec_used,
+                    precision_state, record_Bn, state
+                ) = read_resume_record(record, deg)
+                Bn_1 = IntPolynomial(min_poly.deg() - 1).set(record_Bn)
+                cycle_detector.set_state(startn - 1, state)
+                precision_policy.set_state(precision_state)
+                is_monotone = TRUE if record_is_monotone else FALSE
+
+            elif startn > 1:
                 # setup restart info
-                Bn_1 = poly_orbit_reg[orbit_apri, startn - 1]
-                k = (startn + 1) // 2
-                Bk_iter = poly_orbit_reg[orbit_apri, k : ]
+                Bn_1 = IntPolynomial(min_poly.deg() - 1).set(replay(startn - 1))
+                cycle_detector.restart(startn - 1, replay)
                 ret = monotone_reg.get(poly_apri, orbit_apri.index, mmap_mode = 'r')
                 is_monotone = TRUE if ret[0] == 1. else FALSE
                 min_blowup = ret[1]
@@ -597,21 +1477,38 @@ cdef ERR_t _single_orbit(
                 Bn_1 = IntPolynomial(min_poly.deg() - 1)
                 Bn_1.zero_poly()
                 Bn_1.c_set_coef(0, 1)
-                Bk_iter = poly_orbit_reg[orbit_apri, 1:]
                 is_monotone = TRUE
                 min_blowup = 0.
 
+            # B_n is calculated in place in the spare buffer `Bn`, and the two buffers are swapped after every step
+            Bn = IntPolynomial(min_poly._deg - 1)
+            Bn.zero_poly()
+
+            if startn > 1 and precision_reg is not None:
+
+                profile = precision_reg.get(poly_apri, orbit_apri.index, mmap_mode = "r")
+
+                if profile[PROFILE_N] == startn - 1:
+                    precision_policy.set_profile(profile)
+
+            if startn > 1 and metrics_reg is not None:
+
+                metrics_row = metrics_reg.get(poly_apri, orbit_apri.index, mmap_mode = "r")
+
+                if metrics_row[METRICS_N] == startn - 1:
+                    metrics.set_row(metrics_row)
+
             if not prec_is_constant:
                 # x_y_prec_offset is derived from massaging the first order approximation of the rounding error and
                 # taking logs
                 # x_y_prec_offset will change as Bn_1 changes (cf _prec_offset)
-                initial_y_prec = 16
-                x_y_prec_offset = (
-                    1 +
-                    2 * _base2_magn(deg) +
-                    _base2_magn(Bn_1.max_abs_coef()) +
-                    deg * _base2_magn(beta0_ceil + 1)
-                )
+                if resumed == FALSE:
+                    x_y_prec_offset = (
+                        1 +
+                        2 * _base2_magn(deg) +
+                        _base2_magn(Bn_1.max_abs_coef()) +
+                        deg * _base2_magn(beta0_ceil + 1)
+                    )
 
                 if deg == 2:
                     x_prec_lower_bound = 1
@@ -637,16 +1534,7 @@ cdef ERR_t _single_orbit(
                 return 0
             # base2_magn_norm_max_eval is a scaling factor that is used to detect potential overflow errors. it is derived by
             # massaging the truncated geometric series of degree `deg - 1` and taking logs.
-            base2_magn_norm_max_eval = (deg + 1) * base2_magn_beta0_ceil
-
-            if beta0 >= 2:
-                # this one gets smaller
-                base2_magn_norm_max_eval -= _base2_magn(beta0_floor - 1) - 1
-
-            else:
-                # this one gets bigger
-                with setprec(max_prec):
-                    base2_magn_norm_max_eval -= int(mpmath.log(beta0 - 1, 2))
+            base2_magn_norm_max_eval = calc_base2_magn_norm_max_eval(beta0, deg, max_prec)
 
             if base2_magn_norm_max_eval >= base2_magn_max_max_abs_coef:
                 status_reg[orbit_apri.resp, orbit_apri.index] = np.array([startn - 1, startn, -1])
@@ -656,7 +1544,7 @@ cdef ERR_t _single_orbit(
                 # primary orbit iteration loop
                 if prec_is_constant == FALSE:
 
-                    current_y_prec = initial_y_prec
+                    current_y_prec = precision_policy.initial_y_prec(n)
                     current_x_prec = current_y_prec + x_y_prec_offset
 
                     if current_x_prec < x_prec_lower_bound:
@@ -672,14 +1560,15 @@ cdef ERR_t _single_orbit(
                     current_x_prec = constant_x_prec
                     current_y_prec = constant_y_prec
 
-                mpmath.mp.prec = current_x_prec
-                k = n // 2
-                n_even = TRUE if 2 * k == n else FALSE
                 do_while = TRUE
+                step_prec_increases = 0
+                step_evals = 0
+                coef_bits = _base2_magn(Bn_1.max_abs_coef())
 
-                if _base2_magn(Bn_1.max_abs_coef()) + base2_magn_norm_max_eval > base2_magn_max_max_abs_coef:
+                if coef_bits + base2_magn_norm_max_eval > base2_magn_max_max_abs_coef:
                     # large coefficients found
                     log(f'large coefficient, quitting, n = {n}, Bn_1 = {Bn_1}.')
+                    _flush_writes(block_writer)
 
                     if len(coef_blk) > 0:
                         coef_orbit_reg.append_disk_blk(coef_blk)
@@ -690,18 +1579,23 @@ cdef ERR_t _single_orbit(
                     status_reg[poly_apri, orbit_apri.index] = np.array([n-1, -1, n])
                     return 0
 
+                t0 = _now_ns()
+
                 while do_while:
                     # calculate next iterate and increase prec if necessary
-                    Bn_1.c_eval(beta0, FALSE)
-                    xi = beta0 * Bn_1.last_eval
+                    cn = evaluator.floor_xi(Bn_1._ro_coefs, current_x_prec, current_y_prec)
+                    step_evals += 1
+                    do_while = TRUE if cn == AMBIGUOUS else FALSE
 
-                    with setprec(current_y_prec):
-                        do_while = TRUE if _incr_prec(xi) else FALSE
+                    if current_x_prec > max_x_prec_used:
+                        max_x_prec_used = current_x_prec
 
                     if do_while == TRUE:
                         # precision error encountered
                         if prec_is_constant == FALSE and current_x_prec < max_prec:
                             # increase prec if we haven't hit max_prec, reset
+                            num_prec_increases += 1
+                            step_prec_increases += 1
                             current_y_prec *= PREC_INCREASE_FACTOR
                             current_x_prec = current_y_prec + x_y_prec_offset
 
@@ -710,11 +1604,11 @@ cdef ERR_t _single_orbit(
                                 current_x_prec = max_prec
                                 current_y_prec = current_x_prec - x_y_prec_offset
 
-                            mpmath.mp.prec = current_x_prec
-
                         else:
                             # likely simple Parry number detected
-                            if xi < 0:
+                            _flush_writes(block_writer)
+
+                            if evaluator.last_xi < 0:
                                 # unrecoverable precision error
                                 if len(coef_blk) > 0:
                                     coef_orbit_reg.append_disk_blk(coef_blk)
@@ -725,18 +1619,15 @@ cdef ERR_t _single_orbit(
                                 status_reg.set(
                                     poly_apri, orbit_apri.index, [n - 1, n, -1], mmap_mode = "r+"
                                 )
-                                print('error 1', prec_is_constant, current_x_prec, max_prec, xi)
-                                log(f'unrecoverable precision, quitting, n = {n}, xi = {xi}.')
+                                log(f'unrecoverable precision, quitting, n = {n}, xi = {evaluator.last_xi}.')
                                 return 0
 
-                            cn = _round(xi)
+                            cn = _round(evaluator.last_xi)
 
                             if cn == 0:
-                                print('error 2')
                                 log(f'unrecoverable precision, quitting, n = {n}.')
                                 status_reg.set(poly_apri, orbit_apri.index, [n - 1, n, -1], mmap_mode="r+")
 
-                            Bn = IntPolynomial(min_poly._deg - 1)
                             _calc_Bn(Bn_1, cn, min_poly, Bn)
 
                             for j in range(min_poly._deg):
@@ -750,7 +1641,6 @@ cdef ERR_t _single_orbit(
                                         poly_orbit_reg.append_disk_blk(poly_blk)
 
                                     log(f'unrecoverable precision, quitting, n = {n}, Bn = {Bn}.')
-                                    print('error 3')
                                     status_reg.set(poly_apri, orbit_apri.index, [n - 1, n, -1], mmap_mode="r+")
                                     return 0
 
@@ -765,7 +1655,9 @@ cdef ERR_t _single_orbit(
                                     coef_seg.clear()
 
                                 coef_seg.append(0)
-                                poly_seg.append(Bn)
+
+                                if n % checkpoint_period == 0:
+                                    poly_seg.append(Bn)
 
                                 if len(coef_blk) > 0:
                                     coef_orbit_reg.append_disk_blk(coef_blk)
@@ -774,41 +1666,57 @@ cdef ERR_t _single_orbit(
                                     poly_orbit_reg.append_disk_blk(poly_blk)
 
                                 _cleanup_register(
-                                    min_poly, poly_orbit_reg, coef_orbit_reg, status_reg, periodic_reg, orbit_apri, n - 1, 1
+                                    min_poly, poly_orbit_reg, coef_orbit_reg, status_reg, periodic_reg, orbit_apri, n - 1, 1,
+                                    checkpoint_period
                                 )
                                 _set_monotone_data(is_monotone, monotone_reg, poly_apri, orbit_apri, min_blowup)
                                 log(f'Simple parry, periodic_reg[...] = {periodic_reg[orbit_apri.resp, orbit_apri.index]}')
                                 return 0
 
-                cn = _calc_cn(xi)
+                metrics.eval_ns += _now_ns() - t0
+                metrics.record_step(n, step_evals, coef_bits)
+                precision_policy.record(n, current_x_prec, current_y_prec, step_prec_increases)
+                evaluator.advance(cn)
 
                 if cn > beta0:
 
+                    _flush_writes(block_writer)
+
                     if len(coef_blk) > 0:
                         coef_orbit_reg.append_disk_blk(coef_blk)
 
                     if len(poly_blk) > 0:
                         poly_orbit_reg.append_disk_blk(poly_blk)
 
-                    print('error 4', cn, xi)
-                    log(f'unrecoverable precision, quitting, n = {n}, Bn = {Bn}.')
+                    log(f'unrecoverable precision, quitting, n = {n}, Bn_1 = {Bn_1}.')
                     status_reg.set(poly_apri, orbit_apri.index, [n - 1, n, -1], mmap_mode="r+")
                     return 0
 
-                Bn = IntPolynomial(min_poly._deg - 1)
-                _calc_Bn(Bn_1, cn, min_poly, Bn)
-                print(cn, xi, Bn, Bn._deg, min_poly, min_poly._deg)
-                min_blowup = _calc_min_blowup(is_monotone, n, min_poly._deg, min_blowup, Bn_1, Bn)
+                Bn_1_coefs = Bn_1._ro_coefs
+                Bn_coefs = Bn._rw_coefs
+                t0 = _now_ns()
+
+                with nogil, cython.boundscheck(False), cython.wraparound(False):
+
+                    calc_Bn_kernel(&Bn_1_coefs[0], cn, &min_poly_coefs[0], &Bn_coefs[0], deg)
+                    min_blowup = _calc_min_blowup(is_monotone, n, deg, min_blowup, Bn_1_coefs, Bn_coefs)
+                    is_B1 = n >= 2 and _coefs_eq(Bn_coefs, B1_coefs, deg)
+                    is_B0 = _coefs_eq(Bn_coefs, B0_coefs, deg)
+
+                Bn._deg = calc_deg(Bn._ro_array, 0)
+                metrics.calc_Bn_ns += _now_ns() - t0
 
                 if min_blowup == -1:
                     is_monotone = FALSE
 
                 coef_seg.append(cn)
 
-                if n >= 2 and Bn == B1:
+                if is_B1:
                     # current poly is equal to B1 (the 1st poly)
-                    # this check isn't strictly necessary because `_calc_minimal_period` can do the same work, but it
+                    # this check isn't strictly necessary because `cycle_detector` can do the same work, but it
                     # is a lot faster to check here and many orbits repeat at B1
+                    _flush_writes(block_writer)
+
                     if len(poly_blk) > 0:
                         poly_orbit_reg.append_disk_blk(poly_blk)
 
@@ -819,8 +1727,10 @@ cdef ERR_t _single_orbit(
                     return 0
 
 
-                elif Bn == B0:
+                elif is_B0:
                     # current poly is identically 1 (the 0th poly)
+                    _flush_writes(block_writer)
+
                     if len(poly_blk) > 0:
                         poly_orbit_reg.append_disk_blk(poly_blk)
 
@@ -830,43 +1740,92 @@ cdef ERR_t _single_orbit(
                     log(f'Non-simple parry, periodic_reg[...] = {periodic_reg[orbit_apri.resp, orbit_apri.index]}')
                     return 0
 
-                poly_seg.append(Bn)
+                if n % checkpoint_period == 0:
+                    poly_seg.append(Bn)
+
                 x_y_prec_offset += _prec_offset(Bn, Bn_1)
-                Bn_1 = Bn
+                Bn_1, Bn = Bn, Bn_1
+                t0 = _now_ns()
+                # B_n is in `Bn_1` after the swap
+                k = cycle_detector.update(n, Bn_1._ro_coefs)
+                metrics.cycle_check_ns += _now_ns() - t0
 
-                if n_even == TRUE:
-                    Bk = next(Bk_iter)
+                if progress is not None and t0 - progress_ns >= PROGRESS_PERIOD_NS:
+                    # long `Block`s are dumped rarely, and the rates and RSS of `progress` would go stale in between
+                    progress_ns = t0
 
-                if n_even == TRUE and Bk.c_eq(Bn) == TRUE:
+                    if metrics.last_n > progress_n:
+                        progress_n = _add_progress(progress, metrics.last_n, progress_n)
 
-                    # found period for non-simple Parry
-                    preperiod_len, period_len = _calc_minimal_period(k, Bk, poly_orbit_reg, orbit_apri)
+                    else:
+                        progress.update()
+
+                if k > 0:
+
+                    # found period for non-simple Parry, B_k == B_n; the iterates are replayed from the registers
+                    _flush_writes(block_writer)
+                    preperiod_len, period_len = _calc_minimal_period(
+                        cycle_detector.preperiod_lower_bound(), k, n - k, replay
+                    )
                     principal_len = preperiod_len + period_len
 
                     if principal_len >= coef_blk.startn: # if current block included in principal orbit
                         coef_orbit_reg.append_disk_blk(coef_blk)
 
-                    if principal_len + 1 >= poly_blk.startn:
+                    if len(poly_blk) > 0 and (principal_len + 1) // checkpoint_period >= poly_blk.startn:
                         # + 1 because principal coef orbit has longer length than principal poly orbit
                         poly_orbit_reg.append_disk_blk(poly_blk)
 
                     _cleanup_register(
-                        min_poly, poly_orbit_reg, coef_orbit_reg, status_reg, periodic_reg, orbit_apri, preperiod_len, period_len
+                        min_poly, poly_orbit_reg, coef_orbit_reg, status_reg, periodic_reg, orbit_apri, preperiod_len, period_len,
+                        checkpoint_period
                     )
                     _set_monotone_data(is_monotone, monotone_reg, poly_apri, orbit_apri, min_blowup)
                     log(f'Non-simple parry, periodic_reg[...] = {periodic_reg[orbit_apri.resp, orbit_apri.index]}')
                     return 0
 
                 if len(coef_blk) >= max_blk_len:
+
+                    if leases is not None and not leases.renew(orbit_apri):
+                        # another process claimed the orbit, which must be left as it was
+                        log(f'Lost the lease of {orbit_apri}, quitting, n = {n}.')
+                        lease_lost = TRUE
+                        return 0
+
                     # dump blk and clear seg
-                    for reg, seg, blk in [(coef_orbit_reg, coef_seg, coef_blk), (poly_orbit_reg, poly_seg, poly_blk)]:
+                    t0 = _now_ns()
+
+                    if block_writer is None:
+                        _dump_blks(
+                            coef_orbit_reg, poly_orbit_reg, monotone_reg, status_reg, coef_blk, poly_blk, orbit_apri,
+                            n, is_monotone, min_blowup
+                        )
+
+                    else:
+                        # the orbit continues into the cleared segments while copies of them are written
+                        block_writer.submit(
+                            _dump_blks, coef_orbit_reg, poly_orbit_reg, monotone_reg, status_reg,
+                            _copy_blk(coef_blk, orbit_apri), _copy_blk(poly_blk, checkpoint_apri), orbit_apri, n,
+                            is_monotone, min_blowup
+                        )
+
+                    for seg, blk in [(coef_seg, coef_blk), (poly_seg, poly_blk)]:
 
-                        reg.append_disk_blk(blk)
                         blk.startn = blk.startn + len(blk)
                         seg.clear()
 
-                    _set_monotone_data(is_monotone, monotone_reg, poly_apri, orbit_apri, min_blowup)
-                    status_reg.set(poly_apri, orbit_apri.index, [n, -1, -1], mmap_mode = "r+")
+                    _set_resume_record(
+                        resume_reg, orbit_apri, n, x_y_prec_offset, is_monotone == TRUE, min_blowup,
+                        num_prec_increases, max_x_prec_used, precision_policy.get_state(), Bn_1.get_ndarray(),
+                        cycle_detector.get_state()
+                    )
+                    _set_precision_profile(precision_reg, orbit_apri, precision_policy)
+                    metrics.num_blk_dumps += 1
+                    metrics.io_ns += _now_ns() - t0
+                    _set_metrics(metrics_reg, orbit_apri, metrics)
+                    progress_n = _add_progress(progress, metrics.last_n, progress_n)
+
+            _flush_writes(block_writer)
 
             if len(coef_blk) > 0:
                 coef_orbit_reg.append_disk_blk(coef_blk)
@@ -875,49 +1834,71 @@ cdef ERR_t _single_orbit(
                 poly_orbit_reg.append_disk_blk(poly_blk)
 
             _set_monotone_data(is_monotone, monotone_reg, poly_apri, orbit_apri, min_blowup)
+            _set_resume_record(
+                resume_reg, orbit_apri, n, x_y_prec_offset, is_monotone == TRUE, min_blowup, num_prec_increases,
+                max_x_prec_used, precision_policy.get_state(), Bn_1.get_ndarray(), cycle_detector.get_state()
+            )
             log(f'Max orbit length, n = {n}, quitting.')
             status_reg.set(poly_apri, orbit_apri.index, [max_poly_orbit_len, -1, -1], mmap_mode = "r+")
 
         finally:
 
-            poly_orbit_reg.rmv_all_ram_blks()
-            mpmath.mp.dps = original_dps
+            if lease_lost == FALSE:
+                # the profile of a finished orbit is kept for later runs with constant precision (cf `calc_orbits`)
+                _set_precision_profile(precision_reg, orbit_apri, precision_policy)
+                _set_metrics(metrics_reg, orbit_apri, metrics)
 
-    return  0
-
-cdef (INDEX_t, INDEX_t) _calc_minimal_period(INDEX_t k, IntPolynomial Bk, object poly_orbit_reg, object B_apri) except *:
+            _add_progress(progress, metrics.last_n, progress_n)
+            log(f'evaluator stats = {evaluator.stats()}')
+            poly_orbit_reg.rmv_ram_blk(poly_blk)
+            # the orbit is done only once its last `Block`s are written
+            _flush_writes(block_writer)
 
-    cdef INDEX_t period_len, preperiod_len
-    cdef IntPolynomial Bkp, B1, B2
+    return  0
 
-    for period_len in range(1, 2 + k // 2):
+def _get_coefs(coef_orbit_reg, orbit_apri, coef_blk, startn, stopn, max_blk_len):
+    """c_startn, ..., c_{stopn - 1} as a generator, where the coefficients from `coef_blk.startn` on are read from
+    `coef_blk`, which has not been appended to `coef_orbit_reg` yet. The others are read at most `max_blk_len` at a
+    time."""
 
-        if k % period_len == 0 or period_len == 1 + k // 2:
+    disk_stopn = min(stopn, coef_blk.startn)
 
-            if period_len == 1 + k // 2:
-                period_len = k
+    for i in range(startn, disk_stopn, max_blk_len):
+        yield from coef_orbit_reg[orbit_apri, i : min(i + max_blk_len, disk_stopn)]
 
-            Bkp = poly_orbit_reg.get(B_apri, k + period_len, mmap_mode ="r")
+    yield from coef_blk.segment[max(startn, coef_blk.startn) - coef_blk.startn : max(0, stopn - coef_blk.startn)]
 
-            if Bk.c_eq(Bkp):
+cdef (INDEX_t, INDEX_t) _calc_minimal_period(
+    INDEX_t lower, INDEX_t k, INDEX_t period_len, object replay
+) except *:
+    """B_k == B_{k + period_len}, where `period_len` is minimal and the poly preperiod length is at least `lower`.
+    Only the iterates between `lower` and `k + period_len` are read, from the `OrbitReplay` `replay`.
+    """
 
-                for preperiod_len, (B1, B2) in enumerate(
-                    zip(poly_orbit_reg[B_apri, : k + 1], poly_orbit_reg[B_apri, period_len + 1 : k + period_len + 1])
-                ):
+    cdef INDEX_t preperiod_len
 
-                    if B1.c_eq(B2):
-                        break # preperiod_len loop
+    for preperiod_len, (B1, B2) in enumerate(
+        zip(
+            replay.iter(lower + 1, k + 1),
+            replay.iter(lower + period_len + 1, k + period_len + 1)
+        ),
+        lower
+    ):
 
-                break # period_len loop
+        if np.array_equal(B1, B2):
+            break
 
     else:
         raise RuntimeError
 
     return preperiod_len, period_len
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
 cdef float _calc_min_blowup(
-    BOOL_t is_monotone, INDEX_t n, DEG_t deg, float min_blowup, IntPolynomial Bn_1, IntPolynomial Bn
-) except -2:
+    BOOL_t is_monotone, INDEX_t n, DEG_t deg, float min_blowup, const COEF_t[:] Bn_1, const COEF_t[:] Bn
+) noexcept nogil:
 
     cdef DEG_t j
     cdef COEF_t c1, c2, c1_abs, c2_abs
@@ -933,8 +1914,8 @@ cdef float _calc_min_blowup(
 
         for j in range(deg):
 
-            c1 = Bn_1._ro_coefs[j]
-            c2 = Bn._ro_coefs[j]
+            c1 = Bn_1[j]
+            c2 = Bn[j]
 
             if c1 == 0:
 
@@ -958,28 +1939,53 @@ cdef float _calc_min_blowup(
                 else:
                     c2_abs = -c2
 
-                quo = c2_abs / c1_abs
+                quo = (<float> c2_abs) / c1_abs
 
                 if quo < min_blowup:
                     min_blowup = quo
 
         return min_blowup
 
-def _cleanup_register(min_poly, poly_orbit_reg, coef_orbit_reg, status_reg, periodic_reg, orbit_apri, preperiod_len, period_len):
+def _cleanup_register(
+    min_poly, poly_orbit_reg, coef_orbit_reg, status_reg, periodic_reg, orbit_apri, preperiod_len, period_len,
+    checkpoint_period = 1
+):
+
+    _trim_orbit(
+        poly_orbit_reg, coef_orbit_reg, orbit_apri, preperiod_len, period_len, checkpoint_period = checkpoint_period
+    )
+    _set_periodic_info(status_reg, periodic_reg, orbit_apri, preperiod_len, period_len)
+
+def _trim_orbit(
+    poly_orbit_reg, coef_orbit_reg, orbit_apri, preperiod_len, period_len, wide_poly_orbit_reg = None,
+    checkpoint_period = 1
+):
+    """Remove the data past the principal orbit from `poly_orbit_reg` and `coef_orbit_reg` (and
+    `wide_poly_orbit_reg`, if given)."""
+
+    principal_len = preperiod_len + period_len
+    orbit_regs = [
+        (poly_orbit_reg, get_checkpoint_apri(orbit_apri, checkpoint_period), principal_len // checkpoint_period),
+        (coef_orbit_reg, orbit_apri, principal_len + 1)
+    ]
+
+    if wide_poly_orbit_reg is not None:
+        orbit_regs.append((wide_poly_orbit_reg, orbit_apri, principal_len))
 
-    for orbit_reg, preperiod_len_ in ((poly_orbit_reg, preperiod_len), (coef_orbit_reg, preperiod_len + 1)):
+    for orbit_reg, apri, principal_len in orbit_regs:
 
-        principal_len = period_len + preperiod_len_
+        if apri not in orbit_reg:
+            continue
 
-        for startn, length in orbit_reg.intervals(orbit_apri, diskonly = True):
+        for startn, length in orbit_reg.intervals(apri, diskonly = True):
 
             if principal_len < startn:
                 # principal orbit does not intersect this block
-                orbit_reg.rmv_disk_blk(orbit_apri, startn, length)
+                orbit_reg.rmv_disk_blk(apri, startn, length)
 
             elif principal_len < startn + length - 1:
                 # principal orbit partially (but not completely) includes this block
-                with orbit_reg.blk(orbit_apri, startn, length, diskonly = True) as old_blk:
+                with orbit_reg.blk(apri, startn, length, diskonly = True) as old_blk:
 
                     old_seg = old_blk.segment
 
@@ -993,58 +1999,67 @@ def _cleanup_register(min_poly, poly_orbit_reg, coef_orbit_reg, status_reg, peri
                     else:
                         new_seg = old_blk[startn : principal_len + 1] # +1 bc coef sequence is 1-indexed
 
-                with Block(new_seg, orbit_apri, startn) as new_blk:
+                with Block(new_seg, apri, startn) as new_blk:
                     orbit_reg.add_disk_blk(new_blk)
 
-                orbit_reg.rmv_disk_blk(orbit_apri, startn, length)
-
-    _set_periodic_info(status_reg, periodic_reg, orbit_apri, preperiod_len, period_len)
+                orbit_reg.rmv_disk_blk(apri, startn, length)
 
 def _set_periodic_info(status_reg, periodic_reg, orbit_apri, preperiod_len, period_len):
 
     status_reg.set(orbit_apri.resp, orbit_apri.index, [-1, -1, -1], mmap_mode = "r+")
     periodic_reg.set(orbit_apri.resp, orbit_apri.index, [preperiod_len, period_len], mmap_mode = "r+")
 
-def _fix_problems(orbit_apri, perron_polys_reg, poly_orbit_reg, coef_orbit_reg, status_reg, periodic_reg):
+def _fix_problems(
+    orbit_apri, perron_polys_reg, poly_orbit_reg, coef_orbit_reg, status_reg, periodic_reg, checkpoint_period = 1
+):
 
-    poly_orbit_reg_has_orbit_apri = orbit_apri in poly_orbit_reg
+    checkpoint_apri = get_checkpoint_apri(orbit_apri, checkpoint_period)
     preperiod_len, period_len = periodic_reg[orbit_apri.resp, orbit_apri.index]
     is_periodic = preperiod_len != -1
     principal_len = preperiod_len + period_len
+    poly_orbit_len, prec_err_index, overflow_index = status_reg[orbit_apri.resp, orbit_apri.index]
 
     try:
 
-        assert poly_orbit_reg_has_orbit_apri == (orbit_apri in coef_orbit_reg)
-
-        if poly_orbit_reg_has_orbit_apri:
+        if orbit_apri in coef_orbit_reg:
 
             assert is_periodic == (period_len != -1)
 
+            # iterates at and past the overflow index are in `wide_poly_orbit_reg` (cf `calc_wide_orbits`)
             if is_periodic:
 
-                assert (
-                    poly_orbit_reg.len(orbit_apri, True) == poly_orbit_reg.len(orbit_apri, False) ==
-                    principal_len
-                )
-                assert (
-                    coef_orbit_reg.len(orbit_apri, True) == coef_orbit_reg.len(orbit_apri, False) ==
-                    principal_len + 1
-                )
-                assert np.all(status_reg[orbit_apri.resp, orbit_apri.index] == np.array([-1, -1, -1]))
+                poly_len = principal_len if overflow_index == -1 else min(principal_len, overflow_index - 1)
+                coef_len = principal_len + 1
+                assert poly_orbit_len == prec_err_index == -1
 
             else:
+
+                poly_len = poly_orbit_len if overflow_index == -1 else overflow_index - 1
+                coef_len = poly_orbit_len
+
+            assert coef_orbit_reg.len(orbit_apri, True) == coef_orbit_reg.len(orbit_apri, False) == coef_len
+            # only every `checkpoint_period`-th poly is saved (cf `_single_orbit`)
+            num_polys = poly_len // checkpoint_period
+
+            if num_polys > 0:
+
                 assert (
-                    poly_orbit_reg.len(orbit_apri, True) == poly_orbit_reg.len(orbit_apri, False) ==
-                    coef_orbit_reg.len(orbit_apri, True) == coef_orbit_reg.len(orbit_apri, False) ==
-                    status_reg[orbit_apri.resp, orbit_apri.index][0]
+                    poly_orbit_reg.len(checkpoint_apri, True) == poly_orbit_reg.len(checkpoint_apri, False) ==
+                    num_polys
                 )
 
+            else:
+                assert checkpoint_apri not in poly_orbit_reg
+
+        else:
+            assert checkpoint_apri not in poly_orbit_reg
+
         return False
 
     except AssertionError:
 
-        if orbit_apri in poly_orbit_reg:
-            poly_orbit_reg.rmv_apri(orbit_apri, force = True, missing_ok = True, ignore_errors = True)
+        if checkpoint_apri in poly_orbit_reg:
+            poly_orbit_reg.rmv_apri(checkpoint_apri, force = True, missing_ok = True, ignore_errors = True)
 
         if orbit_apri in coef_orbit_reg:
             coef_orbit_reg.rmv_apri(orbit_apri, force = True, missing_ok = True, ignore_errors = True)
@@ -1075,40 +2090,119 @@ cdef MPF_t _torus_norm(MPF_t x):
         return frac2
 
 
-cdef BOOL_t _incr_prec(MPF_t x) except -1:
-
-    cdef MPF_t frac = mpmath.frac(x)
-    return TRUE if x < 0 or mpmath.almosteq(frac, 0) or mpmath.almosteq(frac, 1) else FALSE
-
-@cython.boundscheck(False)
-@cython.wraparound(False)
 cdef ERR_t _calc_Bn(IntPolynomial Bn_1, C_t cn, IntPolynomial min_poly, IntPolynomial Bn) except -1:
 
     cdef DEG_t min_poly_deg = min_poly._deg
-    cdef DEG_t Bn_1_deg = Bn_1._deg
-    cdef COEF_t Bn_1_leading_coef = Bn_1._ro_coefs[min_poly_deg - 1]
-    cdef INDEX_t i
+    cdef const COEF_t[:] Bn_1_coefs, min_poly_coefs
+    cdef COEF_t[:] Bn_coefs
 
     if Bn._max_deg < min_poly_deg - 1:
         raise ValueError("`Bn.deg` must be at least `min_poly.deg - 1`.")
 
+    if Bn_1._max_deg < min_poly_deg - 1:
+        raise ValueError("`Bn_1.deg` must be at least `min_poly.deg - 1`.")
+
+    Bn_1_coefs = Bn_1._ro_coefs
+    min_poly_coefs = min_poly._ro_coefs
+    Bn_coefs = Bn._rw_coefs
     Bn.zero_poly()
-    Bn._rw_coefs[0] = -cn
 
-    for i in range(min(min_poly_deg - 1, Bn_1_deg + 1)):
-        Bn._rw_coefs[i + 1] = Bn_1._ro_coefs[i]
+    with cython.boundscheck(False), cython.wraparound(False):
+        _get_calc_Bn_kernel(min_poly_deg)(&Bn_1_coefs[0], cn, &min_poly_coefs[0], &Bn_coefs[0], min_poly_deg)
+    Bn._deg = calc_deg(Bn._ro_array, 0)
+
+    return 0
 
-    if Bn_1_leading_coef != 0:
+cdef void _calc_Bn_kernel(
+    const COEF_t *Bn_1, C_t cn, const COEF_t *min_poly, COEF_t *Bn, DEG_t deg
+) noexcept nogil:
+    """B_n(x) = x * B_{n-1}(x) - c_n modulo the monic degree `deg` polynomial `min_poly`. Only the first `deg`
+    coefficients of `Bn_1` are read and only the first `deg` coefficients of `Bn` are written, so `Bn` must not be
+    `Bn_1`. `_calc_Bn_kernel_4`, ..., `_calc_Bn_kernel_10` are the same, unrolled for a fixed degree, and ignore
+    `deg` (cf `_get_calc_Bn_kernel`)."""
 
-        for i in range(min_poly_deg):
-            Bn._rw_coefs[i] =  Bn._ro_coefs[i] - Bn_1_leading_coef * min_poly._ro_coefs[i]
+    cdef COEF_t leading_coef = Bn_1[deg - 1]
+    cdef DEG_t i
 
-    Bn._deg = calc_deg(Bn._ro_array, 0)
+    Bn[0] = -cn - leading_coef * min_poly[0]
 
-    return 0
+    for i in range(1, deg):
+        Bn[i] = Bn_1[i - 1] - leading_coef * min_poly[i]
+
+cdef void _calc_Bn_kernel_4(
+    const COEF_t *Bn_1, C_t cn, const COEF_t *min_poly, COEF_t *Bn, DEG_t deg
+) noexcept nogil:
+
+    cdef COEF_t leading_coef = Bn_1[3]
+
+    Bn[0] = -cn - leading_coef * min_poly[0]
+    Bn[1] = Bn_1[0] - leading_coef * min_poly[1]
+    Bn[2] = Bn_1[1] - leading_coef * min_poly[2]
+    Bn[3] = Bn_1[2] - leading_coef * min_poly[3]
+
+cdef void _calc_Bn_kernel_6(
+    const COEF_t *Bn_1, C_t cn, const COEF_t *min_poly, COEF_t *Bn, DEG_t deg
+) noexcept nogil:
+
+    cdef COEF_t leading_coef = Bn_1[5]
+
+    Bn[0] = -cn - leading_coef * min_poly[0]
+    Bn[1] = Bn_1[0] - leading_coef * min_poly[1]
+    Bn[2] = Bn_1[1] - leading_coef * min_poly[2]
+    Bn[3] = Bn_1[2] - leading_coef * min_poly[3]
+    Bn[4] = Bn_1[3] - leading_coef * min_poly[4]
+    Bn[5] = Bn_1[4] - leading_coef * min_poly[5]
+
+cdef void _calc_Bn_kernel_8(
+    const COEF_t *Bn_1, C_t cn, const COEF_t *min_poly, COEF_t *Bn, DEG_t deg
+) noexcept nogil:
+
+    cdef COEF_t leading_coef = Bn_1[7]
+
+    Bn[0] = -cn - leading_coef * min_poly[0]
+    Bn[1] = Bn_1[0] - leading_coef * min_poly[1]
+    Bn[2] = Bn_1[1] - leading_coef * min_poly[2]
+    Bn[3] = Bn_1[2] - leading_coef * min_poly[3]
+    Bn[4] = Bn_1[3] - leading_coef * min_poly[4]
+    Bn[5] = Bn_1[4] - leading_coef * min_poly[5]
+    Bn[6] = Bn_1[5] - leading_coef * min_poly[6]
+    Bn[7] = Bn_1[6] - leading_coef * min_poly[7]
+
+cdef void _calc_Bn_kernel_10(
+    const COEF_t *Bn_1, C_t cn, const COEF_t *min_poly, COEF_t *Bn, DEG_t deg
+) noexcept nogil:
+
+    cdef COEF_t leading_coef = Bn_1[9]
+
+    Bn[0] = -cn - leading_coef * min_poly[0]
+    Bn[1] = Bn_1[0] - leading_coef * min_poly[1]
+    Bn[2] = Bn_1[1] - leading_coef * min_poly[2]
+    Bn[3] = Bn_1[2] - leading_coef * min_poly[3]
+    Bn[4] = Bn_1[3] - leading_coef * min_poly[4]
+    Bn[5] = Bn_1[4] - leading_coef * min_poly[5]
+    Bn[6] = Bn_1[5] - leading_coef * min_poly[6]
+    Bn[7] = Bn_1[6] - leading_coef * min_poly[7]
+    Bn[8] = Bn_1[7] - leading_coef * min_poly[8]
+    Bn[9] = Bn_1[8] - leading_coef * min_poly[9]
+
+cdef CALC_BN_KERNEL_t _get_calc_Bn_kernel(DEG_t deg) noexcept:
+    """The kernel of `_calc_Bn` for the degree `deg` of the minimal polynomial, unrolled for the common degrees 4, 6,
+    8 and 10 and generic otherwise."""
 
-cdef C_t _calc_cn(MPF_t xi) except -1:
-    return int(xi)
+    if deg == 4:
+        return _calc_Bn_kernel_4
+
+    elif deg == 6:
+        return _calc_Bn_kernel_6
+
+    elif deg == 8:
+        return _calc_Bn_kernel_8
+
+    elif deg == 10:
+        return _calc_Bn_kernel_10
+
+    else:
+        return _calc_Bn_kernel
 
 cdef str _mpf_to_str(MPF_t x):
     return mpmath.nstr(x, mpmath.mp.dps, strip_zeros = False, min_fixed = -mpmath.inf, max_fixed = mpmath.inf)
@@ -1128,6 +2222,121 @@ cdef DPS_t _base2_magn(COEF_t x):
 cdef DPS_t _prec_offset(IntPolynomial Bn, IntPolynomial Bn_1):
     return _base2_magn(Bn.max_abs_coef()) - _base2_magn(Bn_1.max_abs_coef())
 
+def _dump_blks(
+    coef_orbit_reg, poly_orbit_reg, monotone_reg, status_reg, coef_blk, poly_blk, orbit_apri, n, is_monotone, min_blowup
+):
+    """Append the `Block`s of a dump of `_single_orbit`, then set the monotone data and the status of the orbit, which
+    is calculated up to `n`."""
+
+    coef_orbit_reg.append_disk_blk(coef_blk)
+
+    if len(poly_blk) > 0:
+        # with a checkpoint period greater than `max_blk_len`, some dumps hold no checkpoint
+        poly_orbit_reg.append_disk_blk(poly_blk)
+
+    _set_monotone_data(is_monotone, monotone_reg, orbit_apri.resp, orbit_apri, min_blowup)
+    status_reg.set(orbit_apri.resp, orbit_apri.index, [n, -1, -1], mmap_mode = "r+")
+
+def _copy_blk(blk, apri):
+    """A `Block` of `apri` with a copy of the segment of `blk`."""
+
+    seg = blk.segment
+
+    if isinstance(seg, IntPolynomialArray):
+        seg = IntPolynomialArray(seg.max_deg()).set(seg.get_ndarray()[ : len(seg)].copy())
+
+    else:
+        seg = list(seg)
+
+    return Block(seg, apri, blk.startn)
+
+def _flush_writes(block_writer):
+    """Wait until the writes submitted to `block_writer` are done, unless it is `None`, before the registers of the
+    orbit are read or written outside of a dump."""
+
+    if block_writer is not None:
+        block_writer.flush()
+
+def _set_resume_record(resume_reg, orbit_apri, *args):
+    """Save the resume record `make_resume_record(*args)` of `orbit_apri`, unless `resume_reg` is `None`."""
+
+    if resume_reg is not None:
+        resume_reg.set(orbit_apri.resp, orbit_apri.index, make_resume_record(*args), mmap_mode = "r+")
+
+def _set_precision_profile(precision_reg, orbit_apri, precision_policy):
+    """Save the profile of `precision_policy` for `orbit_apri`, unless `precision_reg` is `None` or nothing was
+    recorded."""
+
+    if precision_reg is not None and precision_policy.last_n > 0:
+        precision_reg.set(orbit_apri.resp, orbit_apri.index, precision_policy.get_profile(), mmap_mode = "r+")
+
+def _set_metrics(metrics_reg, orbit_apri, metrics):
+    """Save the counters of `metrics` for `orbit_apri`, unless `metrics_reg` is `None` or nothing was counted."""
+
+    if metrics_reg is not None and metrics.last_n > 0:
+        metrics_reg.set(orbit_apri.resp, orbit_apri.index, metrics.get_row(), mmap_mode = "r+")
+
+def _calc_round_orbit_lens(max_orbit_len, round_len, round_len_factor):
+    """The poly orbit lengths up to which the rounds of `calc_orbits` calculate the orbits, ending with
+    `max_orbit_len`."""
+
+    if round_len is None:
+        return [max_orbit_len]
+
+    orbit_lens = []
+    orbit_len = round_len
+
+    while orbit_len < max_orbit_len:
+
+        orbit_lens.append(orbit_len)
+        orbit_len = max(orbit_len + 1, int(math.ceil(orbit_len * round_len_factor)))
+
+    orbit_lens.append(max_orbit_len)
+    return orbit_lens
+
+def _get_incomplete_indices(status_blk, indices, orbit_len):
+    """The `indices` (type `numpy.ndarray`) of `status_blk` of the orbits that are still running and shorter than
+    `orbit_len`."""
+
+    orbit_lengths = status_blk.segment[indices - status_blk.startn, 0]
+    return indices[(0 <= orbit_lengths) & (orbit_lengths < orbit_len)]
+
+def _is_stopped(status_reg, orbit_apri):
+    """Whether the orbit `orbit_apri` is periodic or overflowed, so that it will not be calculated again."""
+
+    poly_orbit_len, _, overflow_index = status_reg.get(orbit_apri.resp, orbit_apri.index, mmap_mode = "r")
+    return poly_orbit_len == -1 or overflow_index != -1
+
+def _add_progress(progress, n, progress_n):
+    """Publish the coefficients c_{progress_n + 1}, ..., c_n to `progress`, unless it is `None`, and return the new
+    `progress_n`."""
+
+    if progress is not None and n > progress_n:
+
+        progress.add(coefs = n - progress_n)
+        return n
+
+    return progress_n
+
+def _count_incomplete_orbits(status_reg, max_orbit_len, num_procs, proc_index):
+    """The number of orbits of the `Block`s of `status_reg` assigned to `proc_index` (cf `calc_orbits`) that are
+    still running and shorter than `max_orbit_len`."""
+
+    count = 0
+
+    for poly_apri in status_reg:
+
+        for blk_index, (startn, length) in enumerate(status_reg.intervals(poly_apri)):
+
+            if blk_index % num_procs == proc_index:
+
+                with status_reg.blk(poly_apri, startn, length) as status_blk:
+                    count += len(
+                        _get_incomplete_indices(status_blk, np.arange(startn, startn + length), max_orbit_len)
+                    )
+
+    return count
+
 def _set_monotone_data(is_monotone, monotone_reg, poly_apri, orbit_apri, min_blowup):
 
     if is_monotone == TRUE:
@@ -0,0 +1,106 @@
+"""
+    Beta Expansions of Salem Numbers, calculating periods thereof
+    Copyright (C) 2021 Michael P. Lane
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+"""
+import queue
+import threading
+
+_STOP = object()
+
+class BlockWriter:
+    """Runs the writes of the `Block` dumps of an orbit (cf `_single_orbit`) on a background thread, so that the orbit
+    is calculated into a second buffer while the full one is written, packed (cf `PackedCoefRegister`) and followed
+    by the status of the orbit.
+
+    Writes run one at a time, in the order they were submitted, so the status that a write sets after its data is
+    never on disk before the data of that write or of an earlier one. After a write raises, the later writes are
+    dropped, and every later `submit` and `flush` raises the exception. At most `max_pending` writes wait for the
+    thread, after which `submit` blocks, so that a slow filesystem slows the calculation down instead of filling the
+    memory.
+
+    The thread is started by the first `submit`, so orbits that never dump a `Block` cost nothing.
+    """
+
+    def __init__(self, max_pending = 1):
+        """
+        :param max_pending: (type `int`, positive, default 1)
+        """
+
+        if max_pending <= 0:
+            raise ValueError("`max_pending` must be positive.")
+
+        self.max_pending = max_pending
+        self._queue = queue.Queue(maxsize = max_pending)
+        self._thread = None
+        self._error = None
+
+    def submit(self, write, *args):
+        """Call `write(*args)` on the thread, after the writes submitted earlier."""
+
+        self._raise_error()
+
+        if self._thread is None:
+
+            self._thread = threading.Thread(target = self._run, daemon = True)
+            self._thread.start()
+
+        self._queue.put((write, args))
+
+    def flush(self):
+        """Wait until every write submitted so far is done. Must be called before the written registers are read."""
+
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """Flush and stop the thread."""
+
+        try:
+            self.flush()
+
+        finally:
+
+            if self._thread is not None:
+
+                self._queue.put(_STOP)
+                self._thread.join()
+                self._thread = None
+
+    def _raise_error(self):
+        # kept, since the writes after the one that raised were dropped
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+
+        while True:
+
+            job = self._queue.get()
+
+            try:
+
+                if job is _STOP:
+                    return
+
+                if self._error is None:
+
+                    write, args = job
+
+                    try:
+                        write(*args)
+
+                    except BaseException as e:
+                        self._error = e
+
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,118 @@
+"""
+    Beta Expansions of Salem Numbers, calculating periods thereof
+    Copyright (C) 2021 Michael P. Lane
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+"""
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+from cornifer import ApriInfo, stack
+from cornifer._utilities import check_return_int, check_return_Path
+from cornifer.debug import log
+
+from .perron_numbers import Perron_Number
+from .utilities import setdps
+
+COST_INDEX_DTYPE = np.dtype([
+    ("deg", np.int64),
+    ("sum_abs_coef", np.int64),
+    ("index", np.int64),
+    ("cost", np.float64)
+])
+
+def predict_cost(deg, beta0, trace, boyd_C):
+    """The predicted cost of the orbit of a Perron number, in arbitrary units: the expected size of the orbit times the
+    cost of a step.
+
+    Boyd's heuristic constant `boyd_C` (cf `Perron_Number.boyd_C`) is proportional to the expected size of the
+    period. A step evaluates a polynomial of degree `deg - 1` at a precision that grows like the number of bits of
+    beta0 ** deg plus those of the coefficients of B_n, whose size follows the trace (cf `x_y_prec_offset` in
+    `_single_orbit`).
+
+    :param deg: (type `int`, positive)
+    :param beta0: (type `float` or `mpf`, greater than 1)
+    :param trace: (type `int`)
+    :param boyd_C: (type `float` or `mpf`, positive)
+    :return: (type `float`)
+    """
+
+    prec = 16 + 2 * math.log2(deg) + deg * math.log2(float(beta0) + 1) + math.log2(abs(trace) + 1)
+    return float(boyd_C) * deg * prec
+
+def calc_cost_index(perron_polys_reg, perron_nums_reg, filename, dps):
+    """Predict the cost (cf `predict_cost`) of the orbit of every Perron number of `perron_polys_reg`, once per
+    campaign, and save them to the index file `filename`, sorted by increasing cost. The index is read by
+    `beta_numbers.work_queue.calc_work_queue_setup`, so that the workers of `calc_orbits` neither calculate roots nor
+    discriminants.
+
+    :param perron_polys_reg: (type `IntPolynomialRegister`)
+    :param perron_nums_reg: (type `MPFRegister`) Perron numbers calculated to `dps` decimal places.
+    :param filename: (type `str` or `pathlib.Path`) A `.npy` file.
+    :param dps: (type `int`, positive)
+    :return: (type `numpy.ndarray`) The index, of dtype `COST_INDEX_DTYPE`.
+    """
+
+    filename = check_return_Path(filename, "filename")
+    dps = check_return_int(dps, "dps")
+
+    if dps <= 0:
+        raise ValueError("`dps` must be positive.")
+
+    rows = []
+
+    with setdps(dps):
+
+        with stack(perron_polys_reg.open(True), perron_nums_reg.open(True)):
+
+            for poly_apri in perron_polys_reg:
+
+                num_apri = ApriInfo(deg = poly_apri.deg, sum_abs_coef = poly_apri.sum_abs_coef, dps = dps)
+                log(f"Predicting the costs of {poly_apri}.")
+
+                for startn, length in perron_polys_reg.intervals(poly_apri):
+
+                    with stack(
+                        perron_polys_reg.blk(poly_apri, startn, length, decompress = True),
+                        perron_nums_reg.blk(num_apri, startn, length, decompress = True)
+                    ) as (perron_poly_blk, perron_num_blk):
+
+                        for index in range(startn, startn + length):
+
+                            beta = Perron_Number(perron_poly_blk[index], beta0 = perron_num_blk[index].real)
+                            rows.append((
+                                poly_apri.deg, poly_apri.sum_abs_coef, index,
+                                predict_cost(beta.deg, beta.beta0, beta.get_trace(), beta.boyd_C())
+                            ))
+
+    index = np.array(rows, dtype = COST_INDEX_DTYPE)
+    index = index[np.argsort(index["cost"], kind = "stable")]
+    tmp_filename = filename.with_suffix(".tmp")
+
+    with tmp_filename.open("wb") as fh:
+        np.save(fh, index)
+
+    os.replace(tmp_filename, filename)
+    return index
+
+def load_cost_index(filename):
+    """Read the index file written by `calc_cost_index`.
+
+    :return: (type `dict`) The predicted cost of every (deg, sum_abs_coef, index).
+    """
+
+    index = np.load(Path(filename))
+    return {
+        (int(deg), int(sum_abs_coef), int(index_)): float(cost)
+        for deg, sum_abs_coef, index_, cost in index.tolist()
+    }
@@ -0,0 +1,47 @@
+cimport cython
+cimport numpy as cnp
+
+ctypedef cnp.int_t      DEG_t
+ctypedef cnp.longlong_t COEF_t
+ctypedef cnp.longlong_t N_t
+ctypedef unsigned long long HASH_t
+
+cdef class CycleDetector:
+
+    cdef readonly DEG_t deg
+
+    cpdef N_t update(self, N_t n, const COEF_t[:] Bn) except -1
+
+    cpdef N_t preperiod_lower_bound(self)
+
+cdef class BrentDetector(CycleDetector):
+
+    cdef readonly N_t checkpoint_n
+    cdef COEF_t[:] _checkpoint
+
+cdef class DistinguishedPointDetector(BrentDetector):
+
+    cdef readonly int dp_bits
+    cdef readonly object filename
+    cdef readonly N_t num_points
+    cdef N_t _hit_n
+    cdef N_t _hit_k
+    cdef COEF_t[:, :] _table
+
+    cdef N_t _find(self, HASH_t h, const COEF_t[:] Bn)
+
+    cdef int _insert(self, N_t n, HASH_t h, const COEF_t[:] Bn) except -1
+
+cdef inline bint _coefs_eq(const COEF_t[:] B1, const COEF_t[:] B2, DEG_t deg) noexcept nogil:
+    """`True` if the first `deg` coefficients of `B1` and `B2` are equal."""
+
+    cdef DEG_t j
+
+    with cython.boundscheck(False), cython.wraparound(False):
+
+        for j in range(deg):
+
+            if B1[j] != B2[j]:
+                return False
+
+    return True
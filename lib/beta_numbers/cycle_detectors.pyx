@@ -0,0 +1,385 @@
+"""
+    Beta Expansions of Salem Numbers, calculating periods thereof
+    Copyright (C) 2021 Michael P. Lane
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+"""
+cimport cython
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .utilities import check_abstract
+
+cdef N_t INITIAL_CAPACITY = 1024
+
+cdef class CycleDetector:
+    """Detects that the poly orbit B_1, B_2, ... has become periodic.
+
+    `_single_orbit` calls `update` with every new iterate. Once `update` returns an index c > 0 such that
+    B_c == B_n, the period length is n - c and the poly preperiod length is at least `preperiod_lower_bound()` and
+    less than c; `_calc_minimal_period` then determines it exactly.
+
+    This class is abstract: subclasses must override `update`, `restart`, `get_state` and `set_state`, otherwise they
+    cannot be instantiated.
+    """
+
+    def __init__(self, deg):
+        """
+        :param deg: (type `int`, positive) The degree of the minimal polynomial. The iterates have `deg`
+        coefficients.
+        """
+
+        check_abstract(self, CycleDetector, ("update", "restart", "get_state", "set_state"))
+        self.deg = deg
+
+    cpdef N_t update(self, N_t n, const COEF_t[:] Bn) except -1:
+        """Abstract. Return c > 0 if B_c == B_n is known for some c < n such that n - c is the minimal period,
+        otherwise 0.
+
+        :param n: Poly orbit index, calls are made with consecutive `n`.
+        :param Bn: Coefficients of B_n, the 0-index term is the coefficient of the 0-degree term.
+        """
+        raise NotImplementedError
+
+    def restart(self, n, get_poly):
+        """Abstract. Restore the state after B_1, ..., B_n have been passed to `update` by a previous process.
+
+        :param n: (type `int`, positive) The last poly orbit index that was calculated.
+        :param get_poly: (type `callable`) Returns the coefficients of B_i when passed i.
+        """
+        raise NotImplementedError
+
+    def get_state(self):
+        """Abstract. The state to pass to `set_state` instead of calling `restart`, a 1-dimensional `int64` array with
+        `1 + deg` entries (cf `beta_numbers.resume`)."""
+        raise NotImplementedError
+
+    def set_state(self, n, state):
+        """Abstract. Same as `restart`, but from the output of `get_state` right after B_n was passed to `update`, so
+        that no iterate is read.
+
+        :param n: (type `int`, positive)
+        :param state: (type `numpy.ndarray`)
+        """
+        raise NotImplementedError
+
+    cpdef N_t preperiod_lower_bound(self):
+        """The poly preperiod length is known to be at least this value, valid once `update` has returned a
+        positive value."""
+        return 0
+
+    def close(self):
+        """Called once the orbit is periodic or overflowed, so that it will not be resumed. Releases the files kept
+        for resuming it."""
+        pass
+
+cdef class BrentDetector(CycleDetector):
+    """Brent's cycle detection. The only state is the checkpoint B_c, where c is the largest power of two that is at
+    most n. If B_c is periodic and the period is at most c, then the first n > c with B_n == B_c satisfies
+    n - c == period length. Restarting costs a single read.
+    """
+
+    def __init__(self, deg):
+
+        super().__init__(deg)
+        self.checkpoint_n = 0
+        self._checkpoint = np.zeros(deg, dtype = np.int64)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cpdef N_t update(self, N_t n, const COEF_t[:] Bn) except -1:
+
+        cdef DEG_t j
+        cdef N_t c = self.checkpoint_n
+
+        if c > 0 and _coefs_eq(self._checkpoint, Bn, self.deg):
+            return c
+
+        if n & (n - 1) == 0:
+            # n is a power of two
+            for j in range(self.deg):
+                self._checkpoint[j] = Bn[j]
+
+            self.checkpoint_n = n
+
+        return 0
+
+    def restart(self, n, get_poly):
+
+        if n <= 0:
+            raise ValueError("`n` must be positive.")
+
+        c = 1 << (n.bit_length() - 1)
+        self._checkpoint = np.array(get_poly(c)[ : self.deg], dtype = np.int64)
+        self.checkpoint_n = c
+
+    def get_state(self):
+
+        state = np.empty(1 + self.deg, dtype = np.int64)
+        state[0] = self.checkpoint_n
+        state[1 : ] = self._checkpoint
+        return state
+
+    def set_state(self, n, state):
+
+        if n <= 0:
+            raise ValueError("`n` must be positive.")
+
+        if state[0] != 1 << (int(n).bit_length() - 1):
+            raise ValueError("`state` does not belong to `n`.")
+
+        self._checkpoint = np.array(state[1 : 1 + self.deg], dtype = np.int64)
+        self.checkpoint_n = state[0]
+
+cdef class DistinguishedPointDetector(BrentDetector):
+    """Distinguished-point cycle detection, meant for orbits too long to scan. Each B_n is hashed, and B_n is a
+    distinguished point if the `dp_bits` leading bits of its hash are 0. Distinguished points are kept in an
+    open-addressing hash table, in RAM or memory-mapped at `filename`, so the table holds about n / 2 ** dp_bits
+    records. A cycle that contains a distinguished point is detected on its first repeat, about 2 ** dp_bits steps
+    after the orbit becomes periodic; shorter cycles, which likely contain none, are detected by the `BrentDetector`
+    running alongside.
+
+    Every stored distinguished point B_d with d + period <= n that is not the hit is not periodic, otherwise it would
+    have been hit earlier. The largest such d is the preperiod lower bound, so `_calc_minimal_period` only replays
+    the iterates from the stored checkpoint nearest the start of the cycle.
+
+    Each record is a row of a 2-dimensional `int64` array: the poly orbit index (0 for empty), the hash, and the
+    `deg` coefficients.
+    """
+
+    def __init__(self, deg, dp_bits = 16, filename = None):
+        """
+        :param dp_bits: (type `int`, default 16) Number of leading zero bits of the hash of a distinguished point.
+        :param filename: (type `str` or `pathlib.Path`, default `None`) Where the table is memory-mapped. If the
+        file exists, it is loaded on the first call to `update`, discarding the distinguished points that were
+        calculated after the last time the orbit was saved. If `None`, the table is kept in RAM.
+        """
+
+        super().__init__(deg)
+
+        if not (0 <= dp_bits < 64):
+            raise ValueError("`dp_bits` must be between 0 and 63.")
+
+        self.dp_bits = dp_bits
+        self.filename = None if filename is None else Path(filename)
+        self._hit_n = self._hit_k = 0
+        self._table = None
+        self.num_points = 0
+
+    def _new_table(self, capacity):
+
+        if self.filename is None:
+            return np.zeros((capacity, 2 + self.deg), dtype = np.int64)
+
+        else:
+
+            tmp_filename = self.filename.with_suffix(".tmp.npy")
+            table = np.lib.format.open_memmap(
+                tmp_filename, mode = "w+", dtype = np.int64, shape = (capacity, 2 + self.deg)
+            )
+            table[:] = 0
+            return table
+
+    def _open(self, max_n):
+        """Load the table, keeping only the records whose index is at most `max_n`."""
+
+        if self.filename is not None and self.filename.exists():
+            self._rebuild(np.load(self.filename, mmap_mode = "r"), max_n)
+
+        else:
+            self._rebuild(np.zeros((INITIAL_CAPACITY, 2 + self.deg), dtype = np.int64), max_n)
+
+    def _rebuild(self, old_table, max_n):
+        """Rehash every record of `old_table` whose index is at most `max_n` into a new table of at least twice as
+        many slots as records."""
+
+        cdef N_t i
+        cdef const COEF_t[:, :] old = old_table
+
+        num_records = np.count_nonzero((0 < old_table[:, 0]) & (old_table[:, 0] <= max_n))
+        capacity = max(INITIAL_CAPACITY, old.shape[0])
+
+        while 2 * (num_records + 1) > capacity:
+            capacity *= 2
+
+        table = self._new_table(capacity)
+        self._table = table
+        self.num_points = 0
+
+        for i in range(old.shape[0]):
+
+            if 0 < old[i, 0] <= max_n:
+                self._insert(old[i, 0], <HASH_t> old[i, 1], old[i, 2 : ])
+
+        if self.filename is not None:
+
+            table.flush()
+            del table
+            os.replace(self.filename.with_suffix(".tmp.npy"), self.filename)
+            self._table = np.load(self.filename, mmap_mode = "r+")
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef N_t _find(self, HASH_t h, const COEF_t[:] Bn):
+        """Return the index of the slot holding `Bn`, or of the empty slot where it belongs."""
+
+        cdef N_t mask = self._table.shape[0] - 1
+        cdef N_t i = <N_t> (h & <HASH_t> mask)
+        cdef DEG_t j
+        cdef bint eq
+
+        while self._table[i, 0] != 0:
+
+            if <HASH_t> self._table[i, 1] == h:
+
+                eq = True
+
+                for j in range(self.deg):
+
+                    if self._table[i, 2 + j] != Bn[j]:
+
+                        eq = False
+                        break
+
+                if eq:
+                    return i
+
+            i = (i + 1) & mask
+
+        return i
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int _insert(self, N_t n, HASH_t h, const COEF_t[:] Bn) except -1:
+
+        cdef N_t i
+        cdef DEG_t j
+
+        if 2 * (self.num_points + 1) > self._table.shape[0]:
+            self._rebuild(np.asarray(self._table), n)
+
+        i = self._find(h, Bn)
+        self._table[i, 0] = n
+        self._table[i, 1] = <COEF_t> h
+
+        for j in range(self.deg):
+            self._table[i, 2 + j] = Bn[j]
+
+        self.num_points += 1
+        return 0
+
+    cpdef N_t update(self, N_t n, const COEF_t[:] Bn) except -1:
+
+        cdef HASH_t h = _hash_coefs(Bn, self.deg)
+        cdef N_t i, k
+
+        if self._table is None:
+            self._open(n - 1)
+
+        if self.dp_bits == 0 or h >> (64 - self.dp_bits) == 0:
+
+            i = self._find(h, Bn)
+
+            if self._table[i, 0] != 0:
+                k = self._table[i, 0]
+
+            else:
+
+                self._insert(n, h, Bn)
+                k = 0
+
+        else:
+            k = 0
+
+        if k == 0:
+            k = BrentDetector.update(self, n, Bn)
+
+        if k > 0:
+
+            self._hit_n = n
+            self._hit_k = k
+
+        return k
+
+    def close(self):
+        """Delete the file of the table, if any."""
+
+        self._table = None
+
+        if self.filename is not None:
+
+            self.filename.unlink(missing_ok = True)
+            self.filename.with_suffix(".tmp.npy").unlink(missing_ok = True)
+
+    cpdef N_t preperiod_lower_bound(self):
+
+        cdef N_t i, d
+        cdef N_t period_len = self._hit_n - self._hit_k
+        cdef N_t lower = 0
+
+        for i in range(self._table.shape[0]):
+
+            d = self._table[i, 0]
+
+            if d != self._hit_k and d + period_len <= self._hit_n and d > lower:
+                lower = d
+
+        return lower
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline HASH_t _hash_coefs(const COEF_t[:] Bn, DEG_t deg) noexcept nogil:
+    """64-bit FNV-1a over the coefficients followed by the splitmix64 finalizer."""
+
+    cdef HASH_t h = 14695981039346656037ULL
+    cdef DEG_t j
+
+    for j in range(deg):
+        h = (h ^ <HASH_t> Bn[j]) * 1099511628211ULL
+
+    h = (h ^ (h >> 30)) * 0xbf58476d1ce4e5b9ULL
+    h = (h ^ (h >> 27)) * 0x94d049bb133111ebULL
+    return h ^ (h >> 31)
+
+def table_filename(table_dir, orbit_apri):
+    """Where `DistinguishedPointDetector` keeps the table of the orbit `orbit_apri` inside `table_dir`."""
+
+    poly_apri = orbit_apri.resp
+    return Path(table_dir) / f"dp_{poly_apri.deg}_{poly_apri.sum_abs_coef}_{orbit_apri.index}.npy"
+
+def get_cycle_detector(name, deg, orbit_apri, **kwargs):
+    """Construct the cycle detector registered under `name` for the orbit `orbit_apri`.
+
+    :param name: (type `str`) One of the keys of `CYCLE_DETECTORS`.
+    :param deg: (type `int`, positive) The degree of the minimal polynomial.
+    :param orbit_apri: (type `ApriInfo`) The orbit.
+    :param kwargs: Keyword arguments passed to the constructor. For "distinguished", the keyword `table_dir` is
+    replaced by the `filename` given by `table_filename`.
+    :return: (type `CycleDetector`)
+    """
+
+    if name not in CYCLE_DETECTORS:
+        raise ValueError(f"`name` must be one of {', '.join(CYCLE_DETECTORS.keys())}, not `{name}`.")
+
+    if "table_dir" in kwargs:
+
+        kwargs = dict(kwargs)
+        kwargs["filename"] = table_filename(kwargs.pop("table_dir"), orbit_apri)
+
+    return CYCLE_DETECTORS[name](deg, **kwargs)
+
+CYCLE_DETECTORS = {
+    "brent" : BrentDetector,
+    "distinguished" : DistinguishedPointDetector
+}
@@ -0,0 +1,81 @@
+cimport numpy as cnp
+
+ctypedef cnp.int_t      DEG_t
+ctypedef cnp.longlong_t COEF_t
+ctypedef cnp.int_t      DPS_t
+ctypedef cnp.int_t      C_t
+ctypedef object         MPF_t
+
+cdef enum:
+    AMBIGUOUS = -1
+
+cdef class XiEvaluator:
+
+    cdef readonly MPF_t beta0
+    cdef readonly DEG_t deg
+    cdef readonly DPS_t max_prec
+    cdef readonly MPF_t last_xi
+    cdef readonly object ctx
+
+    cpdef C_t floor_xi(self, const COEF_t[:] coefs, DPS_t x_prec, DPS_t y_prec) except -2
+
+    cpdef int advance(self, C_t cn) except -1
+
+    cpdef dict stats(self)
+
+cdef class MPMathEvaluator(XiEvaluator):
+
+    cdef readonly object backend
+
+cdef class FixedPointEvaluator(XiEvaluator):
+
+    cdef dict _tables
+
+    cdef list _power_table(self, DPS_t prec)
+
+    cdef C_t _certified_floor(self, object scaled_xi, object err, DPS_t prec) except -2
+
+cdef class IncrementalEvaluator(FixedPointEvaluator):
+
+    cdef readonly DEG_t anchor_period
+    cdef readonly long long num_anchors
+    cdef DPS_t _prec
+    cdef DPS_t _extra_prec
+    cdef object _beta0_ceil
+    cdef object _scaled_beta0
+    cdef object _beta0_err
+    cdef object _scaled_y
+    cdef object _scaled_xi
+    cdef object _err
+    cdef DEG_t _num_steps
+    cdef bint _pending
+
+    cdef C_t _anchor(self, const COEF_t[:] coefs, DPS_t x_prec) except -2
+
+cdef class IntervalEvaluator(XiEvaluator):
+
+    cdef readonly object iv_ctx
+    cdef readonly object beta0_iv
+    cdef readonly long long num_evals
+    cdef readonly long long num_ambiguous
+
+cdef class TieredEvaluator(XiEvaluator):
+
+    cdef readonly XiEvaluator fallback
+    cdef readonly long long num_float64
+    cdef readonly long long num_double_double
+    cdef readonly long long num_fallback
+    cdef double _beta0
+    cdef double _beta0_hi
+    cdef double _beta0_lo
+    cdef double _beta0_ceil
+
+cdef class TraceEvaluator(FixedPointEvaluator):
+
+    cdef readonly list power_sums
+    cdef readonly list conjs
+    cdef readonly long long num_evals
+    cdef readonly long long num_ambiguous
+    cdef readonly DPS_t max_prec_used
+    cdef double _conj_mod
+    cdef DPS_t _conj_prec
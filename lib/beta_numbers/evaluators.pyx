@@ -0,0 +1,837 @@
+"""
+    Beta Expansions of Salem Numbers, calculating periods thereof
+    Copyright (C) 2021 Michael P. Lane
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+"""
+cimport cython
+from libc.math cimport fma, floor, fabs
+
+import math
+
+import numpy as np
+import mpmath
+from mpmath.ctx_iv import MPIntervalContext
+from mpmath.libmp import to_int
+
+from .backends import get_backend
+from .utilities import check_abstract
+
+try:
+    from gmpy2 import mpz as _mpz
+
+except ImportError:
+    _mpz = int
+
+AMBIGUOUS_FLOOR = AMBIGUOUS
+# Maximum number of cached power tables per `FixedPointEvaluator`. The orbit loop only ever asks for a handful of
+# precisions (the starting precision for the current `x_y_prec_offset` and its doublings).
+cdef int MAX_NUM_TABLES = 16
+# unit roundoff of float64 and a conservative unit roundoff of double-double arithmetic
+cdef double U64 = 2. ** -53
+cdef double UDD = 2. ** -104
+
+cdef class XiEvaluator:
+    """Evaluates xi = beta0 * B_{n-1}(beta0) and returns floor(xi), which is the next coefficient c_n of the beta
+    orbit.
+
+    Subclasses decide how xi is represented. `floor_xi` returns `AMBIGUOUS` (-1) if the floor cannot be decided at
+    the requested precision, in which case `_single_orbit` increases the precision and calls `floor_xi` again. If
+    the floor is ambiguous, `last_xi` is set to an `mpf` approximation of xi, which `_single_orbit` uses to detect
+    simple Parry numbers once the maximum precision has been reached.
+
+    Each evaluator does its multiprecision arithmetic in its own `mpmath` context `ctx` and never changes the
+    precision of the global context, so that evaluators of different orbits can be used by different threads.
+
+    This class is abstract: subclasses must override `floor_xi`, otherwise they cannot be instantiated.
+    """
+
+    def __init__(self, beta0, min_poly_coefs, max_prec):
+        """
+        :param beta0: (type `mpf`) The Perron number, calculated to at least `max_prec` bits.
+        :param min_poly_coefs: (type `numpy.ndarray`) Coefficients of the minimal polynomial of `beta0`, the 0-index
+        term is the coefficient of the 0-degree term.
+        :param max_prec: (type `int`, positive) The maximum binary precision that will be requested.
+        """
+
+        check_abstract(self, XiEvaluator, ("floor_xi",))
+        self.beta0 = beta0
+        self.deg = len(min_poly_coefs) - 1
+        self.max_prec = max_prec
+        self.last_xi = None
+        self.ctx = mpmath.MPContext()
+
+    @classmethod
+    def from_perron(cls, beta, max_prec, **kwargs):
+        """Construct an evaluator for a `Perron_Number` whose `beta0` has already been calculated."""
+        return cls(beta.beta0, beta.min_poly.get_ndarray()[ : beta.deg + 1].astype(np.int64), max_prec, **kwargs)
+
+    cpdef C_t floor_xi(self, const COEF_t[:] coefs, DPS_t x_prec, DPS_t y_prec) except -2:
+        """Abstract. Return floor(beta0 * B(beta0)), or `AMBIGUOUS`.
+
+        :param coefs: Coefficients of B, the 0-index term is the coefficient of the 0-degree term.
+        :param x_prec: Binary precision used to evaluate B.
+        :param y_prec: Binary precision that the result must be accurate to.
+        """
+        raise NotImplementedError
+
+    cpdef int advance(self, C_t cn) except -1:
+        """Called by `_single_orbit` once c_n has been decided. Evaluators that carry state from one step to the next
+        override this method."""
+        return 0
+
+    cpdef dict stats(self):
+        """Counters describing the work done by this evaluator so far, logged by `_single_orbit`."""
+        return {}
+
+    # `True` if `floor_xi` depends on previous calls, in which case the evaluator must be called at every step.
+    carries_state = False
+
+cdef class MPMathEvaluator(XiEvaluator):
+    """Evaluates xi by Horner's method in the context `ctx`. A floor is ambiguous if xi is negative or if
+    xi is within `y_prec` bits of an integer.
+
+    If `backend` is not "mpmath", the arithmetic is done by a `beta_numbers.backends.Backend` instead of with
+    `mpf` objects."""
+
+    def __init__(self, beta0, min_poly_coefs, max_prec, backend = "mpmath"):
+        """
+        :param backend: (type `str`, default "mpmath") "mpmath" or one of the keys of
+        `beta_numbers.backends.BACKENDS`.
+        """
+
+        super().__init__(beta0, min_poly_coefs, max_prec)
+        self.backend = None if backend == "mpmath" else get_backend(backend, beta0, max_prec)
+
+    cpdef C_t floor_xi(self, const COEF_t[:] coefs, DPS_t x_prec, DPS_t y_prec) except -2:
+
+        cdef DEG_t j
+        cdef MPF_t xi
+        cdef MPF_t frac
+        cdef C_t cn
+
+        if self.backend is not None:
+
+            cn = self.backend.floor_xi(coefs[ : min(self.deg, coefs.shape[0])], x_prec, y_prec)
+
+            if cn == AMBIGUOUS:
+                self.last_xi = self.ctx.make_mpf(self.backend.last_xi)
+
+            return cn
+
+        ctx = self.ctx
+        ctx.prec = x_prec
+        xi = ctx.mpf(0)
+
+        for j in range(min(self.deg, coefs.shape[0]) - 1, -1, -1):
+            xi = xi * self.beta0 + coefs[j]
+
+        xi = xi * self.beta0
+        self.last_xi = xi
+        ctx.prec = y_prec
+
+        try:
+
+            frac = ctx.frac(xi)
+
+            if xi < 0 or ctx.almosteq(frac, 0) or ctx.almosteq(frac, 1):
+                return AMBIGUOUS
+
+        finally:
+            ctx.prec = x_prec
+
+        return int(xi)
+
+cdef class FixedPointEvaluator(XiEvaluator):
+    """Evaluates xi as an integer dot product of the coefficients of B with a table of powers of beta0 that are
+    scaled by 2 ** prec and rounded down. The tables are cached per precision. A floor is ambiguous if the error
+    bound of the dot product straddles an integer. The bound covers both the rounding of the table and the error of
+    `beta0` itself, which is only accurate to `max_prec` bits, so precisions close to `max_prec` lose about
+    deg * log2(beta0) bits.
+
+    If `gmpy2` is installed, the tables hold `gmpy2.mpz`; otherwise they hold Python `int`s.
+    """
+
+    def __init__(self, beta0, min_poly_coefs, max_prec):
+
+        super().__init__(beta0, min_poly_coefs, max_prec)
+        self._tables = {}
+
+    cdef list _power_table(self, DPS_t prec):
+
+        cdef DEG_t j
+        cdef list table
+
+        try:
+            return self._tables[prec]
+
+        except KeyError:
+            pass
+
+        if len(self._tables) >= MAX_NUM_TABLES:
+            self._tables.clear()
+
+        # the guard bits make the rounding error of `pow_` less than one unit in the last place of `table[j]`, so that
+        # each entry of the table is within two units of the power of the `mpf` beta0
+        beta0_ceil = int(self.ctx.ceil(self.beta0))
+        guard = (self.deg + 1) * beta0_ceil.bit_length() + int(self.deg).bit_length() + 8
+        table = []
+
+        with self.ctx.workprec(prec + guard):
+
+            beta0 = self.ctx.mpf(self.beta0)
+            pow_ = beta0
+
+            for j in range(self.deg):
+                # the error of beta0 is at most beta0 * 2 ** -max_prec, and that of beta0 ** (j + 1) is at most
+                # (j + 1) * beta0 ** (j + 1) * 2 ** -max_prec, up to terms of second order that the factor 2 absorbs
+                table.append((
+                    _mpz(int(self.ctx.floor(self.ctx.ldexp(pow_, prec)))),
+                    _shift_up((j + 1) * beta0_ceil ** (j + 1), prec - self.max_prec + 1) + 2
+                ))
+                pow_ *= beta0
+
+        self._tables[prec] = table
+        return table
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cpdef C_t floor_xi(self, const COEF_t[:] coefs, DPS_t x_prec, DPS_t y_prec) except -2:
+
+        cdef DEG_t j
+        cdef COEF_t c
+        cdef list table = self._power_table(x_prec)
+
+        scaled_xi = 0
+        err = 2
+
+        for j in range(min(self.deg, coefs.shape[0])):
+
+            c = coefs[j]
+
+            if c != 0:
+
+                power, power_err = table[j]
+                scaled_xi += c * power
+                err += (c if c > 0 else -c) * power_err
+
+        return self._certified_floor(scaled_xi, err, x_prec)
+
+    def floor_xi_wide(self, coefs, x_prec, y_prec):
+        """Same as `floor_xi`, but the coefficients are Python `int`s of any size (cf `beta_numbers.wide_orbits`)."""
+
+        table = self._power_table(x_prec)
+        scaled_xi = 0
+        err = 2
+
+        for c, (power, power_err) in zip(coefs, table):
+
+            if c != 0:
+
+                scaled_xi += c * power
+                err += abs(c) * power_err
+
+        return self._certified_floor(scaled_xi, err, x_prec)
+
+    cdef C_t _certified_floor(self, object scaled_xi, object err, DPS_t prec) except -2:
+        """Return the floor of `scaled_xi / 2 ** prec` if it is the same for every value within `err` units of
+        `scaled_xi`, otherwise `AMBIGUOUS`."""
+
+        lower = scaled_xi - err
+
+        if lower >= 0:
+
+            floor_ = lower >> prec
+
+            if floor_ == (scaled_xi + err) >> prec:
+                return floor_
+
+        scaled_xi = int(scaled_xi)
+        self.ctx.prec = max(scaled_xi.bit_length(), 53)
+        self.last_xi = self.ctx.mpf((scaled_xi, -prec))
+        return AMBIGUOUS
+
+cdef class IncrementalEvaluator(FixedPointEvaluator):
+    """Carries xi forward from one step to the next instead of evaluating B_{n-1} from scratch.
+
+    Since B_n(x) = x * B_{n-1}(x) - c_n, the fractional part y_n = B_n(beta0) = xi_n - c_n satisfies
+    xi_{n+1} = beta0 * y_n, which is a single fixed-point multiplication. The error of y_n grows by a factor of about
+    beta0 per step, so xi is re-anchored against the exact integer polynomial B_{n-1} (via the dot product of
+    `FixedPointEvaluator`) every `anchor_period` steps, whenever the error exceeds the budget of
+    `prec - y_prec` bits (at least `x_y_prec_offset` bits, cf `_single_orbit`), whenever a higher precision is
+    requested, and whenever the floor is ambiguous. The number of anchors is `num_anchors`.
+
+    Anchors are made at `anchor_period * log2(ceil(beta0))` bits above the requested precision (at most `max_prec`),
+    so that the error budget usually lasts for the whole period.
+    """
+
+    carries_state = True
+
+    def __init__(self, beta0, min_poly_coefs, max_prec, anchor_period = 64):
+        """
+        :param anchor_period: (type `int`, positive, default 64) Maximum number of steps between anchors.
+        """
+
+        super().__init__(beta0, min_poly_coefs, max_prec)
+
+        if anchor_period <= 0:
+            raise ValueError("`anchor_period` must be positive.")
+
+        self.anchor_period = anchor_period
+        self.num_anchors = 0
+        self._beta0_ceil = int(self.ctx.ceil(beta0))
+        self._extra_prec = anchor_period * (self._beta0_ceil - 1).bit_length()
+        self._prec = -1
+        self._pending = False
+
+    cpdef C_t floor_xi(self, const COEF_t[:] coefs, DPS_t x_prec, DPS_t y_prec) except -2:
+
+        cdef C_t cn
+
+        if self._pending or self._prec < x_prec or self._num_steps >= self.anchor_period:
+            # first step, escalation within a step, higher precision requested, or anchor period elapsed
+            return self._anchor(coefs, x_prec)
+
+        err = self._beta0_ceil * self._err + self._beta0_err * ((abs(self._scaled_y) >> self._prec) + 1) + 1
+
+        if err.bit_length() > self._prec - y_prec:
+            # error budget exhausted
+            return self._anchor(coefs, x_prec)
+
+        self._scaled_xi = (self._scaled_beta0 * self._scaled_y) >> self._prec
+        self._err = err
+        self._pending = True
+        cn = self._certified_floor(self._scaled_xi, err, self._prec)
+
+        if cn == AMBIGUOUS:
+            # might only be the accumulated error
+            return self._anchor(coefs, x_prec)
+
+        return cn
+
+    cdef C_t _anchor(self, const COEF_t[:] coefs, DPS_t x_prec) except -2:
+
+        cdef DEG_t j
+        cdef COEF_t c
+        cdef DPS_t prec = min(x_prec + self._extra_prec, max(self.max_prec, x_prec))
+        cdef list table = self._power_table(prec)
+
+        scaled_xi = 0
+        err = 2
+
+        for j in range(min(self.deg, coefs.shape[0])):
+
+            c = coefs[j]
+
+            if c != 0:
+
+                power, power_err = table[j]
+                scaled_xi += c * power
+                err += (c if c > 0 else -c) * power_err
+
+        self.num_anchors += 1
+        self._num_steps = 0
+        self._prec = prec
+        self._scaled_beta0, self._beta0_err = table[0]
+        self._scaled_xi = scaled_xi
+        self._err = err
+        self._pending = True
+        return self._certified_floor(scaled_xi, self._err, prec)
+
+    cpdef int advance(self, C_t cn) except -1:
+
+        if self._pending:
+
+            self._scaled_y = self._scaled_xi - ((<object> cn) << self._prec)
+            self._num_steps += 1
+            self._pending = False
+
+        return 0
+
+    cpdef dict stats(self):
+        return {"anchors" : self.num_anchors}
+
+cdef class IntervalEvaluator(XiEvaluator):
+    """Evaluates xi with the interval arithmetic of its own `mpmath` interval context `iv_ctx`, starting from an interval `beta0_iv` that is
+    certified to contain the Perron number. A floor is ambiguous exactly when the resulting interval contains an
+    integer or a negative number, so the floors returned by this evaluator are rigorous and precision is only
+    increased when the interval really straddles an integer.
+    """
+
+    def __init__(self, beta0, min_poly_coefs, max_prec):
+
+        super().__init__(beta0, min_poly_coefs, max_prec)
+        self.iv_ctx = MPIntervalContext()
+        self.beta0_iv = enclose_root(beta0, min_poly_coefs, max_prec, iv_ctx = self.iv_ctx)
+        self.num_evals = 0
+        self.num_ambiguous = 0
+
+    cpdef C_t floor_xi(self, const COEF_t[:] coefs, DPS_t x_prec, DPS_t y_prec) except -2:
+
+        cdef DEG_t j
+
+        self.iv_ctx.prec = x_prec
+        xi = self.iv_ctx.mpf(0)
+
+        for j in range(min(self.deg, coefs.shape[0]) - 1, -1, -1):
+            xi = xi * self.beta0_iv + coefs[j]
+
+        xi = self.beta0_iv * xi
+        self.num_evals += 1
+        lower, upper = xi._mpi_
+
+        if lower[0] == 0: # sign bit, lower >= 0
+
+            floor_ = to_int(lower, "f")
+
+            if floor_ == to_int(upper, "f"):
+                return floor_
+
+        self.num_ambiguous += 1
+
+        self.ctx.prec = x_prec
+        self.last_xi = self.ctx.mpf(xi.mid)
+
+        return AMBIGUOUS
+
+    cpdef dict stats(self):
+        return {"evals" : self.num_evals, "ambiguous" : self.num_ambiguous}
+
+cdef class TraceEvaluator(FixedPointEvaluator):
+    """Evaluates xi = A(beta0), where A(x) = x * B(x), as the exact integer trace of A minus the contribution of
+    the other conjugates:
+
+        xi = sum_j b_j * p_{j + 1} - sum_j b_j * W_j,
+
+    where p_k is the k-th Newton power sum of the roots of the minimal polynomial (an integer, see
+    `newton_power_sums`) and W_j is the sum of alpha ** (j + 1) over the conjugates alpha != beta0. The W_j are
+    tabulated in fixed point, like the powers of `FixedPointEvaluator`. For a Salem number the conjugates lie on the
+    unit circle or inside it, so |W_j| <= deg - 1 and the number of bits needed is about
+    y_prec + log2(deg * sum_j |b_j|) rather than y_prec + x_y_prec_offset, which grows with deg * log2(beta0).
+
+    The conjugates are only known to about `conj_prec` bits, so the tables are limited to `conj_prec - 16` bits.
+    """
+
+    def __init__(self, beta0, min_poly_coefs, max_prec, conjs = None, conj_prec = None):
+        """
+        :param conjs: (type `list` of `mpc`, default `None`) The roots of the minimal polynomial other than `beta0`,
+        repeated according to their multiplicity. If `None`, they are calculated with `polyroots`.
+        :param conj_prec: (type `int`, positive, default `None`) The binary precision of `conjs`. If `None`, it is
+        `max_prec`.
+        """
+
+        super().__init__(beta0, min_poly_coefs, max_prec)
+
+        if conjs is None:
+
+            with self.ctx.workprec(max_prec):
+
+                roots = self.ctx.polyroots([int(c) for c in min_poly_coefs[::-1]], maxsteps = 200, extraprec = max_prec)
+                roots.sort(key = lambda root: -abs(root))
+                conjs = roots[1:]
+
+        if len(conjs) != self.deg - 1:
+            raise ValueError(f"Expected {self.deg - 1} conjugates, got {len(conjs)}.")
+
+        self.conjs = list(conjs)
+        self.power_sums = newton_power_sums(min_poly_coefs, self.deg)
+        self._conj_mod = max([1.] + [float(abs(conj)) for conj in self.conjs])
+        self._conj_prec = (max_prec if conj_prec is None else conj_prec) - 16
+        self.num_evals = self.num_ambiguous = self.max_prec_used = 0
+
+    @classmethod
+    def from_perron(cls, beta, max_prec, conjs = None, **kwargs):
+        """The conjugates are `conjs` if given, for instance read from `perron_conjs_reg` (cf `calc_orbits`).
+        Otherwise they are calculated once at the current precision, without changing `beta`. A root of multiplicity
+        m is only accurate to about `max_prec / m` bits, so the precision of the tables is limited accordingly if the
+        minimal polynomial has repeated roots."""
+
+        min_poly_coefs = beta.min_poly.get_ndarray()[ : beta.deg + 1].astype(np.int64)
+
+        if conjs is not None:
+            return cls(beta.beta0, min_poly_coefs, max_prec, conjs = conjs, **kwargs)
+
+        # the root of largest modulus is beta0
+        conjs_mods_mults = sorted(beta.min_poly.roots(), key = lambda t : -t[1])[1 : ]
+        return cls(
+            beta.beta0, min_poly_coefs, max_prec,
+            conjs = [conj for conj, _, mult in conjs_mods_mults for _ in range(mult)],
+            conj_prec = max_prec // max([1] + [mult for _, _, mult in conjs_mods_mults]), **kwargs
+        )
+
+    cdef list _power_table(self, DPS_t prec):
+        """Entries are pairs, floor(W_j * 2 ** prec) and a bound on its error in units of 2 ** -prec."""
+
+        cdef DEG_t j
+        cdef list table
+
+        try:
+            return self._tables[prec]
+
+        except KeyError:
+            pass
+
+        if len(self._tables) >= MAX_NUM_TABLES:
+            self._tables.clear()
+
+        table = []
+        guard = int(self.deg).bit_length() + 8 + self.deg * int(math.ceil(math.log2(self._conj_mod)))
+
+        with self.ctx.workprec(prec + guard):
+
+            pows = [self.ctx.mpc(conj) for conj in self.conjs]
+
+            for j in range(self.deg):
+
+                w = self.ctx.fsum(pow_.real for pow_ in pows)
+                # each conjugate is accurate to `_conj_prec` bits, and the error of alpha ** (j + 1) is at most
+                # (j + 1) * |alpha| ** j times that
+                conj_err = (self.deg - 1) * (j + 1) * self._conj_mod ** (j + 1) * 2. ** (prec - self._conj_prec)
+                table.append((_mpz(int(self.ctx.floor(self.ctx.ldexp(w, prec)))), int(math.ceil(conj_err)) + 2))
+                pows = [pow_ * conj for pow_, conj in zip(pows, self.conjs)]
+
+        self._tables[prec] = table
+        return table
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cpdef C_t floor_xi(self, const COEF_t[:] coefs, DPS_t x_prec, DPS_t y_prec) except -2:
+
+        cdef DEG_t j, n = min(self.deg, coefs.shape[0])
+        cdef COEF_t c
+        cdef DPS_t prec
+        cdef list table
+        cdef C_t cn
+
+        trace = 0
+        abs_sum = 0
+
+        for j in range(n):
+
+            c = coefs[j]
+
+            if c != 0:
+
+                trace += c * self.power_sums[j]
+                abs_sum += c if c > 0 else -c
+
+        prec = y_prec + (self.deg * abs_sum).bit_length() + self.deg * int(math.ceil(math.log2(self._conj_mod))) + 4
+
+        if prec > self._conj_prec:
+            prec = self._conj_prec
+
+        if prec > self.max_prec_used:
+            self.max_prec_used = prec
+
+        table = self._power_table(prec)
+        scaled_xi = trace << prec
+        err = 1
+
+        for j in range(n):
+
+            c = coefs[j]
+
+            if c != 0:
+
+                w, w_err = table[j]
+                scaled_xi -= c * w
+                err += (c if c > 0 else -c) * w_err
+
+        self.num_evals += 1
+        cn = self._certified_floor(scaled_xi, err, prec)
+
+        if cn == AMBIGUOUS:
+            self.num_ambiguous += 1
+
+        return cn
+
+    cpdef dict stats(self):
+        return {"evals" : self.num_evals, "ambiguous" : self.num_ambiguous, "max_prec_used" : self.max_prec_used}
+
+cdef object _shift_up(object x, DPS_t shift):
+    """ceil(x * 2 ** shift) for a non-negative integer `x`."""
+
+    if shift >= 0:
+        return x << shift
+
+    return -((-x) >> -shift)
+
+def newton_power_sums(min_poly_coefs, num_sums):
+    """Return the power sums p_1, ..., p_{num_sums} of the roots of a monic integer polynomial, computed exactly with
+    Newton's identities. p_1 is the trace.
+
+    :param min_poly_coefs: (type `numpy.ndarray`) Coefficients, the 0-index term is the coefficient of the 0-degree
+    term. The polynomial must be monic.
+    :param num_sums: (type `int`, positive)
+    :return: (type `list` of `int`)
+    """
+
+    deg = len(min_poly_coefs) - 1
+
+    if min_poly_coefs[deg] != 1:
+        raise ValueError("The polynomial must be monic.")
+
+    # a[i] is the coefficient of x ** (deg - i), so the polynomial is x ** deg + a[1] * x ** (deg - 1) + ... + a[deg]
+    a = [int(min_poly_coefs[deg - i]) for i in range(deg + 1)] + [0] * max(0, num_sums - deg)
+    power_sums = []
+
+    for k in range(1, num_sums + 1):
+        power_sums.append(-k * a[k] - sum(a[i] * power_sums[k - i - 1] for i in range(1, k)))
+
+    return power_sums
+
+cdef class TieredEvaluator(XiEvaluator):
+    """Tries hardware float64 first, then double-double, and only falls back to a multiprecision evaluator if
+    neither can decide the floor.
+
+    Both fast tiers use Horner's method with a rigorous forward error bound of the form
+    k * u * max_abs_coef * (ceil(beta0) + ... + ceil(beta0) ** deg), where u is the unit roundoff of the tier and
+    k is linear in `deg`. The number of floors decided by each tier is counted in `num_float64`,
+    `num_double_double`, and `num_fallback`.
+    """
+
+    def __init__(self, beta0, min_poly_coefs, max_prec, fallback = "mpmath"):
+        """
+        :param fallback: (type `str`, default "mpmath") Key of `EVALUATORS`, the evaluator used when neither fast tier
+        can decide the floor. Evaluators that carry state from one step to the next cannot be used.
+        """
+
+        super().__init__(beta0, min_poly_coefs, max_prec)
+
+        try:
+            fallback_cls = EVALUATORS[fallback]
+
+        except KeyError:
+            raise ValueError(f"`fallback` must be one of {', '.join(EVALUATORS.keys())}, not `{fallback}`.") from None
+
+        if fallback_cls is TieredEvaluator or fallback_cls.carries_state:
+            raise ValueError(f"`{fallback}` cannot be a fallback.")
+
+        self.fallback = fallback_cls(beta0, min_poly_coefs, max_prec)
+        self.num_float64 = self.num_double_double = self.num_fallback = 0
+
+        with self.ctx.workprec(max(max_prec, 128)):
+
+            self._beta0_hi = float(beta0)
+            self._beta0_lo = float(self.ctx.mpf(beta0) - self._beta0_hi)
+
+        self._beta0 = self._beta0_hi
+        self._beta0_ceil = float(self.ctx.ceil(beta0))
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cpdef C_t floor_xi(self, const COEF_t[:] coefs, DPS_t x_prec, DPS_t y_prec) except -2:
+
+        cdef DEG_t j, n = min(self.deg, coefs.shape[0])
+        cdef COEF_t c, max_abs_coef = 0
+        cdef double geom = 0., pow_ = 1., bound, err
+        cdef C_t cn
+
+        for j in range(n):
+
+            c = coefs[j]
+
+            if c > max_abs_coef:
+                max_abs_coef = c
+
+            elif -c > max_abs_coef:
+                max_abs_coef = -c
+
+            pow_ *= self._beta0_ceil
+            geom += pow_
+
+        # `bound` is at least the sum of |c_j| * beta0 ** (j + 1); the factor absorbs the rounding error of `geom`
+        bound = max_abs_coef * geom * (1. + 2. ** -40)
+        err = (3 * n + 3) * 1.01 * U64 * bound
+
+        if err < 0.25:
+
+            cn = _float64_floor(coefs, n, self._beta0, err)
+
+            if cn != AMBIGUOUS:
+
+                self.num_float64 += 1
+                return cn
+
+        err = (8 * n + 8) * UDD * bound
+
+        if err < 0.25:
+
+            cn = _double_double_floor(coefs, n, self._beta0_hi, self._beta0_lo, err)
+
+            if cn != AMBIGUOUS:
+
+                self.num_double_double += 1
+                return cn
+
+        self.num_fallback += 1
+        cn = self.fallback.floor_xi(coefs, x_prec, y_prec)
+
+        if cn == AMBIGUOUS:
+            self.last_xi = self.fallback.last_xi
+
+        return cn
+
+    cpdef dict stats(self):
+
+        ret = {
+            "float64" : self.num_float64,
+            "double_double" : self.num_double_double,
+            "fallback" : self.num_fallback
+        }
+
+        for key, val in self.fallback.stats().items():
+            ret[f"fallback_{key}"] = val
+
+        return ret
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef C_t _float64_floor(const COEF_t[:] coefs, DEG_t n, double beta0, double err) noexcept nogil:
+    """floor(beta0 * B(beta0)) in float64, or `AMBIGUOUS` if `err` (plus the rounding of `xi +- err`) straddles an
+    integer."""
+
+    cdef DEG_t j
+    cdef double xi = 0., lower
+
+    for j in range(n - 1, -1, -1):
+        xi = xi * beta0 + <double> coefs[j]
+
+    xi *= beta0
+    err += fabs(xi) * 2. ** -51
+    lower = floor(xi - err)
+
+    if lower >= 0 and lower == floor(xi + err):
+        return <C_t> lower
+
+    return AMBIGUOUS
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef C_t _double_double_floor(
+    const COEF_t[:] coefs, DEG_t n, double beta0_hi, double beta0_lo, double err
+) noexcept nogil:
+    """floor(beta0 * B(beta0)) in double-double arithmetic, or `AMBIGUOUS` if `err` straddles an integer."""
+
+    cdef DEG_t j
+    cdef COEF_t c
+    cdef double hi = 0., lo = 0., p, e, s, t
+    cdef COEF_t lower
+
+    for j in range(n, -1, -1):
+        # (hi, lo) *= beta0
+        p = hi * beta0_hi
+        e = fma(hi, beta0_hi, -p) + hi * beta0_lo + lo * beta0_hi
+        hi = p + e
+        lo = e - (hi - p)
+
+        if j > 0:
+            # (hi, lo) += coefs[j - 1], which is split exactly into two doubles
+            c = coefs[j - 1]
+            t = <double> c
+            s = hi + t
+            e = (hi - (s - (s - hi))) + (t - (s - hi)) + lo + <double> (c - <COEF_t> t)
+            hi = s + e
+            lo = e - (hi - s)
+
+    err += fabs(hi) * 2. ** -100
+    lower = _dd_floor(hi, lo, -err)
+
+    if lower >= 0 and lower == _dd_floor(hi, lo, err):
+        return <C_t> lower
+
+    return AMBIGUOUS
+
+cdef inline COEF_t _dd_floor(double hi, double lo, double shift) noexcept nogil:
+    """floor(hi + lo + shift), where |lo| is at most half a unit in the last place of `hi`. The result is an integer
+    type because floor(hi) + floor(lo) is not always representable as a double."""
+
+    cdef double s, e, f
+
+    s = hi + shift
+    e = (hi - (s - (s - hi))) + (shift - (s - hi)) + lo
+    f = floor(s)
+
+    if f == s:
+        return <COEF_t> f + <COEF_t> floor(e)
+
+    else:
+        # |s| < 2 ** 52, so floor is exact and |e| is too small to cross an integer unless s + e rounds onto one
+        return <COEF_t> floor(s + e)
+
+def enclose_root(beta0, min_poly_coefs, max_prec, num_attempts = 16, iv_ctx = None):
+    """Return an interval `mpf` that contains `beta0` and that is certified to contain a root of the polynomial
+    `min_poly_coefs`, namely because the polynomial changes sign between the endpoints.
+
+    :param beta0: (type `mpf`) Approximation of a simple real root.
+    :param min_poly_coefs: (type `numpy.ndarray`) Coefficients, the 0-index term is the coefficient of the 0-degree
+    term.
+    :param max_prec: (type `int`, positive) The precision of `beta0`, in bits.
+    :param num_attempts: (type `int`, positive, default 16) Number of times to widen the interval by a factor of 256
+    before giving up.
+    :param iv_ctx: (type `MPIntervalContext`, default `None`) The interval context of the returned interval. If `None`,
+    a new context is used. Its precision is changed.
+    :raises ValueError: If no sign change is found.
+    """
+
+    ctx = mpmath.MPContext()
+    ctx.prec = max_prec + 32
+
+    if iv_ctx is None:
+        iv_ctx = MPIntervalContext()
+
+    iv_ctx.prec = max_prec + 32
+    beta0 = ctx.mpf(beta0)
+    rad = ctx.ldexp(abs(beta0), 4 - max_prec)
+
+    for _ in range(num_attempts):
+
+        lower_eval = upper_eval = iv_ctx.mpf(0)
+        lower = iv_ctx.mpf(beta0 - rad)
+        upper = iv_ctx.mpf(beta0 + rad)
+
+        for c in min_poly_coefs[::-1]:
+
+            lower_eval = lower_eval * lower + int(c)
+            upper_eval = upper_eval * upper + int(c)
+
+        if (lower_eval.b < 0 < upper_eval.a) or (upper_eval.b < 0 < lower_eval.a):
+            return iv_ctx.mpf([beta0 - rad, beta0 + rad])
+
+        rad *= 256
+
+    raise ValueError(f"Could not certify an interval around `beta0 = {beta0}`.")
+
+EVALUATORS = {
+    "mpmath": MPMathEvaluator,
+    "fixed": FixedPointEvaluator,
+    "incremental": IncrementalEvaluator,
+    "interval": IntervalEvaluator,
+    "tiered": TieredEvaluator,
+    "trace": TraceEvaluator
+}
+
+def get_evaluator(name, beta, max_prec, **kwargs):
+    """Return a `XiEvaluator` for the `Perron_Number` `beta`.
+
+    :param name: (type `str`) One of the keys of `EVALUATORS`.
+    :param beta: (type `Perron_Number`) `beta.beta0` must already be calculated.
+    :param max_prec: (type `int`, positive) Maximum binary precision.
+    :param kwargs: Passed to the constructor of the evaluator.
+    """
+
+    try:
+        cls = EVALUATORS[name]
+
+    except KeyError:
+        raise ValueError(f"`evaluator` must be one of {', '.join(EVALUATORS.keys())}, not `{name}`.") from None
+
+    return cls.from_perron(beta, max_prec, **kwargs)
@@ -0,0 +1,167 @@
+"""
+    Beta Expansions of Salem Numbers, calculating periods thereof
+    Copyright (C) 2021 Michael P. Lane
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+"""
+import fcntl
+import os
+import secrets
+import socket
+import struct
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+MAX_OWNER_LEN = 64
+# owner, heartbeat time, expiry time
+_FORMAT = struct.Struct(f"<{MAX_OWNER_LEN}sdd")
+
+class LeaseTable:
+    """Leases on the orbits of `calc_orbits`, so that two processes never calculate the same orbit at the same time,
+    for instance when a SLURM job array is resubmitted while stragglers of the last one still run, or when two arrays
+    overlap. Otherwise, the `_fix_problems` of one process wipes the orbit calculated by the other.
+
+    A process claims an orbit before it fixes and calculates it, renews the lease at every `Block` dump, and releases
+    it when it is done. A lease that is not renewed for `lease_secs` seconds expires, and the orbit may be claimed by
+    another process, so that the orbits of dead processes are calculated again. `lease_secs` must therefore be much
+    greater than the time between two `Block` dumps of an orbit, and the clocks of the hosts must agree.
+
+    The leases of a poly apri are fixed-size records (owner, heartbeat time, expiry time) at position `index` of the
+    file `leases_<deg>_<sum_abs_coef>.bin` of `lease_dir`, which grows as orbits are claimed. Every operation holds an
+    exclusive `fcntl.flock` lock of the file, and a process only writes a record if it owns the lease or the lease is
+    free or expired.
+    """
+
+    def __init__(self, lease_dir, lease_secs = 600.):
+        """
+        :param lease_dir: (type `str` or `pathlib.Path`)
+        :param lease_secs: (type `float`, positive, default 600.)
+        """
+
+        if lease_secs <= 0:
+            raise ValueError("`lease_secs` must be positive.")
+
+        self.lease_dir = Path(lease_dir)
+        self.lease_dir.mkdir(parents = True, exist_ok = True)
+        self.lease_secs = lease_secs
+        self._pid = None
+        self._owner = None
+
+    @property
+    def owner(self):
+        """Identifies this process, and is unique even if a pid is reused."""
+
+        if self._pid != os.getpid():
+
+            self._pid = os.getpid()
+            self._owner = f"{socket.gethostname()}:{self._pid}:{secrets.token_hex(4)}".encode()[-MAX_OWNER_LEN : ]
+
+        return self._owner
+
+    def get_filename(self, apri):
+        return self.lease_dir / f"leases_{apri.deg}_{apri.sum_abs_coef}.bin"
+
+    def get(self, orbit_apri):
+        """The lease of `orbit_apri`.
+
+        :return: (type `tuple`) The owner (type `str`), heartbeat and expiry times (type `float`), or `None` if
+        `orbit_apri` was never claimed or was released.
+        """
+
+        with self._locked(orbit_apri) as fd:
+            owner, heartbeat, expiry = self._read(fd, orbit_apri.index)
+
+        return (owner.decode(), heartbeat, expiry) if len(owner) > 0 else None
+
+    def claim(self, orbit_apri):
+        """Claim `orbit_apri` for `lease_secs` seconds, unless another process holds an unexpired lease.
+
+        :return: (type `bool`) Whether this process holds the lease.
+        """
+
+        with self._locked(orbit_apri) as fd:
+
+            owner, _, expiry = self._read(fd, orbit_apri.index)
+            now = time.time()
+
+            if len(owner) > 0 and owner != self.owner and expiry > now:
+                return False
+
+            self._write(fd, orbit_apri.index, self.owner, now, now + self.lease_secs)
+            return True
+
+    def renew(self, orbit_apri):
+        """Extend the lease of `orbit_apri` by `lease_secs` seconds. A process that cannot renew a lease must stop
+        calculating the orbit, which another process may already calculate.
+
+        :return: (type `bool`) Whether this process still held the lease.
+        """
+
+        with self._locked(orbit_apri) as fd:
+
+            owner, _, _ = self._read(fd, orbit_apri.index)
+            now = time.time()
+
+            # an expired lease that no other process claimed since is still held
+            if owner != self.owner:
+                return False
+
+            self._write(fd, orbit_apri.index, self.owner, now, now + self.lease_secs)
+            return True
+
+    def holds(self, orbit_apri):
+        """Whether this process holds the lease of `orbit_apri`."""
+
+        with self._locked(orbit_apri) as fd:
+            owner, _, _ = self._read(fd, orbit_apri.index)
+
+        return owner == self.owner
+
+    def release(self, orbit_apri):
+        """Release the lease of `orbit_apri`, if this process holds it."""
+
+        with self._locked(orbit_apri) as fd:
+
+            owner, _, _ = self._read(fd, orbit_apri.index)
+
+            if owner == self.owner:
+                self._write(fd, orbit_apri.index, b"", 0., 0.)
+
+    def _read(self, fd, index):
+
+        data = os.pread(fd, _FORMAT.size, index * _FORMAT.size)
+
+        if len(data) < _FORMAT.size:
+            # past the end of the file
+            return b"", 0., 0.
+
+        owner, heartbeat, expiry = _FORMAT.unpack(data)
+        return owner.rstrip(b"\0"), heartbeat, expiry
+
+    def _write(self, fd, index, owner, heartbeat, expiry):
+        os.pwrite(fd, _FORMAT.pack(owner, heartbeat, expiry), index * _FORMAT.size)
+
+    @contextmanager
+    def _locked(self, orbit_apri):
+        """Open the lease file of `orbit_apri` and hold an exclusive lock of it. Every call opens the file, so that the
+        threads of a process exclude each other as well."""
+
+        fd = os.open(self.get_filename(orbit_apri.resp), os.O_RDWR | os.O_CREAT, 0o644)
+
+        try:
+
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield fd
+
+        finally:
+            # also releases the lock
+            os.close(fd)
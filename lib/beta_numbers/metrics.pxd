@@ -0,0 +1,28 @@
+cimport numpy as cnp
+from posix.time cimport clock_gettime, timespec, CLOCK_MONOTONIC
+
+ctypedef cnp.longlong_t N_t
+
+cdef class OrbitMetrics:
+
+    cdef readonly N_t last_n
+    cdef readonly N_t num_iterations
+    cdef readonly N_t num_evals
+    cdef readonly N_t num_prec_increases
+    cdef readonly N_t max_coef_bits
+    cdef readonly N_t num_blk_dumps
+    cdef readonly N_t eval_ns
+    cdef readonly N_t calc_Bn_ns
+    cdef readonly N_t cycle_check_ns
+    cdef readonly N_t io_ns
+    cdef cnp.longlong_t[:] _escalation_counts
+
+    cpdef int record_step(self, N_t n, N_t num_evals, N_t coef_bits) except -1
+
+cdef inline N_t _now_ns() noexcept nogil:
+    """A monotonic clock in nanoseconds, cheap enough to read several times per step."""
+
+    cdef timespec ts
+
+    clock_gettime(CLOCK_MONOTONIC, &ts)
+    return (<N_t> ts.tv_sec) * 1000000000 + ts.tv_nsec
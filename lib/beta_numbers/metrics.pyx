@@ -0,0 +1,157 @@
+"""
+    Beta Expansions of Salem Numbers, calculating periods thereof
+    Copyright (C) 2021 Michael P. Lane
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+"""
+import numpy as np
+from cornifer import Block, NumpyRegister, stack
+from cornifer._utilities import check_type, check_return_Path
+
+NUM_BYTES_PER_TERABYTE = 2 ** 40
+
+# columns of a row of `metrics_reg`, followed by `NUM_ESCALATION_LEVELS` counts: the number of steps whose floor was
+# decided after 0, 1, 2, ... precision increases (the last count includes everything larger)
+METRICS_N = 0
+METRICS_NUM_ITERATIONS = 1
+METRICS_NUM_EVALS = 2
+METRICS_NUM_PREC_INCREASES = 3
+METRICS_MAX_COEF_BITS = 4
+METRICS_NUM_BLK_DUMPS = 5
+METRICS_EVAL_NS = 6
+METRICS_CALC_BN_NS = 7
+METRICS_CYCLE_CHECK_NS = 8
+METRICS_IO_NS = 9
+METRICS_HEADER_LEN = 10
+NUM_ESCALATION_LEVELS = 16
+METRICS_LEN = METRICS_HEADER_LEN + NUM_ESCALATION_LEVELS
+
+cdef class OrbitMetrics:
+    """Counters of the work done by `_single_orbit` on one orbit, saved to `metrics_reg` (cf `calc_orbits`) every
+    time the `Block`s of the orbit are dumped. The counters of an orbit accumulate over all the processes that
+    calculated it.
+
+    `_single_orbit` calls `record_step` once c_n is decided, and adds the nanoseconds (cf `_now_ns`) spent in each part
+    of a step to `eval_ns`, `calc_Bn_ns`, `cycle_check_ns` and `io_ns` directly.
+    """
+
+    def __init__(self):
+
+        self.last_n = 0
+        self.num_iterations = 0
+        self.num_evals = 0
+        self.num_prec_increases = 0
+        self.max_coef_bits = 0
+        self.num_blk_dumps = 0
+        self.eval_ns = 0
+        self.calc_Bn_ns = 0
+        self.cycle_check_ns = 0
+        self.io_ns = 0
+        self._escalation_counts = np.zeros(NUM_ESCALATION_LEVELS, dtype = np.int64)
+
+    cpdef int record_step(self, N_t n, N_t num_evals, N_t coef_bits) except -1:
+        """c_n was decided after `num_evals` calls to `floor_xi`, and the largest coefficient of B_{n-1} has
+        `coef_bits` bits."""
+
+        cdef N_t level = min(num_evals - 1, NUM_ESCALATION_LEVELS - 1)
+
+        self.last_n = n
+        self.num_iterations += 1
+        self.num_evals += num_evals
+        self.num_prec_increases += num_evals - 1
+        self._escalation_counts[level] += 1
+
+        if coef_bits > self.max_coef_bits:
+            self.max_coef_bits = coef_bits
+
+        return 0
+
+    def get_row(self):
+        """The row of `metrics_reg`, a 1-dimensional `int64` array with `METRICS_LEN` entries.
+
+        :return: (type `numpy.ndarray`)
+        """
+
+        row = np.empty(METRICS_LEN, dtype = np.int64)
+        row[METRICS_N] = self.last_n
+        row[METRICS_NUM_ITERATIONS] = self.num_iterations
+        row[METRICS_NUM_EVALS] = self.num_evals
+        row[METRICS_NUM_PREC_INCREASES] = self.num_prec_increases
+        row[METRICS_MAX_COEF_BITS] = self.max_coef_bits
+        row[METRICS_NUM_BLK_DUMPS] = self.num_blk_dumps
+        row[METRICS_EVAL_NS] = self.eval_ns
+        row[METRICS_CALC_BN_NS] = self.calc_Bn_ns
+        row[METRICS_CYCLE_CHECK_NS] = self.cycle_check_ns
+        row[METRICS_IO_NS] = self.io_ns
+        row[METRICS_HEADER_LEN : ] = self._escalation_counts
+        return row
+
+    def set_row(self, row):
+        """Continue counting from `row`, the output of `get_row` of a previous process."""
+
+        self.last_n = row[METRICS_N]
+        self.num_iterations = row[METRICS_NUM_ITERATIONS]
+        self.num_evals = row[METRICS_NUM_EVALS]
+        self.num_prec_increases = row[METRICS_NUM_PREC_INCREASES]
+        self.max_coef_bits = row[METRICS_MAX_COEF_BITS]
+        self.num_blk_dumps = row[METRICS_NUM_BLK_DUMPS]
+        self.eval_ns = row[METRICS_EVAL_NS]
+        self.calc_Bn_ns = row[METRICS_CALC_BN_NS]
+        self.cycle_check_ns = row[METRICS_CYCLE_CHECK_NS]
+        self.io_ns = row[METRICS_IO_NS]
+        self._escalation_counts = np.array(row[METRICS_HEADER_LEN : METRICS_LEN], dtype = np.int64)
+
+    @property
+    def escalation_counts(self):
+        """The last `NUM_ESCALATION_LEVELS` entries of the row."""
+        return np.asarray(self._escalation_counts).copy()
+
+def calc_metrics_setup(perron_polys_reg, saves_dir):
+    """Setup and return the `Register` `metrics_reg` (cf `calc_orbits`).
+
+    :param perron_polys_reg: (type `IntPolynomialRegister`)
+    :param saves_dir: (type `str` or `pathlib.Path`)
+    :return: (type `NumpyRegister`)
+    """
+
+    check_type(perron_polys_reg, "perron_polys_reg", NumpyRegister)
+    check_return_Path(saves_dir, "saves_dir")
+    metrics_reg = NumpyRegister(
+        saves_dir,
+        "metrics_reg",
+"""Counters of the work done on the orbits of `poly_orbit_reg`. The apris are the same as `status_reg`. Each row is
+an `int64` record (cf `OrbitMetrics.get_row`), accumulated over all the processes that calculated the orbit:
+0. The index n of the last coefficient counted, or 0 if nothing was counted.
+1. The number of iterations of the orbit loop.
+2. The number of evaluations of xi, at least one per iteration.
+3. The number of times the precision was increased.
+4. The largest number of bits of a coefficient of a poly of the orbit.
+5. The number of times the `Block`s of the orbit were dumped.
+6. The nanoseconds spent evaluating xi.
+7. The nanoseconds spent calculating B_n, including the monotone data and the comparisons with B_0 and B_1.
+8. The nanoseconds spent in the cycle detector.
+9. The nanoseconds spent dumping `Block`s and saving the status and resume data.
+Then the number of iterations decided after 0, 1, 2, ... precision increases (the last includes everything larger).""",
+        NUM_BYTES_PER_TERABYTE
+    )
+
+    with stack(perron_polys_reg.open(True), metrics_reg.open()):
+
+        for apri in perron_polys_reg:
+
+            for startn, length in perron_polys_reg.intervals(apri):
+
+                seg = np.zeros((length, METRICS_LEN), dtype = np.int64)
+
+                with Block(seg, apri, startn) as blk:
+                    metrics_reg.add_disk_blk(blk)
+
+    return metrics_reg
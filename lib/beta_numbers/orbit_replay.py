@@ -0,0 +1,175 @@
+"""
+    Beta Expansions of Salem Numbers, calculating periods thereof
+    Copyright (C) 2021 Michael P. Lane
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+"""
+import numpy as np
+from cornifer import ApriInfo
+
+from .batched_orbits import calc_Bn
+
+class OrbitReplay:
+    """Random access to the poly orbit B_1, B_2, ... of an orbit of which only the coefficients and the checkpoints
+    B_K, B_2K, ... are stored, where K is the checkpoint period (cf `calc_orbits`).
+
+    B_n is rebuilt from the nearest checkpoint B_m, m <= n, by exact integer replay of
+    B_i(x) = x * B_{i-1}(x) - c_i modulo the minimal polynomial, so at most K - 1 steps are needed. The last iterate
+    returned is kept, so that reading the iterates in increasing order costs a single step each. If K is 1, then every
+    iterate is a checkpoint and nothing is replayed.
+    """
+
+    def __init__(self, min_poly, checkpoint_period, get_checkpoint, get_coefs, get_checkpoints = None):
+        """
+        :param min_poly: (type `numpy.ndarray`) The monic minimal polynomial, `deg + 1` coefficients. The 0-index term
+        is the coefficient of the 0-degree term.
+        :param checkpoint_period: (type `int`, positive)
+        :param get_checkpoint: (type `callable`) `get_checkpoint(j)` returns B_{j * checkpoint_period} (`j` positive)
+        as a `numpy.ndarray` of at least `deg` coefficients.
+        :param get_coefs: (type `callable`) `get_coefs(startn, stopn)` returns the coefficients c_startn, ...,
+        c_{stopn - 1} as an iterable of `int`s.
+        :param get_checkpoints: (type `callable`, default `None`) `get_checkpoints(startj, stopj)` returns the
+        checkpoints for `j = startj, ..., stopj - 1` as an iterable, and is used by `iter` if `checkpoint_period` is 1.
+        If not given, `get_checkpoint` is called for each `j`.
+        """
+
+        if checkpoint_period <= 0:
+            raise ValueError("`checkpoint_period` must be positive.")
+
+        self._min_poly = np.array(min_poly, dtype = np.int64)[np.newaxis, :]
+        self.deg = self._min_poly.shape[1] - 1
+        self.checkpoint_period = checkpoint_period
+        self._get_checkpoint = get_checkpoint
+        self._get_coefs = get_coefs
+        self._get_checkpoints = get_checkpoints
+        self._n, self._Bn = self._load(0)
+
+    def __call__(self, n):
+        """B_n.
+
+        :param n: (type `int`, positive)
+        :return: (type `numpy.ndarray`) `deg` coefficients.
+        """
+
+        if n <= 0:
+            raise ValueError("`n` must be positive.")
+
+        m = n - n % self.checkpoint_period
+
+        if not m <= self._n <= n:
+            self._n, self._Bn = self._load(m)
+
+        if self._n < n:
+
+            for Bn in self._replay(self._Bn, self._get_coefs(self._n + 1, n + 1)):
+                self._Bn = Bn
+
+            self._n = n
+
+        return self._Bn[0].copy()
+
+    def iter(self, startn, stopn):
+        """B_startn, ..., B_{stopn - 1}, replayed from the checkpoint at or before `startn`, or read directly if
+        `checkpoint_period` is 1. The coefficients are read as the iterates are replayed, and the last iterate kept by
+        `__call__` is not changed.
+
+        :param startn: (type `int`, positive)
+        :param stopn: (type `int`)
+        :return: (type `generator` of `numpy.ndarray`)
+        """
+
+        if startn <= 0:
+            raise ValueError("`startn` must be positive.")
+
+        if stopn <= startn:
+            return
+
+        if self.checkpoint_period == 1:
+
+            if self._get_checkpoints is None:
+
+                for n in range(startn, stopn):
+                    yield self._load(n)[1][0]
+
+            else:
+
+                for Bn in self._get_checkpoints(startn, stopn):
+                    yield np.array(Bn[ : self.deg], dtype = np.int64)
+
+            return
+
+        m, Bn = self._load(startn - startn % self.checkpoint_period)
+
+        for Bn in self._replay(Bn, self._get_coefs(m + 1, startn + 1)):
+            pass
+
+        yield Bn[0].copy()
+
+        for Bn in self._replay(Bn, self._get_coefs(startn + 1, stopn)):
+            yield Bn[0].copy()
+
+    def _load(self, m):
+        """B_m for `m` a multiple of the checkpoint period, as a `(1, deg)` array."""
+
+        if m == 0:
+
+            Bm = np.zeros((1, self.deg), dtype = np.int64)
+            Bm[0, 0] = 1
+
+        else:
+            Bm = np.array(self._get_checkpoint(m // self.checkpoint_period)[ : self.deg], dtype = np.int64)[np.newaxis, :]
+
+        return m, Bm
+
+    def _replay(self, Bn, coefs):
+        """The iterates following `Bn` for the coefficients `coefs`, as a generator."""
+
+        for cn in coefs:
+
+            Bn = calc_Bn(Bn, cn, self._min_poly)
+            yield Bn
+
+def get_checkpoint_apri(orbit_apri, checkpoint_period):
+    """The apri of `poly_orbit_reg` under which the checkpoints of the orbit `orbit_apri` are stored. If
+    `checkpoint_period` is 1, then this is `orbit_apri` itself; otherwise, the checkpoint B_{j * checkpoint_period} is
+    stored at index `j` of an apri with the additional key 'checkpoint_period'.
+
+    :param orbit_apri: (type `ApriInfo`)
+    :param checkpoint_period: (type `int`, positive)
+    :return: (type `ApriInfo`)
+    """
+
+    if checkpoint_period == 1:
+        return orbit_apri
+
+    else:
+        return ApriInfo(resp = orbit_apri.resp, index = orbit_apri.index, checkpoint_period = checkpoint_period)
+
+def get_orbit_replay(poly_orbit_reg, coef_orbit_reg, min_poly, orbit_apri, checkpoint_period = 1):
+    """Random access to the poly orbit `orbit_apri`, as calculated by `calc_orbits` with the same
+    `checkpoint_period`. Both registers must be open.
+
+    :param poly_orbit_reg: (type `IntPolynomialRegister`)
+    :param coef_orbit_reg: (type `NumpyRegister`)
+    :param min_poly: (type `numpy.ndarray`) The monic minimal polynomial, `deg + 1` coefficients.
+    :param orbit_apri: (type `ApriInfo`)
+    :param checkpoint_period: (type `int`, positive, default 1)
+    :return: (type `OrbitReplay`) Call it with `n` to get B_n.
+    """
+
+    checkpoint_apri = get_checkpoint_apri(orbit_apri, checkpoint_period)
+    return OrbitReplay(
+        min_poly,
+        checkpoint_period,
+        lambda j: poly_orbit_reg[checkpoint_apri, j].get_ndarray(),
+        lambda startn, stopn: coef_orbit_reg[orbit_apri, startn : stopn],
+        lambda startj, stopj: (poly.get_ndarray() for poly in poly_orbit_reg[checkpoint_apri, startj : stopj])
+    )
@@ -22,10 +22,14 @@ from cornifer.debug import log
 from mpmath import almosteq, mp, fmul
 from intpolynomials import IntPolynomial, IntPolynomialRegister, IntPolynomialArray, IntPolynomialIter
 
+from .profiling import log_timers
+from .progress import ProgressFile
 from .registers import MPFRegister
 from .utilities import setdps
 
 NUM_BYTES_PER_TERABYTE = 2 ** 40
+# number of polynomials between two updates of the progress file of `calc_perron_nums`
+PROGRESS_PERIOD = 1 << 12
 _debug = 0
 
 class Not_Salem_Error(RuntimeError):pass
@@ -140,7 +144,8 @@ class Perron_Number:
 
     def boyd_C(self):
 
-        beta0 = self.calc_roots()[0]
+        # `beta0` is often read from `perron_nums_reg`, and the roots are not needed otherwise
+        beta0 = self.beta0 if self.beta0 is not None else self.calc_roots()[0]
         disc = self.min_poly.discriminant()
         return beta0 ** (self.deg - 1) * (math.pi / 6) ** (-1 + self.deg / 2) / math.sqrt(abs(disc))
 
@@ -317,8 +322,26 @@ def calc_salem_nums_setup_regs(saves_dir):
 
 def calc_perron_nums(
     max_sum_abs_coef, blk_size, dps, perron_polys_reg, perron_nums_reg, perron_conjs_reg, num_procs,
-    proc_index, timers
+    proc_index, timers, progress_dir = None
 ):
+    """Calculate the Perron numbers with minimal polynomials of degree `d` and sum of absolute coefficients at most
+    `max_sum_abs_coef[d]`. Every process calculates the sums of absolute coefficients `3 + proc_index`,
+    `3 + proc_index + num_procs`, ...
+
+    If `progress_dir` is given, then the apris completed out of those assigned to this process, the polynomials
+    calculated and their rate, and the current apri are published in a `beta_numbers.progress.ProgressFile` in
+    `progress_dir` (cf `scripts/monitor_progress.py`).
+    """
+
+    if progress_dir is not None:
+
+        progress = ProgressFile(progress_dir, "perron_nums", proc_index, num_procs)
+        progress.add(units_total = sum(
+            len(range(3 + proc_index, max_sum_abs_coef[d] + 1, num_procs)) for d in max_sum_abs_coef.keys()
+        ))
+
+    else:
+        progress = None
 
     with setdps(dps):
 
@@ -334,6 +357,9 @@ def calc_perron_nums(
                     poly_apri = ApriInfo(deg = d, sum_abs_coef = s)
                     num_conj_apri = ApriInfo(deg = d, sum_abs_coef = s, dps = dps)
 
+                    if progress is not None:
+                        progress.set_apri(poly_apri)
+
                     try:
                         restart_apos = perron_polys_reg.apos(poly_apri)
 
@@ -346,6 +372,10 @@ def calc_perron_nums(
                             last_poly = IntPolynomial(d).set(restart_apos.last_poly)
 
                         else:
+
+                            if progress is not None:
+                                progress.add(units = 1)
+
                             continue
 
                     polys_seg = IntPolynomialArray(d)
@@ -354,6 +384,8 @@ def calc_perron_nums(
                     conjs_seg = []
                     total_poly = 0
                     total_irreducible = 0
+                    # polynomials not yet published to `progress`
+                    num_polys = 0
 
                     with stack(Block(polys_seg, poly_apri), Block(nums_seg, num_conj_apri), Block(conjs_seg, num_conj_apri)) as (
                         polys_blk, nums_blk, conjs_blk
@@ -443,13 +475,19 @@ def calc_perron_nums(
                                     logging.error("...conjs successfully deleted...")
                                     raise
 
-                            log(timers.pretty_print())
+                            log_timers(timers)
 
                         with timers.time("IntPolynomialIter"):
 
                             for poly in IntPolynomialIter(d, s, True, last_poly):
 
                                 total_poly += 1
+                                num_polys += 1
+
+                                if progress is not None and num_polys >= PROGRESS_PERIOD:
+
+                                    progress.add(polys = num_polys)
+                                    num_polys = 0
 
                                 with timers.time("is_irreducible"):
                                     is_irreducible = poly.is_irreducible()
@@ -483,6 +521,12 @@ def calc_perron_nums(
 
                         perron_polys_reg.set_apos(poly_apri, AposInfo(complete = True), exists_ok = True)
 
+                        if progress is not None:
+                            progress.add(units = 1, polys = num_polys)
+
+    if progress is not None:
+        progress.close()
+
 def calc_salem_nums(
     max_sum_abs_coef, blk_size, dps, salem_polys_reg, salem_nums_reg, salem_conjs_reg, num_procs,
     proc_index, timers
@@ -598,7 +642,7 @@ def calc_salem_nums(
                                     logging.error("...conjs successfully deleted...")
                                     raise
 
-                            log(timers.pretty_print())
+                            log_timers(timers)
 
                         with timers.time("IntPolynomialIter"):
 
@@ -0,0 +1,26 @@
+cimport numpy as cnp
+
+ctypedef cnp.int_t      DPS_t
+ctypedef cnp.longlong_t N_t
+
+cdef class PrecisionPolicy:
+
+    cdef readonly N_t last_n
+    cdef readonly N_t num_steps
+    cdef readonly N_t num_increases
+    cdef readonly DPS_t max_x_prec
+    cdef readonly DPS_t max_y_prec
+    cdef cnp.longlong_t[:] _level_counts
+
+    cpdef DPS_t initial_y_prec(self, N_t n) except -1
+
+    cpdef int record(self, N_t n, DPS_t x_prec, DPS_t y_prec, DPS_t num_increases) except -1
+
+cdef class DoublingPolicy(PrecisionPolicy):
+    pass
+
+cdef class AdaptivePolicy(PrecisionPolicy):
+
+    cdef readonly N_t decay_period
+    cdef readonly DPS_t start_y_prec
+    cdef N_t _num_steps_since_increase
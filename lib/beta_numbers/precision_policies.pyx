@@ -0,0 +1,259 @@
+"""
+    Beta Expansions of Salem Numbers, calculating periods thereof
+    Copyright (C) 2021 Michael P. Lane
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+"""
+import math
+
+import numpy as np
+from cornifer import Block, NumpyRegister, stack
+from cornifer._utilities import check_type, check_return_Path
+
+cdef DPS_t INITIAL_Y_PREC = 16
+cdef float LOG_2_10 = 3.32193
+NUM_BYTES_PER_TERABYTE = 2 ** 40
+
+# columns of a precision profile, followed by `NUM_LEVELS` counts: the number of steps whose floor was decided at
+# y_prec <= 16, at 16 < y_prec <= 32, at 32 < y_prec <= 64, etc. (the last count includes everything larger), then
+# by the `PRECISION_STATE_LEN` entries of the policy state (cf `PrecisionPolicy.get_state`)
+PROFILE_N = 0
+PROFILE_NUM_STEPS = 1
+PROFILE_NUM_INCREASES = 2
+PROFILE_MAX_X_PREC = 3
+PROFILE_MAX_Y_PREC = 4
+PROFILE_HEADER_LEN = 5
+NUM_LEVELS = 16
+PRECISION_STATE_LEN = 2
+PROFILE_STATE = PROFILE_HEADER_LEN + NUM_LEVELS
+PROFILE_LEN = PROFILE_STATE + PRECISION_STATE_LEN
+
+cdef class PrecisionPolicy:
+    """Chooses the binary precision y_prec that `_single_orbit` starts from when it calculates c_n (x_prec is y_prec
+    plus the precision offset). If the floor is ambiguous at that precision, `_single_orbit` doubles y_prec until it
+    is not, then calls `record` with the precisions that decided the floor.
+
+    Every policy keeps a profile of the precisions used (cf `get_profile`), which is saved per orbit to
+    `precision_reg` and can be reused by a later run with constant precision (cf `calc_orbits`).
+    """
+
+    def __init__(self):
+
+        self.last_n = 0
+        self.num_steps = 0
+        self.num_increases = 0
+        self.max_x_prec = 0
+        self.max_y_prec = 0
+        self._level_counts = np.zeros(NUM_LEVELS, dtype = np.int64)
+
+    cpdef DPS_t initial_y_prec(self, N_t n) except -1:
+        """The y_prec to start from when calculating c_n. By default 16, the original behavior of `_single_orbit`.
+
+        :param n: Poly orbit index, calls are made with consecutive `n`.
+        """
+        return INITIAL_Y_PREC
+
+    cpdef int record(self, N_t n, DPS_t x_prec, DPS_t y_prec, DPS_t num_increases) except -1:
+        """c_n was decided at `x_prec` and `y_prec`, after increasing the precision `num_increases` times."""
+
+        cdef DPS_t level = 0
+
+        while level < NUM_LEVELS - 1 and y_prec > INITIAL_Y_PREC << level:
+            level += 1
+
+        self._level_counts[level] += 1
+        self.last_n = n
+        self.num_steps += 1
+        self.num_increases += num_increases
+
+        if x_prec > self.max_x_prec:
+            self.max_x_prec = x_prec
+
+        if y_prec > self.max_y_prec:
+            self.max_y_prec = y_prec
+
+        return 0
+
+    def get_profile(self):
+        """The profile up to the last recorded c_n, a 1-dimensional `int64` array with `PROFILE_LEN` entries.
+
+        :return: (type `numpy.ndarray`)
+        """
+
+        profile = np.empty(PROFILE_LEN, dtype = np.int64)
+        profile[PROFILE_N] = self.last_n
+        profile[PROFILE_NUM_STEPS] = self.num_steps
+        profile[PROFILE_NUM_INCREASES] = self.num_increases
+        profile[PROFILE_MAX_X_PREC] = self.max_x_prec
+        profile[PROFILE_MAX_Y_PREC] = self.max_y_prec
+        profile[PROFILE_HEADER_LEN : PROFILE_STATE] = self._level_counts
+        profile[PROFILE_STATE : ] = self.get_state()
+        return profile
+
+    def set_profile(self, profile):
+        """Continue the profile `profile`, the output of `get_profile` of a previous process."""
+
+        self.last_n = profile[PROFILE_N]
+        self.num_steps = profile[PROFILE_NUM_STEPS]
+        self.num_increases = profile[PROFILE_NUM_INCREASES]
+        self.max_x_prec = profile[PROFILE_MAX_X_PREC]
+        self.max_y_prec = profile[PROFILE_MAX_Y_PREC]
+        self._level_counts = np.array(profile[PROFILE_HEADER_LEN : PROFILE_STATE], dtype = np.int64)
+        self.set_state(profile[PROFILE_STATE : PROFILE_LEN])
+
+    def get_state(self):
+        """The state that `initial_y_prec` depends on, so that a resumed orbit starts from the same precisions (cf
+        `beta_numbers.resume`). By default there is none, and every entry is 0.
+
+        :return: (type `numpy.ndarray`) `PRECISION_STATE_LEN` `int64`s.
+        """
+        return np.zeros(PRECISION_STATE_LEN, dtype = np.int64)
+
+    def set_state(self, state):
+        """Restore the output of `get_state` of a previous process."""
+        pass
+
+    @property
+    def level_counts(self):
+        """The last `NUM_LEVELS` entries of the profile."""
+        return np.asarray(self._level_counts).copy()
+
+cdef class DoublingPolicy(PrecisionPolicy):
+    """Always start from y_prec = 16, the original behavior of `_single_orbit` (cf `PrecisionPolicy.initial_y_prec`).
+    """
+
+cdef class AdaptivePolicy(PrecisionPolicy):
+    """Start from the y_prec that decided the floor the last time the precision had to be increased, so that an orbit
+    whose floors all need, say, 200 bits does not go through 16, 32, 64 and 128 bits at every step. After
+    `decay_period` consecutive steps without an increase, the starting y_prec is halved (but never below 16), so a
+    single hard step only costs extra precision for a while.
+    """
+
+    def __init__(self, decay_period = 64):
+        """
+        :param decay_period: (type `int`, positive, default 64)
+        """
+
+        super().__init__()
+
+        if decay_period <= 0:
+            raise ValueError("`decay_period` must be positive.")
+
+        self.decay_period = decay_period
+        self.start_y_prec = INITIAL_Y_PREC
+        self._num_steps_since_increase = 0
+
+    cpdef DPS_t initial_y_prec(self, N_t n) except -1:
+        return self.start_y_prec
+
+    cpdef int record(self, N_t n, DPS_t x_prec, DPS_t y_prec, DPS_t num_increases) except -1:
+
+        PrecisionPolicy.record(self, n, x_prec, y_prec, num_increases)
+
+        if num_increases > 0:
+
+            if y_prec > self.start_y_prec:
+                self.start_y_prec = y_prec
+
+            self._num_steps_since_increase = 0
+
+        else:
+
+            self._num_steps_since_increase += 1
+
+            if self._num_steps_since_increase >= self.decay_period:
+
+                self.start_y_prec = max(INITIAL_Y_PREC, self.start_y_prec // 2)
+                self._num_steps_since_increase = 0
+
+        return 0
+
+    def get_state(self):
+        """The starting y_prec and the number of steps since the last increase."""
+        return np.array([self.start_y_prec, self._num_steps_since_increase], dtype = np.int64)
+
+    def set_state(self, state):
+        # the state of a profile saved by another policy is 0
+        self.start_y_prec = max(INITIAL_Y_PREC, state[0])
+        self._num_steps_since_increase = state[1]
+
+def get_precision_policy(name, **kwargs):
+    """Construct the precision policy registered under `name`.
+
+    :param name: (type `str`) One of the keys of `PRECISION_POLICIES`.
+    :param kwargs: Keyword arguments passed to the constructor.
+    :return: (type `PrecisionPolicy`)
+    """
+
+    if name not in PRECISION_POLICIES:
+        raise ValueError(f"`name` must be one of {', '.join(PRECISION_POLICIES.keys())}, not `{name}`.")
+
+    return PRECISION_POLICIES[name](**kwargs)
+
+def calc_constant_dps(profile):
+    """The `constant_y_dps` and `constant_x_dps` of `_single_orbit` that reproduce the largest precisions of the
+    profile `profile`, or `(-1, -1)` if the profile is empty.
+
+    :param profile: (type `numpy.ndarray`) Cf `PrecisionPolicy.get_profile`.
+    :return: (type `tuple` of `int`)
+    """
+
+    if profile[PROFILE_NUM_STEPS] == 0:
+        return -1, -1
+
+    return (
+        math.ceil(int(profile[PROFILE_MAX_Y_PREC]) / LOG_2_10) + 1,
+        math.ceil(int(profile[PROFILE_MAX_X_PREC]) / LOG_2_10) + 1
+    )
+
+def calc_precision_setup(perron_polys_reg, saves_dir):
+    """Setup and return the `Register` `precision_reg` (cf `calc_orbits`).
+
+    :param perron_polys_reg: (type `IntPolynomialRegister`)
+    :param saves_dir: (type `str` or `pathlib.Path`)
+    :return: (type `NumpyRegister`)
+    """
+
+    check_type(perron_polys_reg, "perron_polys_reg", NumpyRegister)
+    check_return_Path(saves_dir, "saves_dir")
+    precision_reg = NumpyRegister(
+        saves_dir,
+        "precision_reg",
+"""Precision profiles of the orbits of `poly_orbit_reg`. The apris are the same as `perron_polys_reg`. Each row
+is an `int64` profile (cf `PrecisionPolicy.get_profile`):
+0. The index n of the last coefficient recorded, or 0 if there is no profile. When an orbit is resumed, the profile is
+  only continued if this is the poly orbit length in `status_reg`.
+1. The number of coefficients calculated.
+2. The total number of times the precision was increased.
+3. The largest binary precision x_prec used.
+4. The largest binary precision y_prec used.
+Then the number of coefficients decided at y_prec <= 16, at 16 < y_prec <= 32, etc., then the state of the precision
+policy (cf `PrecisionPolicy.get_state`).""",
+        NUM_BYTES_PER_TERABYTE
+    )
+
+    with stack(perron_polys_reg.open(True), precision_reg.open()):
+
+        for apri in perron_polys_reg:
+
+            for startn, length in perron_polys_reg.intervals(apri):
+
+                seg = np.zeros((length, PROFILE_LEN), dtype = np.int64)
+
+                with Block(seg, apri, startn) as blk:
+                    precision_reg.add_disk_blk(blk)
+
+    return precision_reg
+
+PRECISION_POLICIES = {
+    "doubling" : DoublingPolicy,
+    "adaptive" : AdaptivePolicy
+}
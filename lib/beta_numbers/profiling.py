@@ -0,0 +1,432 @@
+"""
+    Beta Expansions of Salem Numbers, calculating periods thereof
+    Copyright (C) 2021 Michael P. Lane
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+"""
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+from cornifer.debug import log
+
+PROFILE_VERSION = 1
+PROFILE_GLOB = "profile_*.json"
+NUM_CALIBRATION_EVENTS = 1000
+
+class SamplingTimers:
+    """A drop-in replacement of `dagtimers.Timers` for `calc_perron_nums`, `calc_salem_nums` and `calc_orbits` whose
+    overhead is bounded.
+
+    `time(stage)` only times every `sample_period`-th event of each stage, and estimates the total time of the stage
+    from the sampled events. If `stack_interval` is given, then a daemon thread also samples the Python stacks of the
+    other threads every `stack_interval` seconds, which are aggregated as collapsed stacks ("f1;f2;f3", as read by
+    flame graph tools).
+
+    The overhead of the events (calibrated when the timers are constructed) and of the stack sampler (measured) is
+    kept below `max_overhead` of the wall time since the first event: whenever it is exceeded, the sample period of
+    the events is doubled and the stack sampler waits longer. An event that is not sampled only counts down to the next
+    sampled event of its stage, without locking, but that still costs a few hundred nanoseconds, so stages much shorter
+    than that divided by `max_overhead` should not be timed.
+
+    Counts are kept per process, starting from the first event after a fork, so that one `SamplingTimers` can be
+    passed to `cornifer.parallelize`. If `profile_dir` is given, `save` writes the profile of the process to
+    `profile_<host>_<pid>.json` in `profile_dir`, and `merge_profiles` merges the files of all processes and SLURM
+    tasks.
+    """
+
+    # every thread counts down the events of each stage to its next sampled event without locking, and the sampled
+    # events are counted and recorded under a lock, so the same timers may be used by several threads (cf
+    # `calc_orbits`)
+    thread_safe = True
+
+    def __init__(self, profile_dir = None, sample_period = 1, stack_interval = None, max_overhead = 0.01):
+        """
+        :param profile_dir: (type `str` or `pathlib.Path`, default `None`) Where `save` writes the profile files.
+        :param sample_period: (type `int`, positive, default 1) Initial number of events per timed event.
+        :param stack_interval: (type `float`, positive, default `None`) Seconds between two stack samples. If `None`,
+        stacks are not sampled.
+        :param max_overhead: (type `float`, positive, default 0.01) Maximum fraction of the wall time spent profiling.
+        """
+
+        if sample_period <= 0:
+            raise ValueError("`sample_period` must be positive.")
+
+        if stack_interval is not None and stack_interval <= 0:
+            raise ValueError("`stack_interval` must be positive.")
+
+        if not (0 < max_overhead < 1):
+            raise ValueError("`max_overhead` must be between 0 and 1.")
+
+        self.profile_dir = Path(profile_dir) if profile_dir is not None else None
+        self.initial_sample_period = sample_period
+        self.stack_interval = stack_interval
+        self.max_overhead = max_overhead
+        self._lock = threading.Lock()
+        self._pid = None
+        self._calibrate()
+
+    def _calibrate(self):
+        """Estimate the nanoseconds spent by an event that is timed and by an event that is not."""
+
+        self._pid = os.getpid()
+        self._reset()
+        self._sampled_event_ns = self._event_ns = 0
+        # not a first event, so that the stack sampler is not started
+        self._start_ns = time.perf_counter_ns()
+        self.sample_period = 1
+        start = time.perf_counter_ns()
+
+        for _ in range(NUM_CALIBRATION_EVENTS):
+
+            with self.time(""):
+                pass
+
+        self._sampled_event_ns = (time.perf_counter_ns() - start) / NUM_CALIBRATION_EVENTS
+        self.sample_period = NUM_CALIBRATION_EVENTS + 1
+        start = time.perf_counter_ns()
+
+        for _ in range(NUM_CALIBRATION_EVENTS):
+
+            with self.time(""):
+                pass
+
+        self._event_ns = (time.perf_counter_ns() - start) / NUM_CALIBRATION_EVENTS
+        self._reset()
+
+    def _reset(self):
+
+        self.sample_period = self.initial_sample_period
+        self._stages = {}
+        self._stacks = {}
+        self._num_events = 0
+        self._num_sampled_events = 0
+        self._stack_ns = 0
+        self._num_stack_samples = 0
+        self._start_ns = None
+        self._sampler = None
+        # the countdowns of the threads, `{stage : [events left before the next sampled one, sample period]}` each
+        self._local = threading.local()
+        self._countdowns = []
+
+    def _start(self):
+        """Called by the first event of this process."""
+
+        if self._pid != os.getpid():
+            # forked, the counts and the sampler thread belong to the parent
+            self._pid = os.getpid()
+            self._reset()
+
+        self._start_ns = time.perf_counter_ns()
+
+        if self.stack_interval is not None:
+
+            self._sampler = threading.Thread(target = self._sample_stacks, daemon = True)
+            self._sampler.start()
+
+    def time(self, stage):
+        """A context manager that times `stage` if this is a sampled event, and otherwise does nothing. The events that
+        are not sampled only count down, and are added to the counts by the next sampled event of the stage in the same
+        thread.
+
+        :param stage: (type `str`)
+        """
+
+        try:
+            countdown = self._local.countdowns[stage]
+
+        except (AttributeError, KeyError):
+            return self._time_sampled(stage)
+
+        if countdown[0] > 0:
+
+            countdown[0] -= 1
+            return _NOT_SAMPLED
+
+        return self._time_sampled(stage)
+
+    def _time_sampled(self, stage):
+        """The slow path of `time`, for the sampled events and the first event of a stage in a thread."""
+
+        with self._lock:
+
+            if self._start_ns is None or self._pid != os.getpid():
+                self._start()
+
+            try:
+                countdowns = self._local.countdowns
+
+            except AttributeError:
+
+                countdowns = self._local.countdowns = {}
+                self._countdowns.append(countdowns)
+
+            try:
+                counts = self._stages[stage]
+
+            except KeyError:
+                counts = self._stages[stage] = [0, 0, 0]
+
+            countdown = countdowns.get(stage)
+
+            if countdown is None:
+
+                countdown = countdowns[stage] = [self.sample_period - 1, self.sample_period]
+
+                if countdown[0] > 0:
+
+                    countdown[0] -= 1
+                    return _NOT_SAMPLED
+
+            # the events counted down since the last sampled one, and this one
+            num_events = countdown[1] - countdown[0]
+            counts[0] += num_events
+            self._num_events += num_events
+            countdowns[stage] = [self.sample_period - 1, self.sample_period]
+
+        return _SampledEvent(self, counts)
+
+    def _num_pending_events(self):
+        """The events of each stage that were counted down but are not in the counts yet."""
+
+        pending = {}
+
+        for countdowns in self._countdowns:
+
+            for stage, (left, sample_period) in list(countdowns.items()):
+                pending[stage] = pending.get(stage, 0) + sample_period - 1 - left
+
+        return pending
+
+    def _record(self, counts, ns):
+
+        with self._lock:
+
+            counts[1] += 1
+            counts[2] += ns
+            self._num_sampled_events += 1
+
+            if self.overhead_ns() > self.max_overhead * (time.perf_counter_ns() - self._start_ns):
+                self.sample_period *= 2
+
+    def overhead_ns(self):
+        """Estimated nanoseconds spent profiling by this process."""
+        return (
+            self._num_sampled_events * self._sampled_event_ns +
+            (self._num_events - self._num_sampled_events) * self._event_ns +
+            self._stack_ns
+        )
+
+    def _sample_stacks(self):
+
+        me = threading.get_ident()
+        pid = self._pid
+        wait = self.stack_interval
+
+        while self._pid == pid:
+
+            time.sleep(wait)
+            start = time.perf_counter_ns()
+
+            for ident, frame in sys._current_frames().items():
+
+                if ident != me:
+
+                    stack = []
+
+                    while frame is not None:
+
+                        code = frame.f_code
+                        stack.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+                        frame = frame.f_back
+
+                    key = ";".join(reversed(stack))
+
+                    with self._lock:
+                        self._stacks[key] = self._stacks.get(key, 0) + 1
+
+            ns = time.perf_counter_ns() - start
+
+            with self._lock:
+
+                self._stack_ns += ns
+                self._num_stack_samples += 1
+
+            # the sampler's share of the wall time is `ns / (wait * 1e9)`
+            wait = max(self.stack_interval, ns / (1e9 * self.max_overhead))
+
+    def get_profile(self):
+        """The profile of this process, with the estimated total nanoseconds of each stage.
+
+        :return: (type `dict`)
+        """
+
+        with self._lock:
+
+            wall_ns = time.perf_counter_ns() - self._start_ns if self._start_ns is not None else 0
+            pending = self._num_pending_events()
+            return {
+                "version": PROFILE_VERSION,
+                "processes": 1,
+                "wall_ns": wall_ns,
+                "overhead_ns": int(self.overhead_ns() + sum(pending.values()) * self._event_ns),
+                "sample_period": self.sample_period,
+                "stages": {
+                    stage: {
+                        "count": count + pending.get(stage, 0),
+                        "sampled": sampled,
+                        "sampled_ns": sampled_ns,
+                        "ns": _estimate_ns(count + pending.get(stage, 0), sampled, sampled_ns)
+                    }
+                    for stage, (count, sampled, sampled_ns) in self._stages.items()
+                },
+                "stack_samples": self._num_stack_samples,
+                "stacks": dict(self._stacks)
+            }
+
+    def get_filename(self):
+        """The profile file of this process in `profile_dir`."""
+
+        if self.profile_dir is None:
+            raise ValueError("`profile_dir` was not given.")
+
+        return self.profile_dir / f"profile_{socket.gethostname()}_{os.getpid()}.json"
+
+    def save(self):
+        """Write the profile of this process to `get_filename()`, replacing the last one."""
+
+        filename = self.get_filename()
+        tmp_filename = filename.with_suffix(".tmp")
+
+        with tmp_filename.open("w") as fh:
+            json.dump(self.get_profile(), fh)
+
+        os.replace(tmp_filename, filename)
+
+    def pretty_print(self):
+        return format_profile(self.get_profile())
+
+class _SampledEvent:
+
+    __slots__ = ("timers", "counts", "start_ns")
+
+    def __init__(self, timers, counts):
+
+        self.timers = timers
+        self.counts = counts
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info):
+        self.timers._record(self.counts, time.perf_counter_ns() - self.start_ns)
+
+class _NotSampled:
+
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+_NOT_SAMPLED = _NotSampled()
+
+def _estimate_ns(count, sampled, sampled_ns):
+    return int(sampled_ns * count / sampled) if sampled > 0 else 0
+
+def log_timers(timers):
+    """Log `timers.pretty_print()`, and save the profile file if `timers` is a `SamplingTimers` with a
+    `profile_dir`."""
+
+    if isinstance(timers, SamplingTimers) and timers.profile_dir is not None:
+        timers.save()
+
+    log(timers.pretty_print())
+
+def merge_profiles(profiles):
+    """Merge the profiles of several processes, for instance all the files `profile_*.json` in a `profile_dir`.
+
+    :param profiles: (type iterable of `dict`, `str` or `pathlib.Path`) Profiles or profile files.
+    :return: (type `dict`) The counts, times and stacks are summed, and the wall time is the longest one.
+    """
+
+    merged = {
+        "version": PROFILE_VERSION,
+        "processes": 0,
+        "wall_ns": 0,
+        "overhead_ns": 0,
+        "stages": {},
+        "stack_samples": 0,
+        "stacks": {}
+    }
+
+    for profile in profiles:
+
+        if not isinstance(profile, dict):
+
+            with Path(profile).open("r") as fh:
+                profile = json.load(fh)
+
+        if profile.get("version") != PROFILE_VERSION:
+            raise ValueError(f"Unknown profile version `{profile.get('version')}`.")
+
+        merged["processes"] += profile["processes"]
+        merged["wall_ns"] = max(merged["wall_ns"], profile["wall_ns"])
+        merged["overhead_ns"] += profile["overhead_ns"]
+        merged["stack_samples"] += profile["stack_samples"]
+
+        for stage, counts in profile["stages"].items():
+
+            merged_counts = merged["stages"].setdefault(stage, {"count": 0, "sampled": 0, "sampled_ns": 0, "ns": 0})
+
+            for key in merged_counts:
+                merged_counts[key] += counts[key]
+
+        for stack, count in profile["stacks"].items():
+            merged["stacks"][stack] = merged["stacks"].get(stack, 0) + count
+
+    return merged
+
+def load_profiles(profile_dir):
+    """Merge all the profile files in `profile_dir` (cf `SamplingTimers.save`)."""
+    return merge_profiles(sorted(Path(profile_dir).glob(PROFILE_GLOB)))
+
+def format_profile(profile, num_stacks = 10):
+    """A table of the stages of `profile`, by decreasing estimated time, followed by its most frequent stacks."""
+
+    lines = [
+        f"{profile['processes']} process(es), wall {profile['wall_ns'] / 1e9 : .3f}s, profiling overhead "
+        f"{profile['overhead_ns'] / 1e9 : .3f}s",
+        f"{'stage' : <24}{'count' : >14}{'sampled' : >12}{'est. total (s)' : >16}{'per event (us)' : >16}"
+    ]
+
+    for stage, counts in sorted(profile["stages"].items(), key = lambda item: -item[1]["ns"]):
+
+        per_event = counts["sampled_ns"] / counts["sampled"] / 1e3 if counts["sampled"] > 0 else 0.
+        lines.append(
+            f"{stage : <24}{counts['count'] : >14}{counts['sampled'] : >12}{counts['ns'] / 1e9 : >16.3f}"
+            f"{per_event : >16.3f}"
+        )
+
+    if profile["stack_samples"] > 0:
+
+        lines.append(f"{profile['stack_samples']} stack samples")
+
+        for stack, count in sorted(profile["stacks"].items(), key = lambda item: -item[1])[ : num_stacks]:
+            lines.append(f"{count : >8} {stack}")
+
+    return "\n".join(lines)
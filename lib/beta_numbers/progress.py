@@ -0,0 +1,277 @@
+"""
+    Beta Expansions of Salem Numbers, calculating periods thereof
+    Copyright (C) 2021 Michael P. Lane
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+"""
+import mmap
+import os
+import socket
+import statistics
+import struct
+import threading
+import time
+from pathlib import Path
+
+import psutil
+
+PROGRESS_MAGIC = b"BNPG"
+PROGRESS_VERSION = 1
+PROGRESS_GLOB = "progress_*.bin"
+# seconds between two updates of the rates
+RATE_PERIOD = 5.
+MAX_APRI_LEN = 256
+# magic, version, seq, index of the kind, pid, proc_index, num_procs, start time, update time, units done, units total,
+# coefs, polys, RSS, coefs per second, polys per second, length of the apri, apri
+_FORMAT = struct.Struct(f"<4sIqqqqqddqqqqqddq{MAX_APRI_LEN}s")
+_SEQ_FORMAT = struct.Struct("<q")
+_SEQ_OFFSET = 8
+
+KINDS = ("orbits", "perron_nums")
+
+class ProgressFile:
+    """A small memory-mapped file in which a worker of `calc_orbits` or `calc_perron_nums` publishes its progress, read
+    by `read_progress_files` and `scripts/monitor_progress.py`.
+
+    The file has a single fixed-size record: the number of units of work completed and assigned to the worker (orbits
+    for `calc_orbits`, apris (deg, sum_abs_coef) for `calc_perron_nums`), the number of coefficients and polynomials
+    calculated, their rates and the resident set size of the process, both refreshed every `RATE_PERIOD` seconds, and
+    the apri being calculated. Writes are cheap (a `struct.pack_into` to the mapped page), and a sequence number that
+    is odd during a write lets readers detect torn records without locking.
+    """
+
+    def __init__(self, progress_dir, kind, proc_index, num_procs):
+        """
+        :param progress_dir: (type `str` or `pathlib.Path`)
+        :param kind: (type `str`) One of `KINDS`.
+        :param proc_index: (type `int`, non-negative)
+        :param num_procs: (type `int`, positive)
+        """
+
+        if kind not in KINDS:
+            raise ValueError(f"`kind` must be one of {', '.join(KINDS)}, not `{kind}`.")
+
+        progress_dir = Path(progress_dir)
+        progress_dir.mkdir(parents = True, exist_ok = True)
+        self.kind = kind
+        self.filename = progress_dir / f"progress_{kind}_{proc_index}_{socket.gethostname()}_{os.getpid()}.bin"
+        self.proc_index = proc_index
+        self.num_procs = num_procs
+        self.units_done = 0
+        self.units_total = 0
+        self.num_coefs = 0
+        self.num_polys = 0
+        self.apri = ""
+        self._seq = 0
+        self._start_time = self._rate_time = time.time()
+        self._rate_num_coefs = self._rate_num_polys = 0
+        self._coefs_per_sec = self._polys_per_sec = 0.
+        self._rss = 0
+        self._process = psutil.Process()
+        self._lock = threading.Lock()
+
+        with self.filename.open("wb") as fh:
+            fh.write(bytes(_FORMAT.size))
+
+        self._fh = self.filename.open("r+b")
+        self._mmap = mmap.mmap(self._fh.fileno(), _FORMAT.size)
+        self.update()
+
+    def add(self, units = 0, coefs = 0, polys = 0, units_total = 0):
+        """Add to the counters and update the file."""
+
+        with self._lock:
+
+            self.units_done += units
+            self.units_total += units_total
+            self.num_coefs += coefs
+            self.num_polys += polys
+            self._write()
+
+    def set_apri(self, apri):
+        """Publish the apri being calculated."""
+
+        with self._lock:
+
+            self.apri = str(apri)
+            self._write()
+
+    def update(self):
+        """Update the file, for instance to refresh the rates and the RSS."""
+
+        with self._lock:
+            self._write()
+
+    def _write(self):
+
+        now = time.time()
+
+        if now - self._rate_time >= RATE_PERIOD or self._seq == 0:
+
+            dt = max(now - self._rate_time, 1e-9)
+            self._coefs_per_sec = (self.num_coefs - self._rate_num_coefs) / dt
+            self._polys_per_sec = (self.num_polys - self._rate_num_polys) / dt
+            self._rate_time = now
+            self._rate_num_coefs = self.num_coefs
+            self._rate_num_polys = self.num_polys
+            self._rss = self._process.memory_info().rss
+
+        apri = self.apri.encode()[ : MAX_APRI_LEN]
+        # odd while the record is being written
+        self._seq += 1
+        _SEQ_FORMAT.pack_into(self._mmap, _SEQ_OFFSET, self._seq)
+        _FORMAT.pack_into(
+            self._mmap, 0, PROGRESS_MAGIC, PROGRESS_VERSION, self._seq, KINDS.index(self.kind), os.getpid(),
+            self.proc_index, self.num_procs, self._start_time, now, self.units_done, self.units_total,
+            self.num_coefs, self.num_polys, self._rss, self._coefs_per_sec, self._polys_per_sec, len(apri), apri
+        )
+        self._seq += 1
+        _SEQ_FORMAT.pack_into(self._mmap, _SEQ_OFFSET, self._seq)
+
+    def close(self):
+
+        self._mmap.close()
+        self._fh.close()
+
+def read_progress_file(filename, num_attempts = 16):
+    """Read a progress file written by `ProgressFile`.
+
+    :param filename: (type `str` or `pathlib.Path`)
+    :param num_attempts: (type `int`, positive, default 16) Number of reads before giving up on a record that is being
+    written.
+    :return: (type `dict`) Or `None` if the file is not a progress file or no consistent record was read.
+    """
+
+    filename = Path(filename)
+
+    for _ in range(num_attempts):
+
+        with filename.open("rb") as fh:
+
+            data = fh.read(_FORMAT.size)
+            fh.seek(_SEQ_OFFSET)
+            # the record is consistent if no write started while it was read
+            last_seq = _SEQ_FORMAT.unpack(fh.read(_SEQ_FORMAT.size))[0] if len(data) == _FORMAT.size else None
+
+        if len(data) < _FORMAT.size:
+            return None
+
+        (
+            magic, version, seq, kind_index, pid, proc_index, num_procs, start_time, update_time, units_done,
+            units_total, num_coefs, num_polys, rss, coefs_per_sec, polys_per_sec, apri_len, apri
+        ) = _FORMAT.unpack(data)
+
+        if magic != PROGRESS_MAGIC or version != PROGRESS_VERSION:
+            return None
+
+        if seq % 2 == 0 and seq > 0 and seq == last_seq:
+            return {
+                "kind": KINDS[kind_index],
+                "filename": filename,
+                "pid": pid,
+                "proc_index": proc_index,
+                "num_procs": num_procs,
+                "start_time": start_time,
+                "update_time": update_time,
+                "units_done": units_done,
+                "units_total": units_total,
+                "num_coefs": num_coefs,
+                "num_polys": num_polys,
+                "rss": rss,
+                "coefs_per_sec": coefs_per_sec,
+                "polys_per_sec": polys_per_sec,
+                "apri": apri[ : apri_len].decode(errors = "replace")
+            }
+
+        time.sleep(1e-3)
+
+    return None
+
+def read_progress_files(progress_dir):
+    """The latest record of every worker (kind, proc_index) in `progress_dir`, sorted by kind and `proc_index`.
+    Records of earlier runs of the same worker are dropped."""
+
+    latest = {}
+
+    for filename in Path(progress_dir).glob(PROGRESS_GLOB):
+
+        record = read_progress_file(filename)
+
+        if record is not None:
+
+            key = (record["kind"], record["proc_index"])
+
+            if key not in latest or latest[key]["update_time"] < record["update_time"]:
+                latest[key] = record
+
+    return [latest[key] for key in sorted(latest)]
+
+def summarize_progress(records, now = None, stale_secs = 600., straggler_ratio = 0.25):
+    """Aggregate the records of `read_progress_files`, per kind.
+
+    A worker is a straggler if it has not updated its file for `stale_secs` seconds, or if the fraction of its units
+    done is less than `straggler_ratio` times the median fraction of the workers of the same kind.
+
+    :return: (type `dict`) For every kind, the totals, the rates, the ETA in seconds (`None` if nothing is done yet)
+    and the `proc_index` of the stragglers.
+    """
+
+    if now is None:
+        now = time.time()
+
+    summary = {}
+
+    for kind in KINDS:
+
+        kind_records = [record for record in records if record["kind"] == kind]
+
+        if len(kind_records) == 0:
+            continue
+
+        units_done = sum(record["units_done"] for record in kind_records)
+        units_total = sum(record["units_total"] for record in kind_records)
+        elapsed = now - min(record["start_time"] for record in kind_records)
+        # the run ends with its slowest worker
+        etas = [_calc_eta(record, now) for record in kind_records]
+        eta = None if any(eta_ is None for eta_ in etas) else max(etas)
+        fractions = [_fraction_done(record) for record in kind_records]
+        median_fraction = statistics.median(fractions)
+        stragglers = [
+            record["proc_index"] for record, fraction in zip(kind_records, fractions)
+            if now - record["update_time"] > stale_secs or fraction < straggler_ratio * median_fraction
+        ]
+        summary[kind] = {
+            "num_workers": len(kind_records),
+            "units_done": units_done,
+            "units_total": units_total,
+            "num_coefs": sum(record["num_coefs"] for record in kind_records),
+            "num_polys": sum(record["num_polys"] for record in kind_records),
+            "coefs_per_sec": sum(record["coefs_per_sec"] for record in kind_records),
+            "polys_per_sec": sum(record["polys_per_sec"] for record in kind_records),
+            "rss": sum(record["rss"] for record in kind_records),
+            "elapsed": elapsed,
+            "eta": eta,
+            "stragglers": stragglers
+        }
+
+    return summary
+
+def _fraction_done(record):
+    return record["units_done"] / record["units_total"] if record["units_total"] > 0 else 0.
+
+def _calc_eta(record, now):
+
+    if record["units_done"] == 0:
+        return None
+
+    elapsed = record["update_time"] - record["start_time"]
+    remaining = record["units_total"] - record["units_done"]
+    return max(0., elapsed * remaining / record["units_done"] - (now - record["update_time"]))
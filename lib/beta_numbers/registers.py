@@ -125,4 +125,111 @@ class MPFRegister(NumpyRegister):
         for indices, _ in np.ndenumerate(new_data):
             new_data[indices] = mpmath.mpc(data[indices + (0,)].decode('ASCII'), data[indices + (1,)].decode('ASCII'))
 
-        return new_data
\ No newline at end of file
+        return new_data
+
+class WidePolynomialRegister(NumpyRegister):
+    """Polynomials whose coefficients may not fit in 64 bits. The data is a sequence of polynomials, each a sequence
+    of Python `int`s of the same length, the 0-index term being the coefficient of the 0-degree term. They are saved
+    as ASCII decimal strings and loaded as a 2-dimensional `object` array of Python `int`s."""
+
+    @classmethod
+    def dump_disk_data(cls, data, filename, **kwargs):
+
+        data = [[str(int(coef)) for coef in poly] for poly in data]
+        width = max((len(coef) for poly in data for coef in poly), default = 1)
+        super().dump_disk_data(np.array(data, dtype = f"S{width}"), filename, **kwargs)
+
+    @classmethod
+    def load_disk_data(cls, filename, **kwargs):
+
+        data = super().load_disk_data(filename, **kwargs)
+        new_data = np.empty(data.shape, dtype = object)
+
+        for indices, coef in np.ndenumerate(data):
+            new_data[indices] = int(coef)
+
+        return new_data
+
+class PackedCoefRegister(NumpyRegister):
+    """Coefficient orbits, bit-packed. The data is a sequence of non-negative `int`s, which are saved with as many
+    bits each as the largest one needs (at most ceil(log2(ceil(beta0) + 1)) bits for the coefficient orbit of beta0),
+    cf `pack_coefs`. They are loaded as a 1-dimensional `int64` array.
+
+    Packed data is saved with the structured dtype `PACKED_DTYPE`, which marks it as packed, and is decoded whole
+    when it is loaded. Data of any other dtype, saved by a plain `NumpyRegister`, is loaded unchanged."""
+
+    @classmethod
+    def dump_disk_data(cls, data, filename, **kwargs):
+        super().dump_disk_data(pack_coefs(data).view(PACKED_DTYPE), filename, **kwargs)
+
+    @classmethod
+    def load_disk_data(cls, filename, **kwargs):
+
+        data = super().load_disk_data(filename, **kwargs)
+
+        if data.dtype != PACKED_DTYPE:
+            # saved by a plain `NumpyRegister`
+            return data
+
+        return unpack_coefs(data.view(np.uint8))
+
+# bytes of `pack_coefs` before the packed bits: the number of bits per coefficient, then the number of coefficients
+PACKED_HEADER_LEN = 9
+# the dtype of the arrays saved by `PackedCoefRegister`, which a plain `NumpyRegister` does not save by accident
+PACKED_DTYPE = np.dtype([("packed_coefs", np.uint8)])
+
+def pack_coefs(coefs, num_bits = None):
+    """Pack the non-negative `int`s `coefs` into `num_bits` bits each, most significant bit first.
+
+    :param coefs: (type `numpy.ndarray` or `list`)
+    :param num_bits: (type `int`, positive, default `None`) Defaults to the bit length of the largest coefficient.
+    :return: (type `numpy.ndarray`) `uint8`, `PACKED_HEADER_LEN` header bytes followed by the packed bits.
+    """
+
+    coefs = np.asarray(coefs, dtype = np.int64).reshape(-1)
+
+    if np.any(coefs < 0):
+        raise ValueError("`coefs` must be non-negative.")
+
+    if num_bits is None:
+        num_bits = max(1, int(coefs.max(initial = 0)).bit_length())
+
+    elif num_bits <= 0 or np.any(coefs >> num_bits):
+        raise ValueError("`num_bits` must be positive and large enough for every coefficient.")
+
+    shifts = np.arange(num_bits - 1, -1, -1, dtype = np.int64)
+    bits = ((coefs[:, np.newaxis] >> shifts) & 1).astype(np.uint8)
+    header = np.empty(PACKED_HEADER_LEN, dtype = np.uint8)
+    header[0] = num_bits
+    header[1 : ] = np.array([len(coefs)], dtype = "<u8").view(np.uint8)
+    return np.concatenate((header, np.packbits(bits.reshape(-1))))
+
+def unpack_coefs(packed, startn = 0, stopn = None):
+    """Unpack the coefficients `startn`, ..., `stopn - 1` (0-indexed) of the output of `pack_coefs`. Only the bytes
+    holding those coefficients are read, so `packed` may be memory-mapped.
+
+    :param packed: (type `numpy.ndarray`) `uint8`.
+    :param startn: (type `int`, non-negative, default 0)
+    :param stopn: (type `int`, default `None`) Defaults to the number of coefficients.
+    :return: (type `numpy.ndarray`) `int64`.
+    """
+
+    num_bits = int(packed[0])
+    length = int(np.asarray(packed[1 : PACKED_HEADER_LEN]).view("<u8")[0])
+
+    if stopn is None or stopn > length:
+        stopn = length
+
+    if startn < 0:
+        raise ValueError("`startn` must be non-negative.")
+
+    if stopn <= startn:
+        return np.zeros(0, dtype = np.int64)
+
+    start_bit = startn * num_bits
+    stop_bit = stopn * num_bits
+    first_byte = start_bit // 8
+    payload = np.asarray(packed[PACKED_HEADER_LEN + first_byte : PACKED_HEADER_LEN + (stop_bit + 7) // 8])
+    bits = np.unpackbits(payload)[start_bit - 8 * first_byte : stop_bit - 8 * first_byte]
+    weights = np.left_shift(1, np.arange(num_bits - 1, -1, -1, dtype = np.int64))
+    return bits.reshape(-1, num_bits).astype(np.int64) @ weights
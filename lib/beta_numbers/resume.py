@@ -0,0 +1,129 @@
+"""
+    Beta Expansions of Salem Numbers, calculating periods thereof
+    Copyright (C) 2021 Michael P. Lane
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+"""
+import numpy as np
+from cornifer import Block, NumpyRegister, stack
+from cornifer._utilities import check_type, check_return_Path
+from intpolynomials.registers import IntPolynomialRegister
+
+from .precision_policies import PRECISION_STATE_LEN
+
+NUM_BYTES_PER_TERABYTE = 2 ** 40
+
+# columns of a resume record, followed by the `deg` coefficients of B_n and the `1 + deg` `int64`s of the cycle
+# detector state (cf `CycleDetector.get_state`)
+RESUME_N = 0
+RESUME_X_Y_PREC_OFFSET = 1
+RESUME_IS_MONOTONE = 2
+RESUME_MIN_BLOWUP = 3
+RESUME_NUM_PREC_INCREASES = 4
+RESUME_MAX_X_PREC = 5
+# `PRECISION_STATE_LEN` entries (cf `PrecisionPolicy.get_state`)
+RESUME_PRECISION_STATE = 6
+RESUME_HEADER_LEN = RESUME_PRECISION_STATE + PRECISION_STATE_LEN
+
+def calc_resume_setup(perron_polys_reg, saves_dir):
+    """Setup and return the `Register` `resume_reg` (cf `calc_orbits`).
+
+    :param perron_polys_reg: (type `IntPolynomialRegister`)
+    :param saves_dir: (type `str` or `pathlib.Path`)
+    :return: (type `NumpyRegister`)
+    """
+
+    check_type(perron_polys_reg, "perron_polys_reg", IntPolynomialRegister)
+    check_return_Path(saves_dir, "saves_dir")
+    resume_reg = NumpyRegister(
+        saves_dir,
+        "resume_reg",
+"""Resume records of the orbits of `poly_orbit_reg` that are still being calculated. The apris are the same as
+`perron_polys_reg`. Each row is an `int64` record (cf `make_resume_record`):
+0. The poly orbit length n that the record describes, or 0 if there is no record. The record is only valid if
+  this is the poly orbit length in `status_reg`.
+1. The precision offset of `_single_orbit` for B_n.
+2. 1 if the orbit is alternating monotonic (cf `monotone_reg`) up to B_n, otherwise 0.
+3. The minimum blowup (cf `monotone_reg`), the bits of a `float64`.
+4. The number of times the precision was increased.
+5. The largest binary precision used.
+6-7. The state of the precision policy (cf `PrecisionPolicy.get_state`).
+Then the `deg` coefficients of B_n, then the `1 + deg` entries of the cycle detector state.""",
+        NUM_BYTES_PER_TERABYTE
+    )
+
+    with stack(perron_polys_reg.open(True), resume_reg.open()):
+
+        for apri in perron_polys_reg:
+
+            for startn, length in perron_polys_reg.intervals(apri):
+
+                seg = np.zeros((length, calc_resume_record_len(apri.deg)), dtype = np.int64)
+
+                with Block(seg, apri, startn) as blk:
+                    resume_reg.add_disk_blk(blk)
+
+    return resume_reg
+
+def calc_resume_record_len(deg):
+    """The number of `int64`s of a resume record of a degree `deg` orbit."""
+    return RESUME_HEADER_LEN + 2 * deg + 1
+
+def make_resume_record(
+    n, x_y_prec_offset, is_monotone, min_blowup, num_prec_increases, max_x_prec, precision_state, Bn, state
+):
+    """The resume record of an orbit after B_n has been saved.
+
+    :param n: (type `int`, positive)
+    :param x_y_prec_offset: (type `int`)
+    :param is_monotone: (type `bool`)
+    :param min_blowup: (type `float`)
+    :param num_prec_increases: (type `int`, non-negative)
+    :param max_x_prec: (type `int`, non-negative)
+    :param precision_state: (type `numpy.ndarray`) The precision policy state, `PRECISION_STATE_LEN` entries.
+    :param Bn: (type `numpy.ndarray`) At least `deg` coefficients.
+    :param state: (type `numpy.ndarray`) The cycle detector state, `1 + deg` entries.
+    :return: (type `numpy.ndarray`) `int64`.
+    """
+
+    deg = len(state) - 1
+    record = np.empty(calc_resume_record_len(deg), dtype = np.int64)
+    record[RESUME_N] = n
+    record[RESUME_X_Y_PREC_OFFSET] = x_y_prec_offset
+    record[RESUME_IS_MONOTONE] = 1 if is_monotone else 0
+    record[RESUME_MIN_BLOWUP] = np.array([min_blowup], dtype = np.float64).view(np.int64)[0]
+    record[RESUME_NUM_PREC_INCREASES] = num_prec_increases
+    record[RESUME_MAX_X_PREC] = max_x_prec
+    record[RESUME_PRECISION_STATE : RESUME_HEADER_LEN] = precision_state
+    record[RESUME_HEADER_LEN : RESUME_HEADER_LEN + deg] = Bn[ : deg]
+    record[RESUME_HEADER_LEN + deg : ] = state
+    return record
+
+def read_resume_record(record, deg):
+    """Inverse of `make_resume_record`, except that `n` is not returned.
+
+    :param record: (type `numpy.ndarray`)
+    :param deg: (type `int`, positive)
+    :return: (type `tuple`) `x_y_prec_offset`, `is_monotone`, `min_blowup`, `num_prec_increases`, `max_x_prec`,
+    `precision_state`, `Bn` and `state`.
+    """
+
+    record = np.array(record, dtype = np.int64)
+    return (
+        int(record[RESUME_X_Y_PREC_OFFSET]),
+        bool(record[RESUME_IS_MONOTONE] == 1),
+        float(record[RESUME_MIN_BLOWUP : RESUME_MIN_BLOWUP + 1].view(np.float64)[0]),
+        int(record[RESUME_NUM_PREC_INCREASES]),
+        int(record[RESUME_MAX_X_PREC]),
+        record[RESUME_PRECISION_STATE : RESUME_HEADER_LEN],
+        record[RESUME_HEADER_LEN : RESUME_HEADER_LEN + deg],
+        record[RESUME_HEADER_LEN + deg : calc_resume_record_len(deg)]
+    )
@@ -0,0 +1,326 @@
+"""
+    Beta Expansions of Salem Numbers, calculating periods thereof
+    Copyright (C) 2021 Michael P. Lane
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+"""
+import fcntl
+import os
+import threading
+
+import numpy as np
+from numpy.lib.format import open_memmap
+from numpy.lib.recfunctions import structured_to_unstructured
+from cornifer import NumpyRegister, stack
+from cornifer._utilities import check_type, check_return_Path
+
+STATUS_TABLE_DTYPE = np.dtype([
+    # odd while the record is being written
+    ("seq", np.int64),
+    # the columns of `status_reg`
+    ("poly_orbit_len", np.int64),
+    ("prec_err_index", np.int64),
+    ("overflow_index", np.int64),
+    # the columns of `periodic_reg`
+    ("preperiod_len", np.int64),
+    ("period_len", np.int64),
+    # the columns of `monotone_reg`
+    ("is_monotone", np.float64),
+    ("min_blowup", np.float64)
+])
+STATUS_FIELDS = ("poly_orbit_len", "prec_err_index", "overflow_index")
+PERIODIC_FIELDS = ("preperiod_len", "period_len")
+MONOTONE_FIELDS = ("is_monotone", "min_blowup")
+NUM_READ_ATTEMPTS = 16
+
+class StatusTable:
+    """The status of every orbit of `calc_orbits`, one structured record per orbit (cf `STATUS_TABLE_DTYPE`) in a
+    single memory-mapped file per poly apri, in place of the rows of `status_reg`, `periodic_reg` and `monotone_reg`.
+    A state change of an orbit is then a store to a page that is already mapped, instead of a
+    `Register.set(..., mmap_mode = "r+")` of each register, each of which maps a `Block` file.
+
+    The record of orbit `index` is at position `index` of the file of its apri. Writers hold an exclusive `fcntl.flock`
+    lock of the file, so that every update of a record is atomic across processes and threads, and readers retry while
+    the sequence number of the record is odd or changes, so that they never read a torn record without locking.
+
+    `status`, `periodic` and `monotone` are views of the table with the methods of the respective `NumpyRegister`
+    used by `_single_orbit` and `_fix_problems` (`get`, `set`, `__getitem__` and `__setitem__`).
+    `export_status_table` writes the table back to the registers.
+    """
+
+    def __init__(self, table_dir):
+        """
+        :param table_dir: (type `str` or `pathlib.Path`) Written by `calc_status_table_setup`.
+        """
+
+        self.table_dir = check_return_Path(table_dir, "table_dir")
+        self._records = {}
+        self._lock_fhs = {}
+        self._lock = threading.RLock()
+        self.status = _StatusTableView(self, STATUS_FIELDS, np.int64, "status_reg")
+        self.periodic = _StatusTableView(self, PERIODIC_FIELDS, np.int64, "periodic_reg")
+        self.monotone = _StatusTableView(self, MONOTONE_FIELDS, np.float64, "monotone_reg")
+
+    def get_filename(self, apri):
+        return self.table_dir / f"status_{apri.deg}_{apri.sum_abs_coef}.npy"
+
+    def _get_records(self, apri):
+
+        key = (apri.deg, apri.sum_abs_coef)
+
+        try:
+            return self._records[key], self._lock_fhs[key]
+
+        except KeyError:
+
+            with self._lock:
+
+                if key not in self._records:
+
+                    filename = self.get_filename(apri)
+
+                    if not filename.exists():
+                        raise KeyError(f"`{apri}` is not in the status table `{self.table_dir}`.")
+
+                    self._lock_fhs[key] = filename.open("rb")
+                    self._records[key] = np.load(filename, mmap_mode = "r+")
+
+                return self._records[key], self._lock_fhs[key]
+
+    def add_apri(self, apri, stopn):
+        """Create the file of `apri`, or extend it, so that it holds the records of the indices less than `stopn`. The
+        new records have sequence number 0. Must not be called while other processes use the table.
+
+        :param apri: (type `ApriInfo`) A poly apri.
+        :param stopn: (type `int`, non-negative)
+        :return: (type `numpy.memmap`) The records of `apri`.
+        """
+
+        filename = self.get_filename(apri)
+        key = (apri.deg, apri.sum_abs_coef)
+
+        with self._lock:
+
+            old_records = np.load(filename, mmap_mode = "r") if filename.exists() else None
+
+            if old_records is not None and len(old_records) >= stopn:
+                return self._get_records(apri)[0]
+
+            self.table_dir.mkdir(parents = True, exist_ok = True)
+            tmp_filename = filename.with_suffix(".tmp")
+            records = open_memmap(tmp_filename, mode = "w+", dtype = STATUS_TABLE_DTYPE, shape = (stopn,))
+
+            if old_records is not None:
+                records[ : len(old_records)] = old_records
+
+            records.flush()
+            del records, old_records
+            os.replace(tmp_filename, filename)
+
+            if key in self._records:
+
+                self._lock_fhs.pop(key).close()
+                del self._records[key]
+
+        return self._get_records(apri)[0]
+
+    def read(self, apri, startn, stopn):
+        """A consistent copy of the records of the indices `startn, ..., stopn - 1` of `apri`."""
+
+        records, lock_fh = self._get_records(apri)
+
+        with self._lock:
+
+            fcntl.flock(lock_fh, fcntl.LOCK_SH)
+
+            try:
+                return np.array(records[startn : stopn])
+
+            finally:
+                fcntl.flock(lock_fh, fcntl.LOCK_UN)
+
+    def get(self, apri, index, fields):
+        """The values of `fields` of the record of orbit `index` of `apri`.
+
+        :return: (type `tuple`)
+        """
+
+        records, _ = self._get_records(apri)
+        seqs = records["seq"]
+
+        for _ in range(NUM_READ_ATTEMPTS):
+
+            seq = seqs[index]
+
+            if seq % 2 == 0:
+
+                values = tuple(records[field][index] for field in fields)
+
+                if seqs[index] == seq:
+                    return values
+
+        # a writer holds the record, wait for it
+        record = self.read(apri, index, index + 1)[0]
+        return tuple(record[field] for field in fields)
+
+    def set(self, apri, index, fields, values):
+        """Atomically set the `fields` of the record of orbit `index` of `apri` to `values`."""
+
+        records, lock_fh = self._get_records(apri)
+
+        with self._lock:
+
+            fcntl.flock(lock_fh, fcntl.LOCK_EX)
+
+            try:
+
+                seq = records["seq"][index]
+                records["seq"][index] = seq + 1
+
+                for field, value in zip(fields, values):
+                    records[field][index] = value
+
+                records["seq"][index] = seq + 2
+
+            finally:
+                fcntl.flock(lock_fh, fcntl.LOCK_UN)
+
+    def close(self):
+
+        with self._lock:
+
+            for lock_fh in self._lock_fhs.values():
+                lock_fh.close()
+
+            self._records.clear()
+            self._lock_fhs.clear()
+
+class _StatusTableView:
+    """The columns `fields` of a `StatusTable`, with the interface of the `NumpyRegister` `name`."""
+
+    def __init__(self, table, fields, dtype, name):
+
+        self._table = table
+        self._fields = fields
+        self._dtype = dtype
+        self._name = name
+
+    def get(self, apri, index, mmap_mode = None):
+        return np.array(self._table.get(apri, index, self._fields), dtype = self._dtype)
+
+    def set(self, apri, index, row, mmap_mode = None):
+
+        if len(row) != len(self._fields):
+            raise ValueError(f"`row` must have length {len(self._fields)}.")
+
+        self._table.set(apri, index, self._fields, row)
+
+    def __getitem__(self, item):
+        return self.get(*item)
+
+    def __setitem__(self, item, row):
+        self.set(*item, row)
+
+    def __str__(self):
+        return f"{self._name} of the status table `{self._table.table_dir}`"
+
+def calc_status_table_setup(status_reg, periodic_reg, monotone_reg, table_dir):
+    """Setup the `StatusTable` in `table_dir` for `calc_orbits` and return it. Must be called before the processes of
+    `calc_orbits` start.
+
+    The records of the orbits that are not in the table yet (for instance after `calc_orbits_resetup`) are read from
+    the registers. The other records were written by earlier runs of `calc_orbits`, and are written to the registers,
+    which may lag behind the table if a run was interrupted (cf `export_status_table`). Once the table is setup,
+    `calc_orbits` should only be called with it, otherwise the table lags behind the registers.
+
+    :param status_reg: (type `NumpyRegister`)
+    :param periodic_reg: (type `NumpyRegister`)
+    :param monotone_reg: (type `NumpyRegister`)
+    :param table_dir: (type `str` or `pathlib.Path`)
+    :return: (type `StatusTable`)
+    """
+
+    check_type(status_reg, "status_reg", NumpyRegister)
+    check_type(periodic_reg, "periodic_reg", NumpyRegister)
+    check_type(monotone_reg, "monotone_reg", NumpyRegister)
+    table = StatusTable(table_dir)
+
+    with stack(status_reg.open(), periodic_reg.open(), monotone_reg.open()):
+
+        for apri in status_reg:
+
+            intervals = list(status_reg.intervals(apri, diskonly = True))
+
+            if len(intervals) == 0:
+                continue
+
+            records = table.add_apri(apri, max(startn + length for startn, length in intervals))
+
+            for startn, length in intervals:
+
+                rows = records[startn : startn + length]
+                new = np.nonzero(rows["seq"] == 0)[0]
+
+                if len(new) > 0:
+
+                    for reg, fields in (
+                        (status_reg, STATUS_FIELDS), (periodic_reg, PERIODIC_FIELDS), (monotone_reg, MONOTONE_FIELDS)
+                    ):
+
+                        with reg.blk(apri, startn, length, diskonly = True) as blk:
+
+                            for j, field in enumerate(fields):
+                                rows[field][new] = blk.segment[new, j]
+
+                    rows["seq"][new] = 2
+
+            records.flush()
+            export_status_table(table, status_reg, periodic_reg, monotone_reg, apri)
+
+    return table
+
+def export_status_table(table, status_reg, periodic_reg, monotone_reg, apri = None, indices = None):
+    """Write the records of `table` to `status_reg`, `periodic_reg` and `monotone_reg`, one memory-mapped `Block` at a
+    time. The registers must be open.
+
+    :param table: (type `StatusTable`)
+    :param status_reg: (type `NumpyRegister`)
+    :param periodic_reg: (type `NumpyRegister`)
+    :param monotone_reg: (type `NumpyRegister`)
+    :param apri: (type `ApriInfo`, default `None`) If given, only the records of `apri` are written.
+    :param indices: (type `numpy.ndarray`, default `None`) If given with `apri`, only the records of these orbits are
+    written, so that processes that calculate other orbits of the same `Block`s do not overwrite each other.
+    """
+
+    apris = [apri] if apri is not None else list(status_reg)
+
+    for apri_ in apris:
+
+        for startn, length in status_reg.intervals(apri_, diskonly = True):
+
+            if indices is not None:
+
+                blk_indices = indices[(startn <= indices) & (indices < startn + length)] - startn
+
+                if len(blk_indices) == 0:
+                    continue
+
+            else:
+                blk_indices = slice(None)
+
+            rows = table.read(apri_, startn, startn + length)[blk_indices]
+
+            for reg, fields in (
+                (status_reg, STATUS_FIELDS), (periodic_reg, PERIODIC_FIELDS), (monotone_reg, MONOTONE_FIELDS)
+            ):
+
+                with reg.blk(apri_, startn, length, diskonly = True, mmap_mode = "r+") as blk:
+                    blk.segment[blk_indices] = structured_to_unstructured(rows[list(fields)])
@@ -82,3 +82,20 @@ def setdps(dps):
 
     finally:
         mpmath.mp.dps = old_dps
+
+def check_abstract(obj, base, names):
+    """Raise `TypeError` if the class of `obj` does not override the abstract methods `names` of the extension type
+    `base`, as `abc.ABC` does for Python classes, which extension types cannot derive from.
+
+    :param obj: An instance of a subclass of `base`, usually `self` in `base.__init__`.
+    :param base: (type `type`)
+    :param names: (type `tuple` of `str`)
+    """
+
+    missing = [name for name in names if getattr(type(obj), name) is getattr(base, name)]
+
+    if len(missing) > 0:
+        raise TypeError(
+            f"Can't instantiate abstract class `{type(obj).__name__}` without an implementation of "
+            f"{', '.join(f'`{name}`' for name in missing)}."
+        )
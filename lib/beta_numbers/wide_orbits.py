@@ -0,0 +1,386 @@
+"""
+    Beta Expansions of Salem Numbers, calculating periods thereof
+    Copyright (C) 2021 Michael P. Lane
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+"""
+import mpmath
+import numpy as np
+from cornifer import Block, NumpyRegister, ApriInfo, stack
+from cornifer._utilities import check_type, check_return_int, check_return_Path
+from cornifer.debug import log
+from intpolynomials.registers import IntPolynomialRegister
+
+from .batched_orbits import INITIAL_Y_PREC, PREC_INCREASE_FACTOR, calc_x_prec_lower_bound
+from .beta_orbits import _fix_problems, _set_monotone_data, _trim_orbit
+from .evaluators import AMBIGUOUS_FLOOR, FixedPointEvaluator
+from .orbit_replay import get_orbit_replay
+from .perron_numbers import Perron_Number
+from .registers import MPFRegister, WidePolynomialRegister
+from .utilities import setdps
+
+NUM_BYTES_PER_TERABYTE = 2 ** 40
+LOG_2_10 = 3.32193
+
+def calc_wide_orbits_setup(saves_dir):
+    """Setup and return the `Register` `wide_poly_orbit_reg`.
+
+    :param saves_dir: (type `str` or `pathlib.Path`)
+    :return: (type `WidePolynomialRegister`)
+    """
+
+    check_return_Path(saves_dir, "saves_dir")
+    wide_poly_orbit_reg = WidePolynomialRegister(
+        saves_dir,
+        "wide_poly_orbit_reg",
+"""Polynomial orbits of Perron numbers under the beta transformation from the overflow index on (cf
+`status_reg`), whose coefficients may not fit in 64 bits. The earlier iterates are in `poly_orbit_reg`. The apri are
+the same as 'poly_orbit_reg'. See `str(poly_orbit_reg)` for more information on the apri.""",
+        NUM_BYTES_PER_TERABYTE
+    )
+
+    with wide_poly_orbit_reg.open():
+        wide_poly_orbit_reg.increase_max_apri(10 ** 9)
+
+    return wide_poly_orbit_reg
+
+def calc_wide_orbits(
+    perron_polys_reg,
+    perron_nums_reg,
+    poly_orbit_reg,
+    wide_poly_orbit_reg,
+    coef_orbit_reg,
+    periodic_reg,
+    monotone_reg,
+    status_reg,
+    max_blk_len,
+    max_orbit_len,
+    max_dps,
+    num_procs,
+    proc_index,
+    timers,
+    checkpoint_period = 1
+):
+    """Resume every orbit that `calc_orbits` stopped because a coefficient exceeded 61 bits.
+
+    The orbits are continued from their last stored iterate with Python `int` coefficients, so nothing is
+    recalculated. Iterates at and past the overflow index are appended to `wide_poly_orbit_reg`; the coefficients
+    are appended to `coef_orbit_reg` as usual. The overflow index in `status_reg` is kept, also once the orbit is
+    found to be periodic, so that it is always known where the poly orbit continues. The registers and the
+    remaining parameters are the same as for `calc_orbits`; call `calc_wide_orbits_setup` to create
+    `wide_poly_orbit_reg`.
+
+    :param wide_poly_orbit_reg: (type `WidePolynomialRegister`)
+    :param checkpoint_period: (type `int`, positive, default 1) The same as was passed to `calc_orbits`. Past the
+    overflow index, every poly is saved to `wide_poly_orbit_reg` regardless.
+    """
+
+    check_type(perron_polys_reg, "perron_polys_reg", IntPolynomialRegister)
+    check_type(perron_nums_reg, "perron_nums_reg", MPFRegister)
+    check_type(poly_orbit_reg, "poly_orbit_reg", IntPolynomialRegister)
+    check_type(wide_poly_orbit_reg, "wide_poly_orbit_reg", WidePolynomialRegister)
+    check_type(coef_orbit_reg, "coef_orbit_reg", NumpyRegister)
+    check_type(status_reg, "status_reg", NumpyRegister)
+    check_type(periodic_reg, "periodic_reg", NumpyRegister)
+    max_blk_len = check_return_int(max_blk_len, "max_blk_len")
+    max_orbit_len = check_return_int(max_orbit_len, "max_orbit_len")
+    max_dps = check_return_int(max_dps, "max_dps")
+    num_procs = check_return_int(num_procs, "num_procs")
+    proc_index = check_return_int(proc_index, "proc_index")
+    checkpoint_period = check_return_int(checkpoint_period, "checkpoint_period")
+
+    if max_blk_len <= 0:
+        raise ValueError("`max_blk_len` must be positive.")
+
+    if max_orbit_len <= 0:
+        raise ValueError("`max_orbit_len` must be positive.")
+
+    if max_dps <= 0:
+        raise ValueError("`max_dps` must be positive.")
+
+    if num_procs <= 0:
+        raise ValueError("`num_procs` must be positive.")
+
+    if proc_index < 0:
+        raise ValueError("`proc_index` must be non-negative.")
+
+    if checkpoint_period <= 0:
+        raise ValueError("`checkpoint_period` must be positive.")
+
+    with stack(
+        perron_polys_reg.open(True), perron_nums_reg.open(True), poly_orbit_reg.open(), wide_poly_orbit_reg.open(),
+        coef_orbit_reg.open(), periodic_reg.open(), monotone_reg.open(), status_reg.open()
+    ):
+
+        for poly_apri in perron_polys_reg:
+
+            num_apri = ApriInfo(deg = poly_apri.deg, sum_abs_coef = poly_apri.sum_abs_coef, dps = max_dps)
+
+            for blk_index, (startn, length) in enumerate(status_reg.intervals(poly_apri)):
+
+                if blk_index % num_procs == proc_index:
+
+                    with status_reg.blk(poly_apri, startn, length) as status_blk:
+
+                        orbit_lengths = status_blk.segment[:, 0]
+                        overflow_indices = status_blk.segment[:, 2]
+                        overflowed_indices = startn + np.nonzero(
+                            (overflow_indices != -1) & (0 <= orbit_lengths) & (orbit_lengths < max_orbit_len)
+                        )[0]
+
+                    if len(overflowed_indices) == 0:
+                        continue
+
+                    with setdps(max_dps):
+
+                        with stack(
+                            perron_polys_reg.blk(poly_apri, startn, length, decompress = True),
+                            perron_nums_reg.blk(num_apri, startn, length, decompress = True),
+                        ) as (perron_poly_blk, perron_num_blk):
+
+                            for index in overflowed_indices:
+
+                                orbit_apri = ApriInfo(resp = poly_apri, index = index)
+                                beta = Perron_Number(perron_poly_blk[index], beta0 = perron_num_blk[index].real)
+
+                                try:
+                                    _wide_orbit(
+                                        beta, orbit_apri, poly_orbit_reg, wide_poly_orbit_reg, coef_orbit_reg,
+                                        periodic_reg, monotone_reg, status_reg, max_blk_len, max_orbit_len,
+                                        max_dps, timers, checkpoint_period
+                                    )
+
+                                except BaseException:
+
+                                    fixed = _fix_problems(
+                                        orbit_apri, perron_polys_reg, poly_orbit_reg, coef_orbit_reg, status_reg,
+                                        periodic_reg, checkpoint_period
+                                    )
+
+                                    if fixed:
+
+                                        wide_poly_orbit_reg.rmv_apri(
+                                            orbit_apri, force = True, missing_ok = True, ignore_errors = True
+                                        )
+                                        log(f'Problems with {orbit_apri} fixed during exception.')
+
+                                    raise
+
+def _wide_orbit(
+    beta, orbit_apri, poly_orbit_reg, wide_poly_orbit_reg, coef_orbit_reg, periodic_reg, monotone_reg, status_reg,
+    max_blk_len, max_poly_orbit_len, max_dps, timers, checkpoint_period = 1
+):
+    """Same as `_single_orbit`, but B_n is a `list` of Python `int`s and periodicity is detected by comparing with
+    B_1, B_0 and a Brent checkpoint."""
+
+    poly_apri = orbit_apri.resp
+    index = orbit_apri.index
+    deg = beta.deg
+    min_poly = [int(coef) for coef in beta.min_poly.get_ndarray()[ : deg + 1]]
+    replay = get_orbit_replay(poly_orbit_reg, coef_orbit_reg, np.array(min_poly), orbit_apri, checkpoint_period)
+    beta0 = beta.beta0
+    max_prec = int(max_dps * LOG_2_10)
+    last_poly_orbit_len, _, overflow_index = status_reg.get(poly_apri, index, mmap_mode = "r")
+    startn = last_poly_orbit_len + 1
+    log(f'beta0 = {beta0}')
+    log(f'poly_apri = {poly_apri}')
+    log(f'overflow_index = {overflow_index}, startn = {startn}')
+
+    if startn == overflow_index and orbit_apri in wide_poly_orbit_reg:
+        # left over from before the orbit was restarted from the beginning
+        wide_poly_orbit_reg.rmv_apri(orbit_apri, force = True, missing_ok = True, ignore_errors = True)
+
+    def get_poly(n):
+
+        if n < overflow_index:
+            return [int(coef) for coef in replay(n)]
+
+        else:
+            return [int(coef) for coef in wide_poly_orbit_reg[orbit_apri, n]]
+
+    def get_polys(startn, stopn):
+        """B_startn, ..., B_{stopn - 1}."""
+
+        for n in range(startn, stopn):
+            yield get_poly(n)
+
+    evaluator = FixedPointEvaluator(beta0, np.array(min_poly, dtype = np.int64), max_prec)
+    B0 = [1] + [0] * (deg - 1)
+    B1 = [-int(beta0), 1] + [0] * (deg - 2)
+    Bn_1 = get_poly(startn - 1)
+    checkpoint_n = 1 << (int(startn - 1).bit_length() - 1)
+    checkpoint = get_poly(checkpoint_n)
+    ret = monotone_reg.get(poly_apri, index, mmap_mode = "r")
+    is_monotone = ret[0] == 1.
+    min_blowup = ret[1]
+    beta0_ceil = int(mpmath.ceil(beta0))
+    x_prec_lower_bound = max(1, calc_x_prec_lower_bound(deg))
+    coef_seg = []
+    poly_seg = []
+    blk_startn = startn
+
+    def dump():
+
+        if len(coef_seg) > 0:
+
+            with Block(coef_seg, orbit_apri, blk_startn) as coef_blk:
+                coef_orbit_reg.append_disk_blk(coef_blk)
+
+        if len(poly_seg) > 0:
+
+            with Block(poly_seg, orbit_apri, blk_startn) as poly_blk:
+                wide_poly_orbit_reg.append_disk_blk(poly_blk)
+
+    def finish_periodic(preperiod_len, period_len):
+
+        _trim_orbit(
+            poly_orbit_reg, coef_orbit_reg, orbit_apri, preperiod_len, period_len, wide_poly_orbit_reg,
+            checkpoint_period
+        )
+        status_reg.set(poly_apri, index, [-1, -1, overflow_index], mmap_mode = "r+")
+        periodic_reg.set(poly_apri, index, [preperiod_len, period_len], mmap_mode = "r+")
+        _set_monotone_data(is_monotone, monotone_reg, poly_apri, orbit_apri, min_blowup)
+        log(f'Non-simple parry, periodic_reg[...] = {periodic_reg[poly_apri, index]}')
+
+    for n in range(startn, max_poly_orbit_len + 1):
+
+        x_y_prec_offset = (
+            1 +
+            2 * int(deg).bit_length() +
+            max(abs(coef) for coef in Bn_1).bit_length() +
+            deg * int(beta0_ceil + 1).bit_length()
+        )
+        y_prec = INITIAL_Y_PREC
+
+        while True:
+
+            x_prec = max(y_prec + x_y_prec_offset, x_prec_lower_bound)
+
+            if x_prec > max_prec:
+                x_prec = max_prec
+                y_prec = x_prec - x_y_prec_offset
+
+            cn = evaluator.floor_xi_wide(Bn_1, x_prec, y_prec)
+
+            if cn != AMBIGUOUS_FLOOR or x_prec >= max_prec:
+                break
+
+            y_prec *= PREC_INCREASE_FACTOR
+
+        if cn == AMBIGUOUS_FLOOR:
+            # either a simple Parry number, which is certified exactly by B_n == 0, or an unrecoverable precision error
+            cn = int(mpmath.nint(evaluator.last_xi))
+            Bn = calc_Bn_wide(Bn_1, cn, min_poly)
+
+            if cn < 0 or any(Bn):
+
+                dump()
+                status_reg.set(poly_apri, index, [n - 1, n, overflow_index], mmap_mode = "r+")
+                log(f'unrecoverable precision, quitting, n = {n}.')
+                return 0
+
+            coef_seg.extend([cn, 0])
+            poly_seg.append(Bn)
+            dump()
+            finish_periodic(n - 1, 1)
+            return 0
+
+        Bn = calc_Bn_wide(Bn_1, cn, min_poly)
+        is_monotone, min_blowup = calc_min_blowup_wide(is_monotone, n, deg, min_blowup, Bn_1, Bn)
+        coef_seg.append(cn)
+
+        if n >= 2 and Bn == B1 or Bn == B0:
+
+            dump()
+            finish_periodic(0, n - 1 if Bn == B1 else n)
+            return 0
+
+        poly_seg.append(Bn)
+        Bn_1 = Bn
+
+        if Bn == checkpoint:
+
+            dump()
+            period_len = n - checkpoint_n
+
+            for preperiod_len, (B1_, B2_) in enumerate(
+                zip(get_polys(1, checkpoint_n + 1), get_polys(period_len + 1, n + 1))
+            ):
+
+                if B1_ == B2_:
+                    break
+
+            else:
+                raise RuntimeError
+
+            finish_periodic(preperiod_len, period_len)
+            return 0
+
+        if n & (n - 1) == 0:
+            checkpoint_n, checkpoint = n, Bn
+
+        if len(coef_seg) >= max_blk_len:
+
+            dump()
+            blk_startn += len(coef_seg)
+            coef_seg.clear()
+            poly_seg.clear()
+            _set_monotone_data(is_monotone, monotone_reg, poly_apri, orbit_apri, min_blowup)
+            status_reg.set(poly_apri, index, [n, -1, overflow_index], mmap_mode = "r+")
+
+    dump()
+    _set_monotone_data(is_monotone, monotone_reg, poly_apri, orbit_apri, min_blowup)
+    log('Max orbit length, quitting.')
+    status_reg.set(poly_apri, index, [max_poly_orbit_len, -1, overflow_index], mmap_mode = "r+")
+    return 0
+
+def calc_Bn_wide(Bn_1, cn, min_poly):
+    """`_calc_Bn` for `list`s of Python `int`s.
+
+    :param Bn_1: (type `list`) B_{n-1}, `deg` coefficients.
+    :param cn: (type `int`)
+    :param min_poly: (type `list`) The monic minimal polynomial, `deg + 1` coefficients.
+    :return: (type `list`) B_n.
+    """
+
+    lead = Bn_1[-1]
+    Bn = [-cn] + Bn_1[ : -1]
+
+    if lead != 0:
+
+        for j in range(len(Bn)):
+            Bn[j] -= lead * min_poly[j]
+
+    return Bn
+
+def calc_min_blowup_wide(is_monotone, n, deg, min_blowup, Bn_1, Bn):
+    """`_calc_min_blowup` for `list`s of Python `int`s. Return `is_monotone` and `min_blowup`."""
+
+    if not is_monotone:
+        return False, -1.
+
+    elif n < deg:
+        return True, 0.
+
+    for c1, c2 in zip(Bn_1, Bn):
+
+        if c1 == 0:
+
+            if c2 == 0:
+                return False, -1.
+
+        elif (c1 > 0 and c2 >= 0) or (c1 < 0 or c2 <= 0):
+            return False, -1.
+
+        else:
+            min_blowup = min(min_blowup, abs(c2) / abs(c1))
+
+    return True, min_blowup
@@ -0,0 +1,238 @@
+"""
+    Beta Expansions of Salem Numbers, calculating periods thereof
+    Copyright (C) 2021 Michael P. Lane
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+"""
+import fcntl
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+from cornifer import NumpyRegister
+from cornifer._utilities import check_type, check_return_int, check_return_Path
+
+from .cost_model import load_cost_index
+
+ITEMS_FILENAME = "items.npy"
+INDICES_FILENAME = "indices.npy"
+NEXT_FILENAME = "next"
+LOCK_FILENAME = "lock"
+
+# columns of an item of a `WorkQueue`
+ITEM_DEG = 0
+ITEM_SUM_ABS_COEF = 1
+ITEM_STARTN = 2
+ITEM_LENGTH = 3
+ITEM_FIRST = 4
+ITEM_STOP = 5
+ITEM_LEN = 6
+
+class WorkQueue:
+    """A queue of batches of orbits, shared by the processes of `calc_orbits` through the files of `queue_dir`, from
+    which every process claims the next batch whenever it is done with the last one. Costly orbits then only hold up
+    the process that calculates them, instead of every orbit statically assigned to the same process.
+
+    The items are immutable once `calc_work_queue_setup` has written them, and a claim only increments a counter
+    under an exclusive `fcntl.flock` lock, so claiming costs O(1) whatever the length of the queue. Each item is a row
+    of `int64`: the deg and sum_abs_coef of the poly apri, the startn and length of the `Block` of `status_reg` that
+    contains the batch, and the slice `first : stop` of the array of orbit indices of the queue that holds the indices
+    of the batch, which need not be consecutive (cf `cost_index` of `calc_work_queue_setup`).
+
+    The queue has no state besides the counter: `status_reg` remains the record of which orbits are complete. A batch
+    claimed by a process that is interrupted is handed out again by the next `calc_work_queue_setup`, which queues
+    every incomplete orbit of `status_reg`, exactly as the orbits of the `Block`s of an interrupted process are
+    calculated again with the static schedule.
+    """
+
+    def __init__(self, queue_dir):
+        """
+        :param queue_dir: (type `str` or `pathlib.Path`) Written by `calc_work_queue_setup`.
+        """
+
+        self.queue_dir = check_return_Path(queue_dir, "queue_dir")
+        self._items = np.load(self.queue_dir / ITEMS_FILENAME, mmap_mode = "r")
+        self._indices = np.load(self.queue_dir / INDICES_FILENAME, mmap_mode = "r")
+
+    def __len__(self):
+        return len(self._items)
+
+    def claim(self):
+        """Claim the next item, or return `None` if every item has been claimed.
+
+        :return: (type `tuple`) deg, sum_abs_coef, startn, length (type `int`) and the orbit indices of the batch (type
+        `numpy.ndarray` of `int64`).
+        """
+
+        with (self.queue_dir / LOCK_FILENAME).open("a") as lock_fh:
+
+            fcntl.flock(lock_fh, fcntl.LOCK_EX)
+
+            try:
+
+                with (self.queue_dir / NEXT_FILENAME).open("r+b") as fh:
+
+                    index = int.from_bytes(fh.read(8), "little")
+
+                    if index >= len(self._items):
+                        return None
+
+                    fh.seek(0)
+                    fh.write((index + 1).to_bytes(8, "little"))
+                    fh.flush()
+                    os.fsync(fh.fileno())
+
+            finally:
+                fcntl.flock(lock_fh, fcntl.LOCK_UN)
+
+        deg, sum_abs_coef, startn, length, first, stop = (int(x) for x in self._items[index])
+        return deg, sum_abs_coef, startn, length, np.array(self._indices[first : stop])
+
+    def num_claimed(self):
+        """The number of items claimed so far by all processes."""
+
+        with (self.queue_dir / NEXT_FILENAME).open("rb") as fh:
+            return min(int.from_bytes(fh.read(8), "little"), len(self._items))
+
+    def __iter__(self):
+        """Claim items until the queue is empty."""
+
+        while True:
+
+            item = self.claim()
+
+            if item is None:
+                return
+
+            yield item
+
+def calc_work_queue_setup(status_reg, queue_dir, max_orbit_len, batch_len = 64, cost_index = None, max_cost = None):
+    """Queue every orbit of `status_reg` that is still running and shorter than `max_orbit_len`, in batches of at
+    most `batch_len` orbits of the same `Block`, and return the `WorkQueue`. Must be called before the processes of
+    `calc_orbits` start, and replaces the queue of an earlier run.
+
+    Each claim of a batch reads the `Block`s of `perron_polys_reg` and `perron_nums_reg` that contain it, so
+    `batch_len` trades that cost against the balance of the processes.
+
+    If `cost_index` is given, the orbits are queued by increasing predicted cost (cf
+    `beta_numbers.cost_model.calc_cost_index`) instead of in storage order, so that the cheap orbits are done first.
+    The orbits are grouped in tiers of predicted costs within a factor 2 of each other, and the orbits of a tier are
+    batched by `Block`. Orbits that are missing from the index (for instance added after it was calculated) are queued
+    last, whatever `max_cost`.
+
+    :param status_reg: (type `NumpyRegister`)
+    :param queue_dir: (type `str` or `pathlib.Path`)
+    :param max_orbit_len: (type `int`, positive)
+    :param batch_len: (type `int`, positive, default 64)
+    :param cost_index: (type `str` or `pathlib.Path`, default `None`) Written by
+    `beta_numbers.cost_model.calc_cost_index`.
+    :param max_cost: (type `float`, positive, default `None`) If given, orbits of predicted cost greater than
+    `max_cost` are not queued. Requires `cost_index`.
+    :return: (type `WorkQueue`)
+    """
+
+    check_type(status_reg, "status_reg", NumpyRegister)
+    queue_dir = check_return_Path(queue_dir, "queue_dir")
+    max_orbit_len = check_return_int(max_orbit_len, "max_orbit_len")
+    batch_len = check_return_int(batch_len, "batch_len")
+
+    if max_orbit_len <= 0:
+        raise ValueError("`max_orbit_len` must be positive.")
+
+    if batch_len <= 0:
+        raise ValueError("`batch_len` must be positive.")
+
+    if max_cost is not None:
+
+        if cost_index is None:
+            raise ValueError("`max_cost` requires `cost_index`.")
+
+        if max_cost <= 0:
+            raise ValueError("`max_cost` must be positive.")
+
+    if cost_index is not None:
+        costs = load_cost_index(cost_index)
+
+    # (tier, deg, sum_abs_coef, startn, length) -> indices
+    groups = {}
+
+    with status_reg.open(True):
+
+        for poly_apri in status_reg:
+
+            for startn, length in status_reg.intervals(poly_apri):
+
+                with status_reg.blk(poly_apri, startn, length) as status_blk:
+
+                    orbit_lengths = status_blk.segment[:, 0]
+                    incomplete_indices = startn + np.nonzero(
+                        (0 <= orbit_lengths) & (orbit_lengths < max_orbit_len)
+                    )[0]
+
+                for index in incomplete_indices.tolist():
+
+                    if cost_index is not None:
+
+                        cost = costs.get((poly_apri.deg, poly_apri.sum_abs_coef, index))
+
+                        if cost is None:
+                            tier = math.inf
+
+                        elif max_cost is not None and cost > max_cost:
+                            continue
+
+                        else:
+                            # predicted costs are positive
+                            tier = math.floor(math.log2(cost))
+
+                    else:
+                        tier = 0
+
+                    groups.setdefault((tier, poly_apri.deg, poly_apri.sum_abs_coef, startn, length), []).append(index)
+
+    items = []
+    indices = []
+    # the groups were added in storage order, which `sorted` keeps within a tier
+    for tier, deg, sum_abs_coef, startn, length in sorted(groups, key = lambda key: key[0]):
+
+        group_indices = groups[tier, deg, sum_abs_coef, startn, length]
+
+        for i in range(0, len(group_indices), batch_len):
+
+            batch_indices = group_indices[i : i + batch_len]
+            items.append((deg, sum_abs_coef, startn, length, len(indices), len(indices) + len(batch_indices)))
+            indices.extend(batch_indices)
+
+    return write_work_queue(
+        queue_dir, np.array(items, dtype = np.int64).reshape(-1, ITEM_LEN), np.array(indices, dtype = np.int64)
+    )
+
+def write_work_queue(queue_dir, items, indices):
+    """Replace the queue of `queue_dir` by `items`, an `int64` array with `ITEM_LEN` columns, whose batches are slices
+    of `indices`, an `int64` array of orbit indices, and return the `WorkQueue`."""
+
+    queue_dir = Path(queue_dir)
+    queue_dir.mkdir(parents = True, exist_ok = True)
+
+    for filename, array in ((INDICES_FILENAME, indices), (ITEMS_FILENAME, items)):
+
+        tmp_filename = queue_dir / (filename + ".tmp")
+
+        with tmp_filename.open("wb") as fh:
+            np.save(fh, array)
+
+        os.replace(tmp_filename, queue_dir / filename)
+
+    with (queue_dir / NEXT_FILENAME).open("wb") as fh:
+        fh.write((0).to_bytes(8, "little"))
+
+    return WorkQueue(queue_dir)
@@ -4,6 +4,9 @@ from pathlib import Path
 
 from intpolynomials.registers import IntPolynomialRegister
 from beta_numbers.beta_orbits import calc_orbits, calc_orbits_setup
+from beta_numbers.cost_model import calc_cost_index
+from beta_numbers.status_table import calc_status_table_setup
+from beta_numbers.work_queue import calc_work_queue_setup
 from cornifer import parallelize, load, load_ident
 from cornifer.debug import init_dir, set_dir, log
 from cornifer._utilities.multiprocessing import slurm_timecode_to_timedelta
@@ -11,7 +14,8 @@ from dagtimers import Timers
 
 def f(
     num_procs, proc_index, perron_polys_reg, perron_nums_reg, poly_orbit_reg, coef_orbit_reg, periodic_reg,
-    monotone_reg, status_reg, max_blk_len, max_orbit_len, max_dps, debug_dir, timers
+    monotone_reg, status_reg, max_blk_len, max_orbit_len, max_dps, debug_dir, timers, work_queue_dir, status_table_dir,
+    lease_dir, write_behind
 ):
 
     set_dir(debug_dir)
@@ -30,7 +34,11 @@ def f(
         max_dps,
         num_procs,
         proc_index,
-        timers
+        timers,
+        work_queue_dir = work_queue_dir,
+        status_table_dir = status_table_dir,
+        lease_dir = lease_dir,
+        write_behind = write_behind
     )
 
 if __name__ == '__main__':
@@ -46,6 +54,17 @@ if __name__ == '__main__':
     update_period = int(sys.argv[9])
     update_timeout = int(sys.argv[10])
     sec_per_block_upper_bound = int(sys.argv[11])
+    # if given, the orbits are handed out on demand instead of by `blk_index % num_procs`
+    work_queue_dir = Path(sys.argv[12]) if len(sys.argv) > 12 and sys.argv[12] != 'None' else None
+    # if given, the queued orbits are ranked by predicted cost, and those above the optional max cost are skipped
+    cost_index = work_queue_dir / 'cost_index.npy' if len(sys.argv) > 13 and sys.argv[13] == 'True' else None
+    max_cost = float(sys.argv[14]) if len(sys.argv) > 14 and sys.argv[14] != 'None' else None
+    # if given, the orbits keep their status in a shared-memory table instead of the registers
+    status_table_dir = Path(sys.argv[15]) if len(sys.argv) > 15 and sys.argv[15] != 'None' else None
+    # if given, orbits still calculated by the stragglers of an earlier job are skipped
+    lease_dir = Path(sys.argv[16]) if len(sys.argv) > 16 and sys.argv[16] != 'None' else None
+    # if given, the blocks of the orbits are written by a background thread
+    write_behind = len(sys.argv) > 17 and sys.argv[17] == 'True'
     tmp_filename = Path(os.environ['TMPDIR'])
     debug_dir = init_dir('/fs/project/thompson.2455/lane.662/debugs')
     perron_polys_reg = load('salem_polys_reg', perron_polys_dir)
@@ -63,9 +82,21 @@ if __name__ == '__main__':
         monotone_reg = load('monotone_reg', beta_numbers_dir)
         status_reg = load('status_reg', beta_numbers_dir)
 
+    if status_table_dir is not None:
+        calc_status_table_setup(status_reg, periodic_reg, monotone_reg, status_table_dir)
+
+    if cost_index is not None and not cost_index.exists():
+        # once per campaign
+        work_queue_dir.mkdir(parents = True, exist_ok = True)
+        calc_cost_index(perron_polys_reg, perron_nums_reg, cost_index, max_dps)
+
+    if work_queue_dir is not None:
+        calc_work_queue_setup(status_reg, work_queue_dir, max_orbit_len, cost_index = cost_index, max_cost = max_cost)
+
     parallelize(
         num_procs, f, (
             perron_polys_reg, perron_nums_reg, poly_orbit_reg, coef_orbit_reg, periodic_reg, monotone_reg, status_reg,
-            max_blk_len, max_orbit_len, max_dps, debug_dir, timers
+            max_blk_len, max_orbit_len, max_dps, debug_dir, timers, work_queue_dir, status_table_dir, lease_dir,
+            write_behind
         ), timeout, tmp_filename, update_period, update_timeout, sec_per_block_upper_bound
     )
\ No newline at end of file
@@ -0,0 +1,11 @@
+import sys
+from pathlib import Path
+
+from beta_numbers.profiling import load_profiles, format_profile
+
+if __name__ == "__main__":
+    # merge the profile files of every process and SLURM task written to `profile_dir` by
+    # `beta_numbers.profiling.SamplingTimers`, and print the stages and the most frequent stacks
+    profile_dir = Path(sys.argv[1])
+    num_stacks = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    print(format_profile(load_profiles(profile_dir), num_stacks))
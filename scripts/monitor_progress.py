@@ -0,0 +1,56 @@
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from beta_numbers.progress import read_progress_files, summarize_progress
+
+BYTES_PER_GB = 1024 ** 3
+
+def format_secs(secs):
+    return str(timedelta(seconds = int(secs))) if secs is not None else "?"
+
+def format_view(records, now):
+
+    lines = [
+        f"{'kind' : <12}{'proc' : >6}{'done' : >16}{'coefs/s' : >12}{'polys/s' : >12}{'RSS (GB)' : >10}"
+        f"{'age (s)' : >9}  apri"
+    ]
+
+    for record in records:
+        lines.append(
+            f"{record['kind'] : <12}{record['proc_index'] : >6}"
+            f"{str(record['units_done']) + '/' + str(record['units_total']) : >16}"
+            f"{record['coefs_per_sec'] : >12.1f}{record['polys_per_sec'] : >12.1f}"
+            f"{record['rss'] / BYTES_PER_GB : >10.2f}{now - record['update_time'] : >9.0f}  {record['apri']}"
+        )
+
+    for kind, summary in summarize_progress(records, now).items():
+        lines.append(
+            f"{kind}: {summary['num_workers']} workers, {summary['units_done']}/{summary['units_total']} done, "
+            f"{summary['coefs_per_sec'] : .1f} coefs/s, {summary['polys_per_sec'] : .1f} polys/s, "
+            f"{summary['rss'] / BYTES_PER_GB : .2f} GB, elapsed {format_secs(summary['elapsed'])}, "
+            f"ETA {format_secs(summary['eta'])}, stragglers {summary['stragglers']}"
+        )
+
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    # live view of the progress files written by the workers of `calc_orbits` and `calc_perron_nums` in
+    # `progress_dir`, refreshed every `period` seconds (once if `period` is 0)
+    progress_dir = Path(sys.argv[1])
+    period = float(sys.argv[2]) if len(sys.argv) > 2 else 10.
+
+    while True:
+
+        now = time.time()
+        view = format_view(read_progress_files(progress_dir), now)
+
+        if period <= 0:
+
+            print(view)
+            break
+
+        # clear the terminal
+        print("\033[2J\033[H" + view, flush = True)
+        time.sleep(period)
@@ -31,6 +31,26 @@ extensions = [
         "beta_numbers.beta_orbits",
         ["lib/beta_numbers/beta_orbits" + ext],
         include_dirs = [np.get_include()]
+    ),
+    Extension(
+        "beta_numbers.evaluators",
+        ["lib/beta_numbers/evaluators" + ext],
+        include_dirs = [np.get_include()]
+    ),
+    Extension(
+        "beta_numbers.cycle_detectors",
+        ["lib/beta_numbers/cycle_detectors" + ext],
+        include_dirs = [np.get_include()]
+    ),
+    Extension(
+        "beta_numbers.precision_policies",
+        ["lib/beta_numbers/precision_policies" + ext],
+        include_dirs = [np.get_include()]
+    ),
+    Extension(
+        "beta_numbers.metrics",
+        ["lib/beta_numbers/metrics" + ext],
+        include_dirs = [np.get_include()]
     )
 ]
 
@@ -41,6 +61,7 @@ if build_cython:
         compiler_directives = {"language_level" : "3"},
         include_path = [
             intpolynomials.get_include(),
+            "lib",
             "lib/beta_numbers/beta_orbits.pxd"
         ]
     )
@@ -0,0 +1,86 @@
+from unittest import TestCase, skipIf
+
+import numpy as np
+
+from beta_numbers import backends
+from beta_numbers.backends import BACKENDS, get_backend
+from beta_numbers.evaluators import MPMathEvaluator
+from beta_numbers.examples import boyd_psi_r, boyd_phi_r, boyd_beta_n, boyd_prop5_2, salems
+
+from .utilities import calc_beta0, calc_coef_orbit
+
+MAX_DPS = 100
+MAX_PREC = int(MAX_DPS * 3.32193)
+
+def get_examples():
+    """(minimal polynomial, coefficient orbit, poly preperiod length, period length) of `beta_numbers.examples`."""
+
+    examples = list(salems)
+
+    for r in range(1, 7):
+
+        examples.append(boyd_phi_r(r))
+        examples.append(boyd_psi_r(r))
+
+    for n in range(2, 9):
+
+        examples.append(boyd_beta_n(n))
+        examples.append(boyd_prop5_2(n))
+
+    return [
+        (poly.get_ndarray()[ : poly.deg() + 1].astype(np.int64), list(orbit), m, p) for poly, orbit, m, p in examples
+    ]
+
+class TestBackends(TestCase):
+
+    def check_backend(self, name):
+
+        for min_poly_coefs, orbit, m, p in get_examples():
+
+            beta0 = calc_beta0(min_poly_coefs, MAX_DPS)
+            exp_calls = []
+            exp_coefs = calc_coef_orbit(
+                MPMathEvaluator(beta0, min_poly_coefs, MAX_PREC), min_poly_coefs, 3 * len(orbit), MAX_PREC, exp_calls
+            )
+            calls = []
+            coefs = calc_coef_orbit(
+                MPMathEvaluator(beta0, min_poly_coefs, MAX_PREC, backend = name), min_poly_coefs, 3 * len(orbit),
+                MAX_PREC, calls
+            )
+
+            if orbit[-1] == 0:
+                # simple Parry, the orbit stops at the last nonzero coefficient
+                self.assertEqual(coefs, orbit[:-1])
+
+            else:
+                self.assertEqual(coefs[ : len(orbit)], orbit)
+
+            self.assertEqual(coefs, exp_coefs)
+
+            if BACKENDS[name].round_to_nearest:
+                self.assertEqual(calls, exp_calls)
+
+    def test_libmp(self):
+        self.check_backend("libmp")
+
+    @skipIf(backends.gmpy2 is None, "gmpy2 is not installed")
+    def test_gmpy2(self):
+        self.check_backend("gmpy2")
+
+    @skipIf(backends.flint is None, "python-flint is not installed")
+    def test_flint(self):
+        self.check_backend("flint")
+
+    def test_get_backend(self):
+
+        beta0 = calc_beta0(np.array([-1, -1, 1], dtype = np.int64), MAX_DPS)
+        self.assertIsInstance(get_backend("libmp", beta0, MAX_PREC), BACKENDS["libmp"])
+
+        with self.assertRaises(ValueError):
+            get_backend("mpmath", beta0, MAX_PREC)
+
+        with self.assertRaises(TypeError):
+            backends.Backend(beta0, MAX_PREC)
+
+        with self.assertRaises(ValueError):
+            MPMathEvaluator(beta0, np.array([-1, -1, 1], dtype = np.int64), MAX_PREC, backend = "mpfr")
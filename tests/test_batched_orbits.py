@@ -0,0 +1,105 @@
+from unittest import TestCase
+
+import mpmath
+import numpy as np
+
+from beta_numbers.batched_orbits import (
+    OrbitBatch, RUNNING, PERIODIC, SIMPLE_PARRY, OVERFLOW, MAX_LEN, base2_magn, calc_Bn
+)
+
+from .utilities import MAX_DPS, MAX_PREC, SALEMS, BIG_SALEM, calc_beta0
+
+def run(batch):
+    """Step `batch` until it is empty, return the coefficients and final event of each slot."""
+
+    coefs = {}
+    finished = {}
+
+    with mpmath.workdps(MAX_DPS):
+
+        while len(batch) > 0:
+
+            slots, n, cn, Bn, events, k = batch.step()
+
+            for slot, n_, c, event, k_ in zip(slots, n, cn, events, k):
+
+                if event not in (OVERFLOW,):
+                    coefs.setdefault(slot, []).append(int(c))
+
+                if event != RUNNING:
+                    finished[slot] = (event, int(n_), int(k_))
+
+    return coefs, finished
+
+class TestBatchedOrbits(TestCase):
+
+    def test_salems(self):
+
+        min_polys = np.array([min_poly for min_poly, _, _, _ in SALEMS], dtype = np.int64)
+        beta0s = [calc_beta0(min_poly) for min_poly, _, _, _ in SALEMS]
+        coefs, finished = run(OrbitBatch(min_polys, beta0s, MAX_PREC, 1000))
+
+        for slot, (_, orbit, m, p) in enumerate(SALEMS):
+
+            event, n, k = finished[slot]
+            self.assertEqual(event, PERIODIC)
+            self.assertEqual(coefs[slot], orbit)
+            # the orbits repeat at B_1
+            self.assertEqual((k, n - k), (1, p))
+
+    def test_simple_parry(self):
+
+        # golden ratio and x ** 2 - 2x - 1, whose expansions of 1 are 11 and 21
+        min_polys = np.array([[-1, -1, 1], [-1, -2, 1]], dtype = np.int64)
+        coefs, finished = run(OrbitBatch(min_polys, [calc_beta0(p) for p in min_polys], MAX_PREC, 1000))
+        self.assertEqual(coefs, {0 : [1, 1], 1 : [2, 1]})
+        self.assertEqual(finished, {0 : (SIMPLE_PARRY, 2, -1), 1 : (SIMPLE_PARRY, 2, -1)})
+
+    def test_big_salem(self):
+
+        min_poly = np.array(BIG_SALEM, dtype = np.int64)
+        beta0 = calc_beta0(min_poly)
+        coefs, finished = run(OrbitBatch(np.array([min_poly, min_poly]), [beta0, beta0], MAX_PREC, 500))
+        self.assertEqual(finished[0], (MAX_LEN, 500, -1))
+        self.assertEqual(coefs[0], coefs[1])
+        # compare with exact floors
+        Bn_1 = np.zeros((1, 6), dtype = np.int64)
+        Bn_1[0, 0] = 1
+
+        with mpmath.workdps(MAX_DPS):
+
+            for c in coefs[0]:
+
+                xi = beta0 * mpmath.polyval(Bn_1[0, ::-1].tolist(), beta0)
+                self.assertEqual(int(mpmath.floor(xi)), c)
+                Bn_1 = calc_Bn(Bn_1, np.array([c]), min_poly[None, :])
+
+    def test_restart(self):
+
+        min_polys = np.array([min_poly for min_poly, _, _, _ in SALEMS], dtype = np.int64)
+        beta0s = [calc_beta0(min_poly) for min_poly, _, _, _ in SALEMS]
+        batch = OrbitBatch(min_polys, beta0s, MAX_PREC, 1000)
+        polys = []
+
+        for _ in range(5):
+            polys.append(batch.step()[3][1])
+
+        batch = OrbitBatch(min_polys[1:], beta0s[1:], MAX_PREC, 1000)
+        batch.restart(0, 6, polys[4], 4, polys[3], True, 0.)
+        coefs, finished = run(batch)
+        self.assertEqual(coefs[0], SALEMS[1][1][5:])
+        self.assertEqual(finished[0][0], PERIODIC)
+        self.assertFalse(batch.is_monotone[0])
+
+    def test_overflow(self):
+
+        min_poly = np.array(BIG_SALEM, dtype = np.int64)
+        batch = OrbitBatch(min_poly[None, :], [calc_beta0(min_poly)], MAX_PREC, 1000)
+        batch.restart(0, 10, np.array([2 ** 50, 0, 0, 0, 0, 0]), 8, np.zeros(6), True, 0.)
+        self.assertEqual(batch.step()[4][0], OVERFLOW)
+        self.assertEqual(len(batch), 0)
+
+    def test_base2_magn(self):
+
+        x = np.array([0, 1, 2, 3, 2 ** 53 + 1, 2 ** 62 - 1, 2 ** 62, 2 ** 63 - 1], dtype = np.int64)
+        self.assertEqual(base2_magn(x).tolist(), [int(x_).bit_length() for x_ in x.tolist()])
@@ -14,7 +14,9 @@ from cornifer._utilities import random_unique_filename
 from cornifer.registers import _CURR_ID_KEY
 from dagtimers import Timers
 
-from beta_numbers.beta_orbits import calc_orbits, calc_orbits_setup
+from beta_numbers.beta_orbits import calc_orbits, calc_orbits_setup, _calc_round_orbit_lens
+from beta_numbers.resume import calc_resume_setup
+from beta_numbers.status_table import calc_status_table_setup
 
 NUM_BYTES_PER_TERABYTE = 2 ** 40
 
@@ -24,6 +26,7 @@ class TestBetaOrbits(TestCase):
     saves_dir = None
     perron_polys_reg = None
     perron_nums_reg = None
+    perron_conjs_reg = None
     exp_coef_orbit_reg = None
     exp_periodic_reg = None
     MAX_DPS = 1000
@@ -53,8 +56,17 @@ class TestBetaOrbits(TestCase):
             NUM_BYTES_PER_TERABYTE
         )
 
-        with stack(cls.perron_nums_reg.open(), cls.perron_polys_reg.open()):
+        cls.perron_conjs_reg = MPFRegister(
+            cls.saves_dir,
+            "perron_conjs_reg",
+            "Respective decimal approximations of the proper conjugates of the Perron numbers of `perron_nums_reg`.",
+            NUM_BYTES_PER_TERABYTE
+        )
+
+        with stack(cls.perron_nums_reg.open(), cls.perron_polys_reg.open(), cls.perron_conjs_reg.open()):
+
             cls.perron_nums_reg.add_subreg(cls.perron_polys_reg)
+            cls.perron_conjs_reg.add_subreg(cls.perron_nums_reg)
 
         cls.exp_coef_orbit_reg = NumpyRegister(
             cls.saves_dir,
@@ -72,7 +84,7 @@ class TestBetaOrbits(TestCase):
 
         with stack(
             cls.perron_polys_reg.open(), cls.exp_coef_orbit_reg.open(), cls.exp_periodic_reg.open(),
-            cls.perron_nums_reg.open()
+            cls.perron_nums_reg.open(), cls.perron_conjs_reg.open()
         ):
             TestBetaOrbits.add_known_coef_orbit(*salems[0])
 
@@ -113,6 +125,9 @@ class TestBetaOrbits(TestCase):
             with Block([perron.beta0], num_apri, index) as beta0_blk:
                 cls.perron_nums_reg.add_disk_blk(beta0_blk, dups_ok = False)
 
+            with Block([[conj for conj, _, _ in perron.conjs_mods_mults[1:]]], num_apri, index) as conjs_blk:
+                cls.perron_conjs_reg.add_disk_blk(conjs_blk, dups_ok = False)
+
         orbit_apri = ApriInfo(resp = poly_apri, index = index)
 
         with Block(orbit, orbit_apri, 1) as orbit_blk:
@@ -509,6 +524,189 @@ class TestBetaOrbits(TestCase):
                 # print("cls.exp_periodic_reg")
                 # print_timers(cls.exp_periodic_reg)
 
+    def run_calc_orbits(self, max_blk_len, orbit_lens, resume = False, status_table = False, **kwargs):
+        """Setup new registers, call `calc_orbits` with `kwargs` once for each of the orbit lengths `orbit_lens`, and
+        return the contents of the registers, per orbit apri. If `status_table`, the orbits use a new `StatusTable`."""
+
+        cls = type(self)
+        timers = Timers()
+        poly_orbit_reg, coef_orbit_reg, periodic_reg, monotone_reg, status_reg = calc_orbits_setup(
+            cls.perron_polys_reg, cls.perron_nums_reg, cls.saves_dir, max_blk_len, timers, False
+        )
+
+        if resume:
+            kwargs["resume_reg"] = calc_resume_setup(cls.perron_polys_reg, cls.saves_dir)
+
+        if status_table:
+
+            kwargs["status_table_dir"] = random_unique_filename(cls.saves_dir)
+            calc_status_table_setup(status_reg, periodic_reg, monotone_reg, kwargs["status_table_dir"]).close()
+
+        for orbit_len in orbit_lens:
+            calc_orbits(
+                cls.perron_polys_reg,
+                cls.perron_nums_reg,
+                poly_orbit_reg,
+                coef_orbit_reg,
+                periodic_reg,
+                monotone_reg,
+                status_reg,
+                max_blk_len,
+                orbit_len,
+                cls.MAX_DPS,
+                1,
+                0,
+                timers,
+                **kwargs
+            )
+
+        data = {}
+
+        with stack(
+            cls.perron_polys_reg.open(), poly_orbit_reg.open(), coef_orbit_reg.open(), periodic_reg.open(),
+            monotone_reg.open(), status_reg.open()
+        ):
+
+            for perron_apri in cls.perron_polys_reg:
+
+                for index in range(cls.perron_polys_reg.maxn(perron_apri) + 1):
+
+                    orbit_apri = ApriInfo(resp = perron_apri, index = index)
+                    data[orbit_apri] = (
+                        list(coef_orbit_reg[orbit_apri, :]) if orbit_apri in coef_orbit_reg else [],
+                        [poly.get_ndarray().tolist() for poly in poly_orbit_reg[orbit_apri, :]]
+                        if orbit_apri in poly_orbit_reg else [],
+                        list(status_reg.get(perron_apri, index, mmap_mode = "r")),
+                        list(periodic_reg.get(perron_apri, index, mmap_mode = "r")),
+                        list(monotone_reg.get(perron_apri, index, mmap_mode = "r"))
+                    )
+
+        return data
+
+    def check_periods(self, data, max_poly_orbit_len):
+        """The periods of `data` (cf `run_calc_orbits`) are those of `exp_periodic_reg`, if they are found within
+        `max_poly_orbit_len`."""
+
+        cls = type(self)
+
+        with cls.exp_periodic_reg.open():
+
+            for orbit_apri, (_, _, _, periodic, _) in data.items():
+
+                exp_preperiod_len, exp_period = cls.exp_periodic_reg.get(
+                    orbit_apri.resp, orbit_apri.index, mmap_mode = "r"
+                )
+
+                if max_poly_orbit_len >= 2 * exp_period * math.ceil((exp_preperiod_len + 1) / exp_period):
+                    # the period is found within `max_poly_orbit_len`, as in `test_calc_orbits`
+                    self.assertEqual(periodic, [exp_preperiod_len, exp_period])
+
+    def test_calc_orbits_resume(self):
+
+        max_poly_orbit_len = 1000
+
+        for cycle_detector, cycle_detector_kwargs, checkpoint_period, num_threads in [
+            ("brent", {}, 1, 1),
+            ("brent", {}, 1, 4),
+            ("brent", {}, 4, 4),
+            ("distinguished", {"dp_bits" : 2}, 1, 4)
+        ]:
+            # stop every orbit part-way, then resume it from `resume_reg`
+            data = {}
+
+            for write_behind in [False, True]:
+                data[write_behind] = self.run_calc_orbits(
+                    5, [7, max_poly_orbit_len], resume = True, cycle_detector = cycle_detector,
+                    cycle_detector_kwargs = cycle_detector_kwargs, checkpoint_period = checkpoint_period,
+                    num_threads = num_threads, write_behind = write_behind
+                )
+
+            self.check_periods(data[False], max_poly_orbit_len)
+            self.assertEqual(data[True], data[False])
+
+    def test_calc_orbits_write_behind(self):
+
+        max_poly_orbit_len = 1000
+
+        for max_blk_len, num_threads in [(1, 1), (5, 1), (5, 4)]:
+
+            exp_data = self.run_calc_orbits(max_blk_len, [max_poly_orbit_len], num_threads = num_threads)
+            self.check_periods(exp_data, max_poly_orbit_len)
+            self.assertEqual(
+                self.run_calc_orbits(
+                    max_blk_len, [max_poly_orbit_len], num_threads = num_threads, write_behind = True
+                ),
+                exp_data
+            )
+
+        with self.assertRaises(ValueError):
+            self.run_calc_orbits(5, [max_poly_orbit_len], batch_size = 2, write_behind = True)
+
+    def test_calc_orbits_threads(self):
+
+        max_poly_orbit_len = 1000
+        # with short `Block`s, most orbits become periodic several `Block`s in, and are trimmed by `_trim_orbit`
+        for max_blk_len in [1, 3]:
+
+            exp_data = self.run_calc_orbits(max_blk_len, [max_poly_orbit_len])
+            self.check_periods(exp_data, max_poly_orbit_len)
+
+            for orbit_lens in [[max_poly_orbit_len], [7, 50, max_poly_orbit_len]]:
+                self.assertEqual(self.run_calc_orbits(max_blk_len, orbit_lens, num_threads = 4), exp_data)
+
+    def test_calc_orbits_status_table(self):
+
+        max_poly_orbit_len = 1000
+
+        for max_blk_len, orbit_lens, num_threads in [
+            (5, [max_poly_orbit_len], 1), (5, [7, max_poly_orbit_len], 1), (3, [7, max_poly_orbit_len], 4)
+        ]:
+
+            exp_data = self.run_calc_orbits(max_blk_len, orbit_lens, num_threads = num_threads)
+            self.check_periods(exp_data, max_poly_orbit_len)
+            # the table is exported to `status_reg`, `periodic_reg` and `monotone_reg`
+            self.assertEqual(
+                self.run_calc_orbits(max_blk_len, orbit_lens, status_table = True, num_threads = num_threads),
+                exp_data
+            )
+
+    def test_calc_orbits_trace(self):
+
+        max_poly_orbit_len = 1000
+        exp_data = self.run_calc_orbits(5, [max_poly_orbit_len])
+        # the conjugates are calculated, or read from `perron_conjs_reg`
+        self.assertEqual(self.run_calc_orbits(5, [max_poly_orbit_len], evaluator = "trace"), exp_data)
+        self.assertEqual(
+            self.run_calc_orbits(
+                5, [max_poly_orbit_len], evaluator = "trace", perron_conjs_reg = type(self).perron_conjs_reg
+            ),
+            exp_data
+        )
+
+        with self.assertRaises(ValueError):
+            self.run_calc_orbits(5, [max_poly_orbit_len], perron_conjs_reg = type(self).perron_conjs_reg)
+
+    def test_calc_orbits_rounds(self):
+
+        max_poly_orbit_len = 1000
+
+        for max_blk_len, num_threads in [(1, 1), (5, 1), (5, 4)]:
+
+            exp_data = self.run_calc_orbits(max_blk_len, [max_poly_orbit_len], num_threads = num_threads)
+            self.check_periods(exp_data, max_poly_orbit_len)
+            # the rounds are up to 7, 14, 28, ..., 896, 1000
+            self.assertEqual(
+                self.run_calc_orbits(max_blk_len, [max_poly_orbit_len], num_threads = num_threads, round_len = 7),
+                exp_data
+            )
+
+    def test_calc_round_orbit_lens(self):
+
+        self.assertEqual(_calc_round_orbit_lens(1000, None, 2), [1000])
+        self.assertEqual(_calc_round_orbit_lens(1000, 100, 2), [100, 200, 400, 800, 1000])
+        self.assertEqual(_calc_round_orbit_lens(1000, 1000, 2), [1000])
+        self.assertEqual(_calc_round_orbit_lens(5, 1, 1.1), [1, 2, 3, 4, 5])
+
 def print_timers(reg):
 
     print(f"set_elapsed  = {reg.set_elapsed}")
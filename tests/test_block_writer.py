@@ -0,0 +1,74 @@
+import threading
+import time
+from unittest import TestCase
+
+from beta_numbers.block_writer import BlockWriter
+
+class TestBlockWriter(TestCase):
+
+    def test_order(self):
+
+        writer = BlockWriter()
+        self.assertIsNone(writer._thread)
+        written = []
+
+        def write(i):
+            # slower than the submits
+            time.sleep(0.005)
+            written.append(i)
+
+        for i in range(20):
+            writer.submit(write, i)
+
+        writer.flush()
+        self.assertEqual(written, list(range(20)))
+        self.assertNotEqual(writer._thread.ident, threading.get_ident())
+        writer.close()
+        self.assertIsNone(writer._thread)
+        # closing a writer that never wrote
+        BlockWriter().close()
+
+        with self.assertRaises(ValueError):
+            BlockWriter(0)
+
+    def test_max_pending(self):
+
+        writer = BlockWriter(max_pending = 1)
+        release = threading.Event()
+        writer.submit(release.wait)
+        # waits for the thread
+        writer.submit(lambda: None)
+        submitted = threading.Event()
+        thread = threading.Thread(target = lambda: (writer.submit(lambda: None), submitted.set()))
+        thread.start()
+        self.assertFalse(submitted.wait(0.1))
+        release.set()
+        self.assertTrue(submitted.wait(5))
+        thread.join()
+        writer.close()
+
+    def test_error(self):
+
+        writer = BlockWriter()
+        written = []
+
+        def fail():
+            raise OSError("disk full")
+
+        writer.submit(written.append, "data 1")
+        writer.submit(fail)
+        writer.submit(written.append, "status 1")
+
+        with self.assertRaises(OSError):
+            writer.flush()
+
+        # the writes after a failed one are dropped, so a status is never written without its data
+        self.assertEqual(written, ["data 1"])
+
+        with self.assertRaises(OSError):
+            writer.submit(written.append, "data 2")
+
+        with self.assertRaises(OSError):
+            writer.close()
+
+        self.assertEqual(written, ["data 1"])
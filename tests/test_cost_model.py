@@ -0,0 +1,31 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+
+from beta_numbers.cost_model import COST_INDEX_DTYPE, load_cost_index, predict_cost
+
+class TestCostModel(TestCase):
+
+    def test_predict_cost(self):
+
+        cost = predict_cost(6, 1.4, 1, 10.)
+        self.assertGreater(cost, 0)
+        # the cost follows the expected size of the period, the degree, beta0 and the trace
+        self.assertAlmostEqual(predict_cost(6, 1.4, 1, 20.), 2 * cost)
+        self.assertGreater(predict_cost(8, 1.4, 1, 10.), cost)
+        self.assertGreater(predict_cost(6, 1.8, 1, 10.), cost)
+        self.assertGreater(predict_cost(6, 1.4, -5, 10.), cost)
+        self.assertEqual(predict_cost(6, 1.4, -1, 10.), cost)
+
+    def test_load_cost_index(self):
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+
+            filename = Path(tmp_dir) / "cost_index.npy"
+            np.save(filename, np.array([(6, 13, 5, 1.5), (6, 13, 2, 3.), (8, 15, 2, 7.)], dtype = COST_INDEX_DTYPE))
+            self.assertEqual(
+                load_cost_index(filename),
+                {(6, 13, 5): 1.5, (6, 13, 2): 3., (8, 15, 2): 7.}
+            )
@@ -0,0 +1,161 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+from cornifer import ApriInfo
+
+from beta_numbers.cycle_detectors import (
+    CYCLE_DETECTORS, CycleDetector, BrentDetector, DistinguishedPointDetector, get_cycle_detector, table_filename
+)
+
+DEG = 4
+
+def make_orbit(preperiod_len, period_len, length):
+    """B_1, ..., B_length, where B_{preperiod_len + 1} is the first periodic iterate."""
+
+    orbit = []
+
+    for n in range(1, length + 1):
+
+        if n > preperiod_len:
+            i = preperiod_len + 1 + (n - preperiod_len - 1) % period_len
+
+        else:
+            i = n
+
+        orbit.append(np.array([i, -i, 2 * i, 7], dtype = np.int64))
+
+    return orbit
+
+def detect(detector, orbit, startn = 1):
+
+    for n in range(startn, len(orbit) + 1):
+
+        k = detector.update(n, orbit[n - 1])
+
+        if k > 0:
+            return k, n
+
+    return None
+
+class TestCycleDetectors(TestCase):
+
+    def check_detector(self, cls, **kwargs):
+
+        for preperiod_len in [0, 1, 5, 37, 100]:
+
+            for period_len in [1, 2, 3, 64, 65, 250]:
+
+                orbit = make_orbit(preperiod_len, period_len, 4 * (preperiod_len + period_len) + 2 ** 12)
+                detector = cls(DEG, **kwargs)
+                ret = detect(detector, orbit)
+                self.assertIsNotNone(ret)
+                k, n = ret
+                self.assertTrue(np.all(orbit[k - 1] == orbit[n - 1]))
+                self.assertEqual(n - k, period_len)
+                self.assertLessEqual(detector.preperiod_lower_bound(), preperiod_len)
+                self.assertLess(preperiod_len, k)
+                startns = {2, max(2, n // 2), n}
+
+                for startn in startns:
+                    # a process resuming the orbit must find the same cycle
+                    detector = cls(DEG, **kwargs)
+                    detector.restart(startn - 1, lambda i: orbit[i - 1])
+                    k, n = detect(detector, orbit, startn)
+                    self.assertEqual(n - k, period_len)
+
+                for startn in startns:
+                    # a process resuming the orbit from the state saved by a previous process must find the same cycle
+                    detector = cls(DEG, **kwargs)
+                    self.assertIsNone(detect(detector, orbit[ : startn - 1]))
+                    state = detector.get_state()
+                    self.assertEqual(len(state), 1 + DEG)
+                    detector = cls(DEG, **kwargs)
+                    detector.set_state(startn - 1, state)
+                    k, n = detect(detector, orbit, startn)
+                    self.assertEqual(n - k, period_len)
+
+    def test_brent(self):
+
+        self.check_detector(BrentDetector)
+        orbit = make_orbit(10, 20, 1000)
+        detector = BrentDetector(DEG)
+        k, n = detect(detector, orbit)
+        # the checkpoint is the largest power of two at most n
+        self.assertEqual(k, 32)
+        self.assertEqual(detector.checkpoint_n, 32)
+        self.assertEqual(detector.preperiod_lower_bound(), 0)
+
+        with self.assertRaises(ValueError):
+            BrentDetector(DEG).restart(0, lambda i: orbit[i - 1])
+
+        with self.assertRaises(ValueError):
+            BrentDetector(DEG).set_state(64, detector.get_state())
+
+    def test_distinguished(self):
+
+        for dp_bits in [0, 2, 6]:
+            self.check_detector(DistinguishedPointDetector, dp_bits = dp_bits)
+
+        orbit = make_orbit(5000, 3000, 20000)
+        detector = DistinguishedPointDetector(DEG, dp_bits = 4)
+        k, n = detect(detector, orbit)
+        self.assertEqual(n - k, 3000)
+        # the detection happens soon after the orbit becomes periodic and the lower bound is close to the preperiod
+        self.assertLess(n - 8000, 2 ** 8)
+        self.assertLess(5000 - detector.preperiod_lower_bound(), 2 ** 8)
+        # about one in 2 ** 4 iterates is stored
+        self.assertLess(detector.num_points, n // 4)
+
+        with self.assertRaises(ValueError):
+            DistinguishedPointDetector(DEG, dp_bits = 64)
+
+    def test_distinguished_file(self):
+
+        orbit = make_orbit(5000, 3000, 20000)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+
+            filename = Path(tmp_dir) / "dp.npy"
+            # a process calculates up to 7000 but only saves up to 6000
+            detector = DistinguishedPointDetector(DEG, dp_bits = 2, filename = filename)
+
+            for n in range(1, 7001):
+                self.assertEqual(detector.update(n, orbit[n - 1]), 0)
+
+            num_points = detector.num_points
+            self.assertTrue(filename.exists())
+            self.assertGreater(np.count_nonzero(np.load(filename)[:, 0] > 6000), 0)
+            del detector
+            detector = DistinguishedPointDetector(DEG, dp_bits = 2, filename = filename)
+            detector.restart(6000, lambda i: orbit[i - 1])
+            k, n = detect(detector, orbit, 6001)
+            self.assertEqual(n - k, 3000)
+            self.assertLess(detector.num_points, num_points + 3000)
+            self.assertEqual(np.count_nonzero(np.load(filename)[:, 0] > n), 0)
+            # a fresh orbit discards the old table
+            detector = DistinguishedPointDetector(DEG, dp_bits = 2, filename = filename)
+            self.assertEqual(detector.update(1, orbit[0]), 0)
+            self.assertLessEqual(detector.num_points, 1)
+            detector.close()
+            self.assertFalse(filename.exists())
+
+    def test_get_cycle_detector(self):
+
+        orbit_apri = ApriInfo(resp = ApriInfo(deg = 4, sum_abs_coef = 10), index = 3)
+        self.assertIsInstance(get_cycle_detector("brent", DEG, orbit_apri), BrentDetector)
+        detector = get_cycle_detector("distinguished", DEG, orbit_apri, dp_bits = 3, table_dir = "foo")
+        self.assertEqual(detector.dp_bits, 3)
+        self.assertEqual(detector.filename, table_filename("foo", orbit_apri))
+
+        with self.assertRaises(ValueError):
+            get_cycle_detector("floyd", DEG, orbit_apri)
+
+    def test_registry(self):
+
+        for cls in CYCLE_DETECTORS.values():
+            self.assertTrue(issubclass(cls, CycleDetector))
+
+        with self.assertRaises(TypeError):
+            CycleDetector(DEG)
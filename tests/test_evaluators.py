@@ -0,0 +1,212 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+import mpmath
+import numpy as np
+
+from beta_numbers.evaluators import (
+    AMBIGUOUS_FLOOR, EVALUATORS, XiEvaluator, MPMathEvaluator, FixedPointEvaluator,
+    IncrementalEvaluator, IntervalEvaluator, TieredEvaluator, TraceEvaluator, enclose_root, newton_power_sums
+)
+
+from .utilities import MAX_DPS, MAX_PREC, SALEMS, BIG_SALEM, calc_beta0, calc_coef_orbit
+
+class TestEvaluators(TestCase):
+
+    def check_evaluator(self, cls, **kwargs):
+
+        for min_poly_coefs, orbit, m, p in SALEMS:
+
+            min_poly_coefs = np.array(min_poly_coefs, dtype = np.int64)
+            evaluator = cls(calc_beta0(min_poly_coefs), min_poly_coefs, MAX_PREC, **kwargs)
+            # the coef preperiod is one longer than the poly preperiod
+            exp_coefs = orbit[ : m + 1] + orbit[m + 1 : ] * 3
+            self.assertEqual(
+                exp_coefs,
+                calc_coef_orbit(evaluator, min_poly_coefs, len(exp_coefs))
+            )
+
+        min_poly_coefs = np.array(BIG_SALEM, dtype = np.int64)
+        beta0 = calc_beta0(min_poly_coefs)
+        self.assertEqual(
+            calc_coef_orbit(MPMathEvaluator(beta0, min_poly_coefs, MAX_PREC), min_poly_coefs, 500),
+            calc_coef_orbit(cls(beta0, min_poly_coefs, MAX_PREC, **kwargs), min_poly_coefs, 500)
+        )
+
+    def test_mpmath(self):
+        self.check_evaluator(MPMathEvaluator)
+
+    def test_fixed(self):
+        self.check_evaluator(FixedPointEvaluator)
+
+    def test_fixed_ambiguous(self):
+
+        min_poly_coefs = np.array(BIG_SALEM, dtype = np.int64)
+        evaluator = FixedPointEvaluator(calc_beta0(min_poly_coefs), min_poly_coefs, MAX_PREC)
+        # B = 1, so xi = beta0 = 13.34..., but with only 2 bits the error bound straddles 13
+        Bn_1 = np.array([1, 0, 0, 0, 0, 0], dtype = np.int64)
+        self.assertEqual(evaluator.floor_xi(Bn_1, 64, 16), 13)
+        self.assertEqual(evaluator.floor_xi(Bn_1, 2, 1), AMBIGUOUS_FLOOR)
+        self.assertIsNotNone(evaluator.last_xi)
+
+    def test_fixed_beta0_error(self):
+
+        min_poly_coefs = np.array(BIG_SALEM, dtype = np.int64)
+        beta0 = calc_beta0(min_poly_coefs)
+
+        with mpmath.workdps(MAX_DPS):
+            # 32711817241 * beta0 ** 6 exceeds an integer by less than 2 ** -38
+            xi = 32711817241 * beta0 ** 6
+            self.assertLess(mpmath.frac(xi), 2 ** -38)
+            # accurate to 96 bits, but below beta0
+            beta0 = beta0 * (1 - mpmath.ldexp(1, -96))
+
+        Bn_1 = np.array([0, 0, 0, 0, 0, 32711817241], dtype = np.int64)
+
+        for cls in [FixedPointEvaluator, IncrementalEvaluator]:
+            # the error of beta0 ** 6 at 96 bits is far greater than the rounding error of the table
+            self.assertEqual(cls(beta0, min_poly_coefs, 96).floor_xi(Bn_1, 96, 16), AMBIGUOUS_FLOOR)
+
+    def test_incremental(self):
+
+        for anchor_period in [1, 5, 64]:
+            self.check_evaluator(IncrementalEvaluator, anchor_period = anchor_period)
+
+    def test_incremental_num_anchors(self):
+
+        min_poly_coefs = np.array(BIG_SALEM, dtype = np.int64)
+        evaluator = IncrementalEvaluator(calc_beta0(min_poly_coefs), min_poly_coefs, MAX_PREC, anchor_period = 10)
+        calc_coef_orbit(evaluator, min_poly_coefs, 1000)
+        self.assertGreaterEqual(evaluator.num_anchors, 100)
+        self.assertLess(evaluator.num_anchors, 1000)
+        self.assertEqual(evaluator.stats(), {"anchors" : evaluator.num_anchors})
+
+    def test_interval(self):
+        self.check_evaluator(IntervalEvaluator)
+
+    def test_enclose_root(self):
+
+        min_poly_coefs = np.array(BIG_SALEM, dtype = np.int64)
+        beta0 = calc_beta0(min_poly_coefs)
+        beta0_iv = enclose_root(beta0, min_poly_coefs, MAX_PREC)
+        self.assertIn(beta0, beta0_iv)
+        self.assertLess(beta0_iv.delta, mpmath.ldexp(1, 64 - MAX_PREC))
+
+        with self.assertRaises(ValueError):
+            enclose_root(beta0 + 1, min_poly_coefs, MAX_PREC, 1)
+
+    def test_interval_ambiguous(self):
+
+        min_poly_coefs = np.array(BIG_SALEM, dtype = np.int64)
+        evaluator = IntervalEvaluator(calc_beta0(min_poly_coefs), min_poly_coefs, MAX_PREC)
+        # -(x - 14) = 14 - beta0 is close to 0.65, so xi = beta0 * (14 - beta0) is close to 8.75
+        Bn_1 = np.array([14, -1, 0, 0, 0, 0], dtype = np.int64)
+        self.assertEqual(evaluator.floor_xi(Bn_1, 64, 16), 8)
+        self.assertEqual(evaluator.floor_xi(Bn_1, 3, 1), AMBIGUOUS_FLOOR)
+        self.assertEqual(evaluator.stats(), {"evals" : 2, "ambiguous" : 1})
+
+    def test_tiered(self):
+
+        for fallback in ["mpmath", "fixed", "interval"]:
+            self.check_evaluator(TieredEvaluator, fallback = fallback)
+
+        with self.assertRaises(ValueError):
+            TieredEvaluator(mpmath.mpf(2), np.array([-2, 0, 1]), MAX_PREC, fallback = "incremental")
+
+    def test_tiered_hits(self):
+
+        min_poly_coefs = np.array(BIG_SALEM, dtype = np.int64)
+        beta0 = calc_beta0(min_poly_coefs)
+        evaluator = TieredEvaluator(beta0, min_poly_coefs, MAX_PREC)
+        calc_coef_orbit(evaluator, min_poly_coefs, 1000)
+        stats = evaluator.stats()
+        self.assertEqual(stats["float64"] + stats["double_double"] + stats["fallback"], 1000)
+        self.assertGreater(stats["float64"], stats["fallback"])
+        # large coefficients are out of reach of float64 but not of double-double
+        Bn_1 = np.array([2 ** 40, 0, 0, 0, 0, 3], dtype = np.int64)
+        self.assertEqual(evaluator.floor_xi(Bn_1, 256, 128), MPMathEvaluator(beta0, min_poly_coefs, MAX_PREC).floor_xi(Bn_1, 256, 128))
+        self.assertEqual(evaluator.stats()["double_double"], stats["double_double"] + 1)
+
+    def test_trace(self):
+        self.check_evaluator(TraceEvaluator)
+
+    def test_trace_repeated_roots(self):
+
+        # (x ** 2 - 3x + 1)(x + 1) ** 2, whose root -1 is double
+        min_poly_coefs = np.array([1, -1, -4, -1, 1], dtype = np.int64)
+
+        with mpmath.workdps(MAX_DPS):
+
+            beta0 = (3 + mpmath.sqrt(5)) / 2
+            conjs = [mpmath.mpc(1 / beta0), mpmath.mpc(-1), mpmath.mpc(-1)]
+
+        self.assertEqual(
+            calc_coef_orbit(MPMathEvaluator(beta0, min_poly_coefs, MAX_PREC), min_poly_coefs, 200),
+            calc_coef_orbit(TraceEvaluator(beta0, min_poly_coefs, MAX_PREC, conjs = conjs), min_poly_coefs, 200)
+        )
+
+        with self.assertRaises(ValueError):
+            TraceEvaluator(beta0, min_poly_coefs, MAX_PREC, conjs = conjs[:2])
+
+    def test_newton_power_sums(self):
+
+        # (x - 1)(x - 2)(x - 3)
+        self.assertEqual(newton_power_sums(np.array([-6, 11, -6, 1]), 5), [6, 14, 36, 98, 276])
+        min_poly_coefs = np.array(BIG_SALEM, dtype = np.int64)
+
+        with mpmath.workdps(MAX_DPS):
+
+            roots = mpmath.polyroots(BIG_SALEM[::-1], maxsteps = 200, extraprec = MAX_PREC)
+
+            for k, power_sum in enumerate(newton_power_sums(min_poly_coefs, 10)):
+                self.assertTrue(mpmath.almosteq(sum(root ** (k + 1) for root in roots), power_sum))
+
+        with self.assertRaises(ValueError):
+            newton_power_sums(np.array([1, 2]), 3)
+
+    def test_trace_prec(self):
+
+        min_poly_coefs = np.array(BIG_SALEM, dtype = np.int64)
+        evaluator = TraceEvaluator(calc_beta0(min_poly_coefs), min_poly_coefs, MAX_PREC)
+        calc_coef_orbit(evaluator, min_poly_coefs, 1000)
+        # the conjugates of a Salem number have modulus at most 1, so the precision needed is independent of beta0
+        self.assertLess(evaluator.stats()["max_prec_used"], 16 * 2 ** 4 + 64)
+
+    def test_context(self):
+
+        min_poly_coefs = np.array(BIG_SALEM, dtype = np.int64)
+        beta0 = calc_beta0(min_poly_coefs)
+        Bn_1 = np.array([3, -1, 0, 2, 0, 0], dtype = np.int64)
+        old_prec, old_iv_prec = mpmath.mp.prec, mpmath.iv.prec
+
+        for cls in EVALUATORS.values():
+
+            evaluator = cls(beta0, min_poly_coefs, MAX_PREC)
+
+            for x_prec in [2, 64, 512]:
+                evaluator.floor_xi(Bn_1, x_prec, x_prec // 2)
+
+            self.assertEqual(mpmath.mp.prec, old_prec)
+            self.assertEqual(mpmath.iv.prec, old_iv_prec)
+
+    def test_threads(self):
+
+        min_poly_coefs = np.array(BIG_SALEM, dtype = np.int64)
+        beta0 = calc_beta0(min_poly_coefs)
+        exp_coefs = calc_coef_orbit(MPMathEvaluator(beta0, min_poly_coefs, MAX_PREC), min_poly_coefs, 300)
+        evaluators = [cls(beta0, min_poly_coefs, MAX_PREC) for cls in list(EVALUATORS.values()) * 2]
+
+        with ThreadPoolExecutor(max_workers = 4) as executor:
+
+            for coefs in executor.map(
+                lambda evaluator: calc_coef_orbit(evaluator, min_poly_coefs, 300), evaluators
+            ):
+                self.assertEqual(coefs, exp_coefs)
+
+    def test_registry(self):
+
+        for cls in EVALUATORS.values():
+            self.assertTrue(issubclass(cls, XiEvaluator))
+
+        with self.assertRaises(TypeError):
+            XiEvaluator(mpmath.mpf(2), np.array([-2, 0, 1]), MAX_PREC)
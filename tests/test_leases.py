@@ -0,0 +1,87 @@
+import multiprocessing
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+from cornifer import ApriInfo
+
+from beta_numbers.leases import LeaseTable
+
+NUM_ORBITS = 50
+
+def claim_all(lease_dir, claimed):
+
+    leases = LeaseTable(lease_dir)
+    poly_apri = ApriInfo(deg = 6, sum_abs_coef = 13)
+    claimed.extend([
+        index for index in range(1, NUM_ORBITS + 1) if leases.claim(ApriInfo(resp = poly_apri, index = index))
+    ])
+
+class TestLeases(TestCase):
+
+    def test_lease(self):
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+
+            poly_apri = ApriInfo(deg = 6, sum_abs_coef = 13)
+            orbit_apri = ApriInfo(resp = poly_apri, index = 7)
+            leases = LeaseTable(tmp_dir, lease_secs = 0.2)
+            self.assertIsNone(leases.get(orbit_apri))
+            self.assertFalse(leases.holds(orbit_apri))
+            self.assertFalse(leases.renew(orbit_apri))
+            self.assertTrue(leases.claim(orbit_apri))
+            self.assertTrue(leases.holds(orbit_apri))
+            owner, heartbeat, expiry = leases.get(orbit_apri)
+            self.assertAlmostEqual(expiry - heartbeat, 0.2)
+            # claiming again renews
+            self.assertTrue(leases.claim(orbit_apri))
+            self.assertTrue(leases.renew(orbit_apri))
+            # another process cannot claim an unexpired lease, but can claim an expired one
+            other = LeaseTable(tmp_dir, lease_secs = 0.2)
+            other._pid = os.getpid()
+            other._owner = b"other"
+            self.assertFalse(other.claim(orbit_apri))
+            self.assertFalse(other.renew(orbit_apri))
+            other.release(orbit_apri)
+            self.assertTrue(leases.holds(orbit_apri))
+            time.sleep(0.3)
+            # not claimed by another process since it expired
+            self.assertTrue(leases.renew(orbit_apri))
+            time.sleep(0.3)
+            self.assertTrue(other.claim(orbit_apri))
+            self.assertFalse(leases.holds(orbit_apri))
+            self.assertFalse(leases.renew(orbit_apri))
+            self.assertEqual(leases.get(orbit_apri)[0], "other")
+            # releasing the lease of another process does nothing
+            leases.release(orbit_apri)
+            self.assertEqual(leases.get(orbit_apri)[0], "other")
+            other.release(orbit_apri)
+            self.assertIsNone(leases.get(orbit_apri))
+            self.assertTrue(leases.claim(orbit_apri))
+            # the leases of the other orbits are independent
+            self.assertTrue(other.claim(ApriInfo(resp = poly_apri, index = 6)))
+            self.assertTrue(other.claim(ApriInfo(resp = ApriInfo(deg = 8, sum_abs_coef = 13), index = 7)))
+
+            with self.assertRaises(ValueError):
+                LeaseTable(tmp_dir, lease_secs = 0)
+
+    def test_processes(self):
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+
+            with multiprocessing.Manager() as manager:
+
+                claimed = manager.list()
+                procs = [multiprocessing.Process(target = claim_all, args = (tmp_dir, claimed)) for _ in range(4)]
+
+                for proc in procs:
+                    proc.start()
+
+                for proc in procs:
+                    proc.join()
+
+                claimed = list(claimed)
+
+            # every orbit is claimed by exactly one process
+            self.assertEqual(sorted(claimed), list(range(1, NUM_ORBITS + 1)))
@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+import numpy as np
+
+from beta_numbers.metrics import OrbitMetrics, METRICS_LEN, METRICS_HEADER_LEN, METRICS_N, METRICS_NUM_ITERATIONS, \
+    METRICS_NUM_EVALS, METRICS_NUM_PREC_INCREASES, METRICS_MAX_COEF_BITS, NUM_ESCALATION_LEVELS
+
+class TestOrbitMetrics(TestCase):
+
+    def test_record_step(self):
+
+        metrics = OrbitMetrics()
+        self.assertTrue(np.array_equal(metrics.get_row(), np.zeros(METRICS_LEN, dtype = np.int64)))
+
+        for n, num_evals, coef_bits in [(1, 1, 1), (2, 1, 5), (3, 3, 4), (4, 1, 2), (5, 40, 9)]:
+            metrics.record_step(n, num_evals, coef_bits)
+
+        row = metrics.get_row()
+        self.assertEqual(row.dtype, np.int64)
+        self.assertEqual(len(row), METRICS_LEN)
+        self.assertEqual(row[METRICS_N], 5)
+        self.assertEqual(row[METRICS_NUM_ITERATIONS], 5)
+        self.assertEqual(row[METRICS_NUM_EVALS], 46)
+        self.assertEqual(row[METRICS_NUM_PREC_INCREASES], 41)
+        self.assertEqual(row[METRICS_MAX_COEF_BITS], 9)
+        escalation_counts = np.zeros(NUM_ESCALATION_LEVELS, dtype = np.int64)
+        escalation_counts[[0, 2, -1]] = [3, 1, 1]
+        self.assertTrue(np.array_equal(row[METRICS_HEADER_LEN : ], escalation_counts))
+        self.assertTrue(np.array_equal(metrics.escalation_counts, escalation_counts))
+
+    def test_set_row(self):
+
+        metrics = OrbitMetrics()
+        metrics.record_step(7, 2, 3)
+        resumed = OrbitMetrics()
+        resumed.set_row(metrics.get_row())
+        self.assertTrue(np.array_equal(resumed.get_row(), metrics.get_row()))
+        # the counters of a resumed orbit accumulate
+        resumed.record_step(8, 1, 2)
+        row = resumed.get_row()
+        self.assertEqual(row[METRICS_N], 8)
+        self.assertEqual(row[METRICS_NUM_ITERATIONS], 2)
+        self.assertEqual(row[METRICS_NUM_EVALS], 3)
+        self.assertEqual(row[METRICS_MAX_COEF_BITS], 3)
+        self.assertEqual(row[METRICS_HEADER_LEN], 1)
+        self.assertEqual(row[METRICS_HEADER_LEN + 1], 1)
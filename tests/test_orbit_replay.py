@@ -0,0 +1,114 @@
+from unittest import TestCase
+
+import numpy as np
+from cornifer import ApriInfo
+
+from beta_numbers.orbit_replay import OrbitReplay, get_checkpoint_apri
+
+from . import utilities
+
+BIG_SALEM = np.array(utilities.BIG_SALEM, dtype = np.int64)
+
+def make_orbit(min_poly, coefs):
+    """B_1, ..., B_len(coefs) for arbitrary coefficients, by the same relation as `_calc_Bn`."""
+
+    deg = len(min_poly) - 1
+    Bn = np.zeros(deg, dtype = np.int64)
+    Bn[0] = 1
+    orbit = []
+
+    for cn in coefs:
+
+        Bn_1 = Bn
+        Bn = np.zeros(deg, dtype = np.int64)
+        Bn[0] = -cn
+        Bn[1 : ] = Bn_1[ : -1]
+        Bn -= Bn_1[-1] * min_poly[ : -1]
+        orbit.append(Bn)
+
+    return orbit
+
+def make_replay(min_poly, coefs, orbit, checkpoint_period, num_reads):
+    """An `OrbitReplay` of `orbit` that only reads the checkpoints, and counts the coefficients read."""
+
+    def get_checkpoint(j):
+        return orbit[j * checkpoint_period - 1]
+
+    def get_coefs(startn, stopn):
+
+        num_reads[0] += stopn - startn
+        return coefs[startn - 1 : stopn - 1]
+
+    return OrbitReplay(min_poly, checkpoint_period, get_checkpoint, get_coefs)
+
+class TestOrbitReplay(TestCase):
+
+    def test_call(self):
+
+        rng = np.random.default_rng(0)
+        coefs = rng.integers(0, 14, 200).tolist()
+        orbit = make_orbit(BIG_SALEM, coefs)
+
+        for checkpoint_period in [1, 7, 64, 1000]:
+
+            num_reads = [0]
+            replay = make_replay(BIG_SALEM, coefs, orbit, checkpoint_period, num_reads)
+
+            for n in rng.permutation(len(orbit)) + 1:
+                self.assertTrue(np.array_equal(replay(n), orbit[n - 1]))
+
+            self.assertLess(num_reads[0], len(orbit) * checkpoint_period)
+
+            if checkpoint_period == 1:
+                self.assertEqual(num_reads[0], 0)
+
+            # reading in increasing order replays a single step per iterate
+            num_reads[0] = 0
+            replay = make_replay(BIG_SALEM, coefs, orbit, checkpoint_period, num_reads)
+
+            for n in range(1, len(orbit) + 1):
+                self.assertTrue(np.array_equal(replay(n), orbit[n - 1]))
+
+            self.assertLessEqual(num_reads[0], len(orbit))
+
+        with self.assertRaises(ValueError):
+            replay(0)
+
+        with self.assertRaises(ValueError):
+            OrbitReplay(BIG_SALEM, 0, None, None)
+
+    def test_iter(self):
+
+        coefs = [13, 2, 0, 5, 13, 1] * 20
+        orbit = make_orbit(BIG_SALEM, coefs)
+
+        for checkpoint_period in [1, 5, 16]:
+
+            num_reads = [0]
+            replay = make_replay(BIG_SALEM, coefs, orbit, checkpoint_period, num_reads)
+
+            for startn, stopn in [(1, 121), (5, 6), (17, 50), (30, 30), (33, 20)]:
+
+                polys = list(replay.iter(startn, stopn))
+                self.assertEqual(len(polys), max(0, stopn - startn))
+
+                for Bn, exp_Bn in zip(polys, orbit[startn - 1 : stopn - 1]):
+                    self.assertTrue(np.array_equal(Bn, exp_Bn))
+
+            if checkpoint_period == 1:
+                # every iterate is read directly
+                self.assertEqual(num_reads[0], 0)
+
+        # the replayed iterates are copies
+        replay(3)[:] = 0
+        self.assertTrue(np.array_equal(replay(3), orbit[2]))
+
+    def test_get_checkpoint_apri(self):
+
+        orbit_apri = ApriInfo(resp = ApriInfo(deg = 6, sum_abs_coef = 161), index = 3)
+        self.assertEqual(get_checkpoint_apri(orbit_apri, 1), orbit_apri)
+        checkpoint_apri = get_checkpoint_apri(orbit_apri, 64)
+        self.assertNotEqual(checkpoint_apri, orbit_apri)
+        self.assertEqual(checkpoint_apri.resp, orbit_apri.resp)
+        self.assertEqual(checkpoint_apri.index, 3)
+        self.assertEqual(checkpoint_apri.checkpoint_period, 64)
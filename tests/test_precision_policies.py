@@ -0,0 +1,125 @@
+from unittest import TestCase
+
+import numpy as np
+
+from beta_numbers.precision_policies import (
+    PRECISION_POLICIES, PrecisionPolicy, DoublingPolicy, AdaptivePolicy, get_precision_policy, calc_constant_dps,
+    NUM_LEVELS, PROFILE_LEN, PROFILE_N, PROFILE_NUM_STEPS, PROFILE_NUM_INCREASES, PROFILE_MAX_X_PREC,
+    PROFILE_MAX_Y_PREC, PROFILE_HEADER_LEN, PROFILE_STATE
+)
+
+OFFSET = 40
+
+def run(policy, needed_y_precs, startn = 1):
+    """Mimic the precision escalation of `_single_orbit` for steps whose floor is decided at the given y_prec, and
+    return the total number of floor evaluations."""
+
+    num_evals = 0
+
+    for n, needed_y_prec in enumerate(needed_y_precs, startn):
+
+        y_prec = policy.initial_y_prec(n)
+        num_increases = 0
+        num_evals += 1
+
+        while y_prec < needed_y_prec:
+
+            y_prec *= 2
+            num_increases += 1
+            num_evals += 1
+
+        policy.record(n, y_prec + OFFSET, y_prec, num_increases)
+
+    return num_evals
+
+class TestPrecisionPolicies(TestCase):
+
+    def test_doubling(self):
+
+        policy = DoublingPolicy()
+        self.assertEqual(run(policy, [16, 200, 16, 64]), 1 + 5 + 1 + 3)
+        self.assertEqual(policy.initial_y_prec(5), 16)
+        profile = policy.get_profile()
+        self.assertEqual(len(profile), PROFILE_LEN)
+        self.assertEqual(profile[PROFILE_N], 4)
+        self.assertEqual(profile[PROFILE_NUM_STEPS], 4)
+        self.assertEqual(profile[PROFILE_NUM_INCREASES], 4 + 2)
+        self.assertEqual(profile[PROFILE_MAX_Y_PREC], 256)
+        self.assertEqual(profile[PROFILE_MAX_X_PREC], 256 + OFFSET)
+        # 16, 16, 64, 256
+        self.assertEqual(list(profile[PROFILE_HEADER_LEN : PROFILE_HEADER_LEN + 5]), [2, 0, 1, 0, 1])
+        self.assertEqual(policy.level_counts.sum(), 4)
+
+    def test_adaptive(self):
+
+        needed_y_precs = [200] * 1000
+        num_evals = run(AdaptivePolicy(), needed_y_precs)
+        self.assertLess(num_evals, run(DoublingPolicy(), needed_y_precs) // 4)
+        policy = AdaptivePolicy(decay_period = 10)
+        run(policy, [200] + [16] * 10)
+        self.assertEqual(policy.start_y_prec, 128)
+        run(policy, [16] * 100)
+        self.assertEqual(policy.start_y_prec, 16)
+
+        with self.assertRaises(ValueError):
+            AdaptivePolicy(decay_period = 0)
+
+    def test_profile(self):
+
+        policy = AdaptivePolicy()
+        run(policy, [16, 32, 2 ** 30, 16])
+        profile = policy.get_profile()
+        # the last step starts from the precision of the hard step before it
+        self.assertEqual(profile[PROFILE_HEADER_LEN + NUM_LEVELS - 1], 2)
+        # a process continuing the orbit continues the profile
+        policy_ = DoublingPolicy()
+        policy_.set_profile(profile)
+        run(policy_, [64], 5)
+        profile_ = policy_.get_profile()
+        self.assertEqual(profile_[PROFILE_N], 5)
+        self.assertEqual(profile_[PROFILE_NUM_STEPS], 5)
+        self.assertTrue(np.array_equal(
+            profile_[PROFILE_HEADER_LEN : PROFILE_STATE] - profile[PROFILE_HEADER_LEN : PROFILE_STATE],
+            np.eye(NUM_LEVELS, dtype = int)[2]
+        ))
+
+    def test_state(self):
+
+        policy = AdaptivePolicy(decay_period = 10)
+        run(policy, [200] + [16] * 5)
+        self.assertEqual(policy.start_y_prec, 256)
+        # a resumed orbit starts from the same precision and halves it after the same number of steps
+        for state in [policy.get_state(), policy.get_profile()[PROFILE_STATE : ]]:
+
+            policy_ = AdaptivePolicy(decay_period = 10)
+            policy_.set_state(state)
+            self.assertEqual(policy_.initial_y_prec(7), 256)
+            run(policy_, [16] * 5, 7)
+            self.assertEqual(policy_.start_y_prec, 128)
+
+        policy_ = AdaptivePolicy()
+        policy_.set_profile(policy.get_profile())
+        self.assertEqual(policy_.initial_y_prec(7), 256)
+        # the state of the other policies is empty
+        policy_.set_state(DoublingPolicy().get_state())
+        self.assertEqual(policy_.initial_y_prec(7), 16)
+
+    def test_calc_constant_dps(self):
+
+        self.assertEqual(calc_constant_dps(DoublingPolicy().get_profile()), (-1, -1))
+        policy = DoublingPolicy()
+        run(policy, [100])
+        constant_y_dps, constant_x_dps = calc_constant_dps(policy.get_profile())
+        # the constant precisions are at least the largest ones used
+        self.assertGreaterEqual(int(constant_y_dps * 3.32193), 128)
+        self.assertGreaterEqual(int(constant_x_dps * 3.32193), 128 + OFFSET)
+
+    def test_registry(self):
+
+        for name, cls in PRECISION_POLICIES.items():
+
+            self.assertTrue(issubclass(cls, PrecisionPolicy))
+            self.assertIsInstance(get_precision_policy(name), cls)
+
+        with self.assertRaises(ValueError):
+            get_precision_policy("profile")
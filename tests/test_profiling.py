@@ -0,0 +1,114 @@
+import json
+import os
+import socket
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import TestCase
+
+from beta_numbers.profiling import SamplingTimers, merge_profiles, load_profiles, format_profile
+
+def busy(seconds):
+
+    stop = time.perf_counter() + seconds
+
+    while time.perf_counter() < stop:
+        pass
+
+class TestSamplingTimers(TestCase):
+
+    def test_sample_period(self):
+
+        timers = SamplingTimers(sample_period = 4, max_overhead = 0.5)
+
+        for _ in range(40):
+
+            with timers.time("cheap"):
+                pass
+
+            with timers.time("busy"):
+                busy(1e-4)
+
+        profile = timers.get_profile()
+        self.assertEqual(profile["stages"]["busy"]["count"], 40)
+        self.assertEqual(profile["stages"]["busy"]["sampled"], 10)
+        self.assertEqual(profile["stages"]["cheap"]["sampled"], 10)
+        # estimated from the sampled events
+        self.assertGreaterEqual(profile["stages"]["busy"]["ns"], 40 * 100_000)
+        self.assertLess(profile["stages"]["cheap"]["ns"], profile["stages"]["busy"]["ns"])
+        self.assertIn("busy", format_profile(profile))
+
+    def test_max_overhead(self):
+
+        timers = SamplingTimers(max_overhead = 0.1)
+
+        for _ in range(40_000):
+
+            with timers.time("short"):
+                busy(1e-5)
+
+        # timing every event of a 10 microsecond stage costs more than 10% of the wall time, but counting down the
+        # events that are not timed costs much less
+        profile = timers.get_profile()
+        self.assertGreater(timers.sample_period, 1)
+        self.assertLess(profile["stages"]["short"]["sampled"], 40_000)
+        self.assertEqual(profile["stages"]["short"]["count"], 40_000)
+        self.assertLess(profile["overhead_ns"], timers.max_overhead * profile["wall_ns"])
+
+    def test_threads(self):
+
+        timers = SamplingTimers(sample_period = 3, max_overhead = 0.5)
+
+        def run(_):
+
+            for _ in range(10_000):
+
+                with timers.time("cheap"):
+                    pass
+
+        with ThreadPoolExecutor(max_workers = 8) as executor:
+            list(executor.map(run, range(8)))
+
+        # no event is lost to a race
+        self.assertEqual(timers.get_profile()["stages"]["cheap"]["count"], 80_000)
+
+    def test_stacks(self):
+
+        timers = SamplingTimers(stack_interval = 0.001, max_overhead = 0.5)
+
+        with timers.time("busy"):
+            busy(0.2)
+
+        profile = timers.get_profile()
+        self.assertGreater(profile["stack_samples"], 0)
+        self.assertTrue(any("test_profiling:busy" in stack for stack in profile["stacks"]))
+
+    def test_merge_profiles(self):
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+
+            timers = SamplingTimers(profile_dir = tmp_dir, max_overhead = 0.5)
+
+            for _ in range(3):
+
+                with timers.time("a"):
+                    pass
+
+            timers.save()
+            self.assertEqual(timers.get_filename().name, f"profile_{socket.gethostname()}_{os.getpid()}.json")
+            other = timers.get_profile()
+            other["stages"]["b"] = {"count": 2, "sampled": 1, "sampled_ns": 5, "ns": 10}
+            other["wall_ns"] *= 2
+
+            with (Path(tmp_dir) / "profile_other_1.json").open("w") as fh:
+                json.dump(other, fh)
+
+            merged = load_profiles(tmp_dir)
+            self.assertEqual(merged["processes"], 2)
+            self.assertEqual(merged["stages"]["a"]["count"], 6)
+            self.assertEqual(merged["stages"]["b"]["ns"], 10)
+            self.assertEqual(merged["wall_ns"], other["wall_ns"])
+
+        with self.assertRaises(ValueError):
+            merge_profiles([dict(merged, version = 0)])
@@ -0,0 +1,61 @@
+import tempfile
+import time
+from unittest import TestCase
+
+from beta_numbers.progress import ProgressFile, read_progress_file, read_progress_files, summarize_progress
+
+class TestProgress(TestCase):
+
+    def test_progress_file(self):
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+
+            progress = ProgressFile(tmp_dir, "orbits", 3, 8)
+            progress.add(units_total = 10)
+            progress.set_apri("deg = 6, sum_abs_coef = 161, index = 4")
+            progress.add(units = 2, coefs = 1000)
+            record = read_progress_file(progress.filename)
+            self.assertEqual(record["kind"], "orbits")
+            self.assertEqual(record["proc_index"], 3)
+            self.assertEqual(record["num_procs"], 8)
+            self.assertEqual(record["units_done"], 2)
+            self.assertEqual(record["units_total"], 10)
+            self.assertEqual(record["num_coefs"], 1000)
+            self.assertEqual(record["apri"], "deg = 6, sum_abs_coef = 161, index = 4")
+            progress.close()
+
+            with self.assertRaises(ValueError):
+                ProgressFile(tmp_dir, "salem_nums", 0, 1)
+
+    def test_summarize_progress(self):
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+
+            # an earlier run of worker 0, which is ignored
+            old = ProgressFile(tmp_dir, "perron_nums", 0, 3)
+            old.add(units = 7, units_total = 10)
+            old.close()
+            old.filename.rename(old.filename.parent / "progress_perron_nums_0_old_1.bin")
+            time.sleep(0.01)
+            progresses = [ProgressFile(tmp_dir, "perron_nums", proc_index, 3) for proc_index in range(3)]
+
+            for progress, units in zip(progresses, [5, 4, 0]):
+                progress.add(units = units, polys = 100 * units, units_total = 10)
+
+            records = read_progress_files(tmp_dir)
+            self.assertEqual([record["proc_index"] for record in records], [0, 1, 2])
+            summary = summarize_progress(records, time.time())["perron_nums"]
+            self.assertEqual(summary["num_workers"], 3)
+            self.assertEqual(summary["units_done"], 9)
+            self.assertEqual(summary["units_total"], 30)
+            self.assertEqual(summary["num_polys"], 900)
+            self.assertEqual(summary["stragglers"], [2])
+            # nothing is done by worker 2 yet
+            self.assertIsNone(summary["eta"])
+
+            progresses[2].add(units = 1)
+            summary = summarize_progress(read_progress_files(tmp_dir))["perron_nums"]
+            self.assertIsNotNone(summary["eta"])
+
+            for progress in progresses:
+                progress.close()
@@ -0,0 +1,53 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+
+from beta_numbers.registers import PackedCoefRegister, pack_coefs, unpack_coefs, PACKED_HEADER_LEN, PACKED_DTYPE
+
+class TestPackedCoefRegister(TestCase):
+
+    def test_pack_coefs(self):
+
+        rng = np.random.default_rng(0)
+
+        for max_coef, num_bits in [(1, 1), (2, 2), (13, 4), (31, 5), (1000, 10)]:
+
+            coefs = rng.integers(0, max_coef + 1, 997)
+            coefs[0] = max_coef
+            packed = pack_coefs(coefs)
+            self.assertEqual(packed.dtype, np.uint8)
+            self.assertEqual(len(packed), PACKED_HEADER_LEN + (997 * num_bits + 7) // 8)
+            self.assertTrue(np.array_equal(unpack_coefs(packed), coefs))
+
+            for startn, stopn in [(0, 1), (3, 11), (100, 997), (996, 2000), (500, 500), (600, 10)]:
+                self.assertTrue(np.array_equal(unpack_coefs(packed, startn, stopn), coefs[startn : stopn]))
+
+        self.assertTrue(np.array_equal(unpack_coefs(pack_coefs([3, 0, 1], 8)), [3, 0, 1]))
+        self.assertEqual(len(unpack_coefs(pack_coefs([]))), 0)
+
+        with self.assertRaises(ValueError):
+            pack_coefs([1, -1])
+
+        with self.assertRaises(ValueError):
+            pack_coefs([4], 2)
+
+    def test_dump_load(self):
+
+        coefs = [13, 0, 2, 7, 13, 13, 1]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+
+            filename = Path(tmp_dir) / "coefs.npy"
+            PackedCoefRegister.dump_disk_data(coefs, filename)
+            self.assertEqual(np.load(filename).dtype, PACKED_DTYPE)
+            self.assertEqual(PackedCoefRegister.load_disk_data(filename).tolist(), coefs)
+            self.assertEqual(PackedCoefRegister.load_disk_data(filename, mmap_mode = "r").tolist(), coefs)
+            # data saved before coefficients were packed
+            np.save(filename, np.array(coefs, dtype = np.int64))
+            self.assertEqual(PackedCoefRegister.load_disk_data(filename).tolist(), coefs)
+            # uint8 data saved by a plain `NumpyRegister`, even if it looks like a header
+            data = pack_coefs(coefs)
+            np.save(filename, data)
+            self.assertTrue(np.array_equal(PackedCoefRegister.load_disk_data(filename), data))
@@ -0,0 +1,39 @@
+from unittest import TestCase
+
+import numpy as np
+
+from beta_numbers.cycle_detectors import BrentDetector
+from beta_numbers.resume import (
+    RESUME_N, RESUME_HEADER_LEN, calc_resume_record_len, make_resume_record, read_resume_record
+)
+
+DEG = 6
+
+class TestResume(TestCase):
+
+    def test_record(self):
+
+        detector = BrentDetector(DEG)
+        Bn = np.array([-(2 ** 60), 3, 0, -1, 5, 2 ** 40], dtype = np.int64)
+
+        for n in range(1, 101):
+            detector.update(n, Bn + n)
+
+        record = make_resume_record(100, 57, True, 1.25, 3, 256, np.array([128, 9]), Bn + 100, detector.get_state())
+        self.assertEqual(record.dtype, np.int64)
+        self.assertEqual(len(record), calc_resume_record_len(DEG))
+        self.assertEqual(record[RESUME_N], 100)
+        self.assertTrue(np.array_equal(record[RESUME_HEADER_LEN : RESUME_HEADER_LEN + DEG], Bn + 100))
+        (
+            x_y_prec_offset, is_monotone, min_blowup, num_prec_increases, max_x_prec, precision_state, Bn_, state
+        ) = read_resume_record(record, DEG)
+        self.assertEqual((x_y_prec_offset, is_monotone, min_blowup, num_prec_increases, max_x_prec), (57, True, 1.25, 3, 256))
+        self.assertEqual(list(precision_state), [128, 9])
+        self.assertTrue(np.array_equal(Bn_, Bn + 100))
+        self.assertTrue(np.array_equal(state, detector.get_state()))
+        # the state restores the detector without reading the orbit
+        detector_ = BrentDetector(DEG)
+        detector_.set_state(100, state)
+        self.assertEqual(detector_.checkpoint_n, 64)
+        self.assertEqual(detector_.update(101, Bn + 64), 64)
+        self.assertEqual(read_resume_record(make_resume_record(5, 0, False, -1., 0, 0, np.zeros(2), Bn, state), DEG)[1 : 3], (False, -1.))
@@ -0,0 +1,103 @@
+import multiprocessing
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+from cornifer import ApriInfo
+
+from beta_numbers.status_table import StatusTable
+
+NUM_ORBITS = 64
+NUM_UPDATES = 200
+
+def update_orbits(table_dir, proc_index, num_procs):
+
+    table = StatusTable(table_dir)
+    apri = ApriInfo(deg = 6, sum_abs_coef = 13)
+
+    for n in range(1, NUM_UPDATES + 1):
+
+        for index in range(1 + proc_index, NUM_ORBITS + 1, num_procs):
+            # every field of a record is the same, so that a torn record is detected
+            table.status.set(apri, index, [n, n, n])
+
+    table.close()
+
+def read_orbits(table_dir, torn):
+
+    table = StatusTable(table_dir)
+    apri = ApriInfo(deg = 6, sum_abs_coef = 13)
+
+    for _ in range(NUM_UPDATES):
+
+        for index in range(1, NUM_ORBITS + 1):
+
+            row = table.status.get(apri, index)
+
+            if not np.all(row == row[0]):
+                torn.value += 1
+
+    table.close()
+
+class TestStatusTable(TestCase):
+
+    def test_views(self):
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+
+            table = StatusTable(tmp_dir)
+            apri = ApriInfo(deg = 6, sum_abs_coef = 13)
+            records = table.add_apri(apri, 11)
+            self.assertEqual(len(records), 11)
+            self.assertTrue(np.all(records["seq"] == 0))
+            table.status.set(apri, 3, [5, -1, -1])
+            table.periodic[apri, 3] = np.array([2, 7])
+            table.monotone.set(apri, 3, [1., 0.5], mmap_mode = "r+")
+            self.assertEqual(table.status.get(apri, 3, mmap_mode = "r").tolist(), [5, -1, -1])
+            self.assertEqual(table.periodic[apri, 3].tolist(), [2, 7])
+            self.assertEqual(table.monotone[apri, 3].tolist(), [1., 0.5])
+            self.assertEqual(table.monotone[apri, 3].dtype, np.float64)
+            # the fields of one view leave the others alone
+            table.status[apri, 3] = np.array([-1, -1, -1])
+            self.assertEqual(table.periodic[apri, 3].tolist(), [2, 7])
+            self.assertEqual(table.read(apri, 3, 4)["seq"].tolist(), [8])
+
+            with self.assertRaises(ValueError):
+                table.status.set(apri, 3, [1, 2])
+
+            with self.assertRaises(KeyError):
+                table.status.get(ApriInfo(deg = 8, sum_abs_coef = 13), 3)
+
+            # extending the file keeps the records
+            records = table.add_apri(apri, 21)
+            self.assertEqual(len(records), 21)
+            self.assertEqual(table.periodic[apri, 3].tolist(), [2, 7])
+            self.assertEqual(table.status[apri, 20].tolist(), [0, 0, 0])
+            table.close()
+
+    def test_processes(self):
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+
+            table = StatusTable(tmp_dir)
+            apri = ApriInfo(deg = 6, sum_abs_coef = 13)
+            table.add_apri(apri, NUM_ORBITS + 1)
+            torn = multiprocessing.Value("i", 0)
+            num_procs = 3
+            procs = [
+                multiprocessing.Process(target = update_orbits, args = (tmp_dir, proc_index, num_procs))
+                for proc_index in range(num_procs)
+            ]
+            procs.append(multiprocessing.Process(target = read_orbits, args = (tmp_dir, torn)))
+
+            for proc in procs:
+                proc.start()
+
+            for proc in procs:
+                proc.join()
+
+            self.assertEqual(torn.value, 0)
+            records = table.read(apri, 1, NUM_ORBITS + 1)
+            self.assertTrue(np.all(records["poly_orbit_len"] == NUM_UPDATES))
+            self.assertTrue(np.all(records["seq"] == 2 * NUM_UPDATES))
+            table.close()
@@ -0,0 +1,58 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import mpmath
+import numpy as np
+
+from beta_numbers.batched_orbits import calc_Bn
+from beta_numbers.evaluators import AMBIGUOUS_FLOOR, FixedPointEvaluator
+from beta_numbers.registers import WidePolynomialRegister
+from beta_numbers.wide_orbits import calc_Bn_wide, calc_min_blowup_wide
+
+from .utilities import MAX_DPS, MAX_PREC, BIG_SALEM
+
+class TestWideOrbits(TestCase):
+
+    def test_calc_Bn_wide(self):
+
+        min_poly = np.array(BIG_SALEM, dtype = np.int64)
+        Bn_1 = np.array([[3, -5, 7, 0, 2, -1]], dtype = np.int64)
+        self.assertEqual(
+            calc_Bn_wide(Bn_1[0].tolist(), 9, BIG_SALEM),
+            calc_Bn(Bn_1, np.array([9]), min_poly[None, :])[0].tolist()
+        )
+
+        with mpmath.workdps(MAX_DPS):
+
+            beta0 = max(mpmath.polyroots(BIG_SALEM[::-1], maxsteps = 200, extraprec = MAX_PREC), key = abs).real
+            evaluator = FixedPointEvaluator(beta0, min_poly, MAX_PREC)
+            # coefficients far beyond 64 bits, shifted so that 0 <= B_{n-1}(beta0) < 1, as for an actual iterate
+            Bn_1 = [2 ** 100 + 3, -(2 ** 90), 5, 0, 2 ** 70, -(2 ** 99)]
+            Bn_1[0] -= int(mpmath.floor(mpmath.polyval(Bn_1[::-1], beta0)))
+            xi = beta0 * mpmath.polyval(Bn_1[::-1], beta0)
+            self.assertTrue(0 <= xi < beta0)
+            cn = evaluator.floor_xi_wide(Bn_1, 512, 256)
+            self.assertEqual(cn, int(mpmath.floor(xi)))
+            Bn = calc_Bn_wide(Bn_1, cn, BIG_SALEM)
+            self.assertTrue(mpmath.almosteq(mpmath.polyval(Bn[::-1], beta0), xi - cn, 2 ** -200))
+            self.assertEqual(evaluator.floor_xi_wide(Bn_1, 64, 16), AMBIGUOUS_FLOOR)
+
+    def test_calc_min_blowup_wide(self):
+
+        self.assertEqual(calc_min_blowup_wide(False, 10, 2, 0., [1, 2], [3, 4]), (False, -1.))
+        self.assertEqual(calc_min_blowup_wide(True, 1, 2, 0., [1, 2], [3, 4]), (True, 0.))
+        self.assertEqual(calc_min_blowup_wide(True, 10, 2, 0., [0, 0], [0, 4]), (False, -1.))
+
+    def test_wide_polynomial_register(self):
+
+        polys = [[2 ** 100, -1, 0], [-(3 ** 80), 7, 2 ** 64]]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+
+            filename = Path(tmp_dir) / "wide.npy"
+            WidePolynomialRegister.dump_disk_data(polys, filename)
+            data = WidePolynomialRegister.load_disk_data(filename)
+
+        self.assertEqual(data.shape, (2, 3))
+        self.assertEqual(data.tolist(), polys)
@@ -0,0 +1,52 @@
+import multiprocessing
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from beta_numbers.work_queue import WorkQueue, write_work_queue, ITEM_LEN
+
+def claim_all(queue_dir, claimed):
+    claimed.extend([item[:4] + (item[4].tolist(),) for item in WorkQueue(queue_dir)])
+
+class TestWorkQueue(TestCase):
+
+    def test_claim(self):
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+
+            items = np.array([(6, 161, 1, 100, i, i + 1) for i in range(100)], dtype = np.int64)
+            # the batches need not be consecutive indices
+            indices = np.arange(100, 0, -1, dtype = np.int64)
+            queue = write_work_queue(tmp_dir, items, indices)
+            self.assertEqual(len(queue), 100)
+            deg, sum_abs_coef, startn, length, batch_indices = queue.claim()
+            self.assertEqual((deg, sum_abs_coef, startn, length, batch_indices.tolist()), (6, 161, 1, 100, [100]))
+            self.assertEqual(queue.num_claimed(), 1)
+
+            with multiprocessing.Manager() as manager:
+
+                claimed = manager.list()
+                procs = [
+                    multiprocessing.Process(target = claim_all, args = (tmp_dir, claimed)) for _ in range(4)
+                ]
+
+                for proc in procs:
+                    proc.start()
+
+                for proc in procs:
+                    proc.join()
+
+                claimed = list(claimed)
+
+            # every remaining item is claimed exactly once
+            self.assertEqual(sorted(claimed), sorted((6, 161, 1, 100, [index]) for index in range(1, 100)))
+            self.assertIsNone(queue.claim())
+            self.assertEqual(queue.num_claimed(), 100)
+            # setting up the queue again hands out every item again
+            queue = write_work_queue(tmp_dir, items[:3], indices)
+            self.assertEqual(len(list(queue)), 3)
+            self.assertEqual(
+                len(write_work_queue(tmp_dir, np.empty((0, ITEM_LEN), dtype = np.int64), np.empty(0, dtype = np.int64))),
+                0
+            )
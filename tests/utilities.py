@@ -0,0 +1,72 @@
+import mpmath
+import numpy as np
+
+from beta_numbers.evaluators import AMBIGUOUS_FLOOR
+
+MAX_DPS = 300
+MAX_PREC = int(MAX_DPS * 3.32193)
+# (minimal polynomial, coefficient orbit, poly preperiod length, period length), as in `beta_numbers.examples.salems`
+SALEMS = [
+    ([1, -4, 0, 0, 0, 0, 0, -4, 1], [4, 0, 0, 0, 0, 0, 3, 3], 0, 7),
+    ([1, -4, 0, 1, 0, 1, 0, -4, 1], [3, 3, 2, 2, 1, 2, 2, 1, 2, 2, 3, 2, 2], 0, 12)
+]
+# the degree six Salem number 13.3456... from the README
+BIG_SALEM = [1, -10, -40, -59, -40, -10, 1]
+
+def calc_beta0(min_poly_coefs, max_dps = MAX_DPS):
+
+    max_prec = int(max_dps * 3.32193)
+
+    with mpmath.workdps(max_dps):
+        return max(mpmath.polyroots(min_poly_coefs[::-1], maxsteps = 200, extraprec = 4 * max_prec), key = abs).real
+
+def calc_Bn(Bn_1, cn, min_poly_coefs):
+
+    Bn = np.zeros_like(Bn_1)
+    Bn[0] = -cn
+    Bn[1:] = Bn_1[:-1]
+    Bn -= Bn_1[-1] * min_poly_coefs[:-1]
+    return Bn
+
+def calc_coef_orbit(evaluator, min_poly_coefs, length, max_prec = MAX_PREC, calls = None):
+    """Mimic the precision escalation of `_single_orbit` for at most `length` steps and return the coefficients. If
+    the floor is still ambiguous at the maximum precision, as it is for the last nonzero coefficient of a simple Parry
+    number, then the last coefficient is rounded from `last_xi` and the orbit stops.
+
+    :param calls: (type `list`, default `None`) If given, the calls to `floor_xi` are appended to it, as tuples of
+    x_prec, the floor, and the `last_xi` of the ambiguous ones.
+    """
+
+    deg = len(min_poly_coefs) - 1
+    Bn_1 = np.zeros(deg, dtype = np.int64)
+    Bn_1[0] = 1
+    coefs = []
+
+    for _ in range(length):
+
+        y_prec = 16
+        offset = 1 + 2 * int(deg).bit_length() + int(np.max(np.abs(Bn_1))).bit_length() + deg * 5
+
+        while True:
+
+            x_prec = min(y_prec + offset, max_prec)
+            cn = evaluator.floor_xi(Bn_1, x_prec, x_prec - offset)
+
+            if calls is not None:
+                calls.append((x_prec, cn, evaluator.last_xi._mpf_ if cn == AMBIGUOUS_FLOOR else None))
+
+            if cn != AMBIGUOUS_FLOOR:
+                break
+
+            if x_prec == max_prec:
+
+                coefs.append(int(mpmath.nint(evaluator.last_xi)))
+                return coefs
+
+            y_prec *= 2
+
+        evaluator.advance(cn)
+        coefs.append(cn)
+        Bn_1 = calc_Bn(Bn_1, cn, min_poly_coefs)
+
+    return coefs